@@ -6,6 +6,9 @@ Create Date: 2025-01-01
 from alembic import op
 import sqlalchemy as sa
 
+revision = '001'
+down_revision = None
+
 def upgrade():
     op.create_table('campaigns',
         sa.Column('id', sa.Text, primary_key=True),
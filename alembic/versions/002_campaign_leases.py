@@ -0,0 +1,27 @@
+"""campaign ownership leases
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '002'
+down_revision = '001'
+
+
+def upgrade():
+    op.add_column('campaign_state', sa.Column('lease_owner', sa.Text))
+    op.add_column('campaign_state', sa.Column('lease_expires_at', sa.DateTime(timezone=True)))
+    op.create_index(
+        'ix_campaign_state_running_lease',
+        'campaign_state',
+        ['lease_expires_at'],
+        postgresql_where=sa.text('is_running = 1'),
+    )
+
+def downgrade():
+    op.drop_index('ix_campaign_state_running_lease', table_name='campaign_state')
+    op.drop_column('campaign_state', 'lease_expires_at')
+    op.drop_column('campaign_state', 'lease_owner')
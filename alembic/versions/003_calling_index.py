@@ -0,0 +1,23 @@
+"""partial index on calls stuck in 'calling'
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003'
+down_revision = '002'
+
+
+def upgrade():
+    op.create_index(
+        'ix_calls_calling',
+        'calls',
+        ['id'],
+        postgresql_where=sa.text("status = 'calling'"),
+    )
+
+def downgrade():
+    op.drop_index('ix_calls_calling', table_name='calls')
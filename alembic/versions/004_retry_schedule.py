@@ -0,0 +1,27 @@
+"""scheduled retries
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+
+
+def upgrade():
+    op.add_column('calls', sa.Column('next_attempt_at', sa.DateTime(timezone=True)))
+    op.create_index(
+        'ix_calls_retry_due',
+        'calls',
+        ['campaign_id', 'next_attempt_at'],
+        postgresql_where=sa.text('next_attempt_at IS NOT NULL'),
+    )
+    # Rows the old dialer would still have retried become due immediately
+    op.execute("UPDATE calls SET next_attempt_at = NOW() WHERE status = 'failed' AND retry_count < 3")
+
+def downgrade():
+    op.drop_index('ix_calls_retry_due', table_name='calls')
+    op.drop_column('calls', 'next_attempt_at')
@@ -0,0 +1,78 @@
+"""list-partition calls by campaign_id
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+import uuid
+from alembic import op
+import sqlalchemy as sa
+
+revision = '005'
+down_revision = '004'
+
+CALL_COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('calls_id_seq'),
+    campaign_id TEXT NOT NULL REFERENCES campaigns(id),
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    status TEXT DEFAULT 'pending',
+    feedback TEXT,
+    timestamp TEXT,
+    recording_url TEXT,
+    call_sid TEXT,
+    conversation_id TEXT,
+    duration INTEGER,
+    error_message TEXT,
+    retry_count INTEGER DEFAULT 0,
+    preferred_city TEXT,
+    interested TEXT,
+    transcript TEXT,
+    analysis_status TEXT DEFAULT 'pending',
+    next_attempt_at TIMESTAMPTZ
+"""
+
+
+def _create_indexes():
+    # Partitioned indexes: created once on the parent, inherited by every partition
+    op.execute("CREATE INDEX ix_calls_id ON calls (id)")
+    op.execute("CREATE INDEX ix_calls_call_sid ON calls (call_sid)")
+    op.execute("CREATE INDEX ix_calls_conversation_id ON calls (conversation_id)")
+    op.execute("CREATE INDEX ix_calls_calling ON calls (id) WHERE status = 'calling'")
+    op.execute(
+        "CREATE INDEX ix_calls_retry_due ON calls (campaign_id, next_attempt_at) "
+        "WHERE next_attempt_at IS NOT NULL"
+    )
+
+
+def upgrade():
+    op.execute("ALTER TABLE calls RENAME TO calls_unpartitioned")
+    op.execute("ALTER TABLE calls_unpartitioned RENAME CONSTRAINT calls_pkey TO calls_unpartitioned_pkey")
+    op.execute(f"CREATE TABLE calls ({CALL_COLUMNS}, PRIMARY KEY (campaign_id, id)) PARTITION BY LIST (campaign_id)")
+    op.execute("ALTER SEQUENCE calls_id_seq OWNED BY calls.id")
+
+    conn = op.get_bind()
+    for (campaign_id,) in conn.execute(sa.text("SELECT id FROM campaigns")).fetchall():
+        op.execute(
+            f"CREATE TABLE calls_{uuid.UUID(campaign_id).hex} "
+            f"PARTITION OF calls FOR VALUES IN ('{campaign_id}')"
+        )
+
+    op.execute("INSERT INTO calls SELECT * FROM calls_unpartitioned")
+    op.execute("DROP TABLE calls_unpartitioned")
+
+    _create_indexes()
+
+
+def downgrade():
+    op.execute("ALTER TABLE calls RENAME TO calls_partitioned")
+    op.execute("ALTER TABLE calls_partitioned RENAME CONSTRAINT calls_pkey TO calls_partitioned_pkey")
+    op.execute(f"CREATE TABLE calls ({CALL_COLUMNS}, PRIMARY KEY (id))")
+    op.execute("ALTER SEQUENCE calls_id_seq OWNED BY calls.id")
+    op.execute("INSERT INTO calls SELECT * FROM calls_partitioned")
+    op.execute("DROP TABLE calls_partitioned CASCADE")
+    op.execute("CREATE INDEX ix_calls_calling ON calls (id) WHERE status = 'calling'")
+    op.execute(
+        "CREATE INDEX ix_calls_retry_due ON calls (campaign_id, next_attempt_at) "
+        "WHERE next_attempt_at IS NOT NULL"
+    )
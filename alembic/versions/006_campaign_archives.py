@@ -0,0 +1,25 @@
+"""summary rows for campaigns archived to disk
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+
+
+def upgrade():
+    op.create_table('campaign_archives',
+        sa.Column('campaign_id', sa.Text, sa.ForeignKey('campaigns.id'), primary_key=True),
+        sa.Column('path', sa.Text, nullable=False),
+        sa.Column('row_count', sa.Integer, nullable=False),
+        sa.Column('byte_size', sa.BigInteger),
+        sa.Column('stats', sa.Text),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table('campaign_archives')
@@ -0,0 +1,27 @@
+"""do-not-call / suppression list
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '007'
+down_revision = '006'
+
+
+def upgrade():
+    op.create_table('suppression_list',
+        sa.Column('phone', sa.Text, primary_key=True),
+        sa.Column('reason', sa.Text, nullable=False, server_default='opt_out'),
+        sa.Column('campaign_id', sa.Text),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+    )
+    op.create_index('ix_suppression_list_created_at', 'suppression_list', ['created_at'])
+    op.execute("CREATE INDEX ix_calls_phone ON calls (phone)")
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_calls_phone")
+    op.drop_index('ix_suppression_list_created_at', table_name='suppression_list')
+    op.drop_table('suppression_list')
@@ -0,0 +1,27 @@
+"""track which calls already received their previous-session outcome
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+
+
+def upgrade():
+    op.add_column('calls', sa.Column('session_outcome_applied', sa.Boolean, nullable=False, server_default=sa.false()))
+    # Calls that already got an outcome under the old per-row updates. interested is
+    # also set by Gemini analysis (which marks analysis_status completed), and a row
+    # it touched can't be told apart, so those are left for session-start to apply
+    op.execute("""
+        UPDATE calls SET session_outcome_applied = TRUE
+        WHERE conversation_id IS NOT NULL
+        AND interested IS NOT NULL
+        AND analysis_status IS DISTINCT FROM 'completed'
+    """)
+
+def downgrade():
+    op.drop_column('calls', 'session_outcome_applied')
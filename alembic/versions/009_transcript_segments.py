@@ -0,0 +1,25 @@
+"""append-only transcript segments
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '009'
+down_revision = '008'
+
+
+def upgrade():
+    op.create_table('transcript_segments',
+        sa.Column('call_sid', sa.Text, primary_key=True),
+        sa.Column('segment_id', sa.Text, primary_key=True),
+        sa.Column('seq', sa.BigInteger),
+        sa.Column('arrival', sa.BigInteger, sa.Identity(always=True), nullable=False),
+        sa.Column('role', sa.Text, nullable=False),
+        sa.Column('content', sa.Text, nullable=False),
+    )
+
+def downgrade():
+    op.drop_table('transcript_segments')
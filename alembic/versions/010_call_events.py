@@ -0,0 +1,27 @@
+"""append-only per-call lifecycle timeline
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '010'
+down_revision = '009'
+
+
+def upgrade():
+    # Narrow rows (uuid + int + smallint + timestamptz); stage codes live in app/models/call_states.py
+    op.create_table('call_events',
+        sa.Column('campaign_id', postgresql.UUID, nullable=False),
+        sa.Column('call_id', sa.Integer, nullable=False),
+        sa.Column('stage', sa.SmallInteger, nullable=False),
+        sa.Column('at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+    )
+    op.create_index('ix_call_events_call', 'call_events', ['campaign_id', 'call_id', 'stage', 'at'])
+
+def downgrade():
+    op.drop_index('ix_call_events_call', table_name='call_events')
+    op.drop_table('call_events')
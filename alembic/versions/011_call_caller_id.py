@@ -0,0 +1,20 @@
+"""caller ID each call was dialed from
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011'
+down_revision = '010'
+
+
+def upgrade():
+    op.add_column('calls', sa.Column('caller_id', sa.Text))
+    op.execute("CREATE INDEX ix_calls_caller_id ON calls (caller_id, id) WHERE caller_id IS NOT NULL")
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_calls_caller_id")
+    op.drop_column('calls', 'caller_id')
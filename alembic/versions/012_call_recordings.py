@@ -0,0 +1,32 @@
+"""local copies of call recordings
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '012'
+down_revision = '011'
+
+
+def upgrade():
+    op.add_column('calls', sa.Column('recording_status', sa.Text))
+    op.add_column('calls', sa.Column('recording_path', sa.Text))
+    op.add_column('calls', sa.Column('recording_bytes', sa.BigInteger))
+    op.add_column('calls', sa.Column('recording_sha256', sa.Text))
+    op.add_column('calls', sa.Column('recording_attempts', sa.Integer, nullable=False, server_default='0'))
+    op.add_column('calls', sa.Column('recording_next_attempt_at', sa.TIMESTAMP(timezone=True)))
+    op.execute(
+        "CREATE INDEX ix_calls_recording_due ON calls (recording_next_attempt_at) "
+        "WHERE recording_status = 'pending'"
+    )
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_calls_recording_due")
+    for column in (
+        'recording_next_attempt_at', 'recording_attempts', 'recording_sha256',
+        'recording_bytes', 'recording_path', 'recording_status',
+    ):
+        op.drop_column('calls', column)
@@ -0,0 +1,46 @@
+"""checkpointed analysis jobs
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '013'
+down_revision = '012'
+
+
+def upgrade():
+    op.create_table('analysis_jobs',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('campaign_id', sa.Text, sa.ForeignKey('campaigns.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('status', sa.Text, nullable=False, server_default='queued'),
+        sa.Column('owner', sa.Text),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True)),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('total_calls', sa.Integer),
+        # Checkpoint: calls are analysed in id order, everything up to here is done
+        sa.Column('last_call_id', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('batches_done', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('calls_done', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('calls_analyzed', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('error', sa.Text),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+        sa.Column('finished_at', sa.DateTime(timezone=True)),
+    )
+    # At most one live job per campaign; also what the claim query scans
+    op.execute(
+        "CREATE UNIQUE INDEX ux_analysis_jobs_active ON analysis_jobs (campaign_id) "
+        "WHERE status IN ('queued', 'running')"
+    )
+
+    # Runs left 'queued'/'processing' by the untracked pipeline become jobs and resume
+    op.execute("""
+        INSERT INTO analysis_jobs (campaign_id, status)
+        SELECT campaign_id, 'queued' FROM campaign_state
+        WHERE analysis_status IN ('queued', 'processing')
+    """)
+
+def downgrade():
+    op.drop_table('analysis_jobs')
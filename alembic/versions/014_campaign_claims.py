@@ -0,0 +1,22 @@
+"""claims on campaigns for background purge/archive work
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '014'
+down_revision = '013'
+
+
+def upgrade():
+    op.add_column('campaigns', sa.Column('claimed_by', sa.Text))
+    op.add_column('campaigns', sa.Column('claimed_until', sa.DateTime(timezone=True)))
+    op.execute("CREATE INDEX ix_campaigns_maintenance ON campaigns (status) WHERE status IN ('deleting', 'archiving')")
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_campaigns_maintenance")
+    op.drop_column('campaigns', 'claimed_until')
+    op.drop_column('campaigns', 'claimed_by')
@@ -0,0 +1,23 @@
+"""recent dials per caller ID, shared by all dialing processes
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '015'
+down_revision = '014'
+
+
+def upgrade():
+    op.create_table('caller_id_dials',
+        sa.Column('caller_id', sa.Text, nullable=False),
+        sa.Column('dialed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('NOW()')),
+    )
+    op.create_index('ix_caller_id_dials_caller', 'caller_id_dials', ['caller_id', 'dialed_at'])
+
+def downgrade():
+    op.drop_index('ix_caller_id_dials_caller', table_name='caller_id_dials')
+    op.drop_table('caller_id_dials')
@@ -0,0 +1,18 @@
+"""index on the normalised phone key used by the upload dedupe
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = '016'
+down_revision = '015'
+
+
+def upgrade():
+    # Must match call_repo.PHONE_KEY_SQL exactly for the planner to use it
+    op.execute("CREATE INDEX ix_calls_phone_key ON calls ((RIGHT(regexp_replace(phone, '[^0-9]', '', 'g'), 10)))")
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_calls_phone_key")
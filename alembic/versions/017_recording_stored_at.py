@@ -0,0 +1,23 @@
+"""when each recording was stored, for fetcher throughput from any process
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '017'
+down_revision = '016'
+
+
+def upgrade():
+    op.add_column('calls', sa.Column('recording_stored_at', sa.TIMESTAMP(timezone=True)))
+    op.execute(
+        "CREATE INDEX ix_calls_recording_stored_at ON calls (recording_stored_at) "
+        "WHERE recording_stored_at IS NOT NULL"
+    )
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_calls_recording_stored_at")
+    op.drop_column('calls', 'recording_stored_at')
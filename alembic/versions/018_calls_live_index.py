@@ -0,0 +1,23 @@
+"""partial index on calls connected to the bot, for the pacing live count
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '018'
+down_revision = '017'
+
+
+def upgrade():
+    op.create_index(
+        'ix_calls_live',
+        'calls',
+        ['campaign_id', 'id'],
+        postgresql_where=sa.text("status IN ('bot_connected', 'user_connected')"),
+    )
+
+def downgrade():
+    op.drop_index('ix_calls_live', table_name='calls')
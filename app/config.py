@@ -1,5 +1,6 @@
 # app/config.py
 import os
+import socket
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -9,16 +10,102 @@ class Settings:
         self.EXOTEL_API_KEY = os.getenv('EXOTEL_API_KEY')
         self.EXOTEL_API_TOKEN = os.getenv('EXOTEL_API_TOKEN')
         self.EXOTEL_SUBDOMAIN = os.getenv('EXOTEL_SUBDOMAIN')
+        # 'http' lets EXOTEL_SUBDOMAIN point at a local mock (benchmarks/loadtest)
+        self.EXOTEL_SCHEME = os.getenv('EXOTEL_SCHEME', 'https')
         self.EXOTEL_ACCOUNT_SID = os.getenv('EXOTEL_ACCOUNT_SID')
         self.EXOTEL_APP_SID = os.getenv('EXOTEL_APP_SID')
         self.EXOTEL_CALLER_ID = os.getenv('EXOTEL_CALLER_ID')
 
+        # Outbound number pool: comma-separated "number" or "number:app_sid"; defaults to the single caller ID
+        self.EXOTEL_CALLER_IDS = [
+            entry.strip()
+            for entry in os.getenv('EXOTEL_CALLER_IDS', self.EXOTEL_CALLER_ID or '').split(',')
+            if entry.strip()
+        ]
+        # Per-number cap over all dialing processes together (0 = uncapped)
+        self.CALLER_ID_DIALS_PER_MINUTE = int(os.getenv('CALLER_ID_DIALS_PER_MINUTE', '0'))
+        self.CALLER_ID_HEALTH_WINDOW = int(os.getenv('CALLER_ID_HEALTH_WINDOW', '100'))
+        self.CALLER_ID_MIN_HEALTH = float(os.getenv('CALLER_ID_MIN_HEALTH', '0.05'))
+        self.CALLER_ID_SYNC_SECONDS = int(os.getenv('CALLER_ID_SYNC_SECONDS', '60'))
+
         self.BACKEND_HOST = os.getenv('BACKEND_HOST', '0.0.0.0')
         self.BACKEND_PORT = int(os.getenv('BACKEND_PORT', '8000'))
 
         self.DB_PATH = os.getenv('DATABASE_PATH', 'call_campaign.db')
         self.CALL_INTERVAL_SECONDS = int(os.getenv('CALL_INTERVAL_SECONDS', '3'))
         self.CALL_DETAILS_FETCH_DELAY = int(os.getenv('CALL_DETAILS_FETCH_DELAY', '5'))
+        self.CALL_TIMEOUT_SECONDS = int(os.getenv('CALL_TIMEOUT_SECONDS', '600'))
+
+        # Per-campaign dial caps per minute, 0 = uncapped
+        self.FRESH_DIALS_PER_MINUTE = int(os.getenv('FRESH_DIALS_PER_MINUTE', '0'))
+        self.RETRY_DIALS_PER_MINUTE = int(os.getenv('RETRY_DIALS_PER_MINUTE', '5'))
+        self.RETRY_SCHEDULE_REFRESH_SECONDS = int(os.getenv('RETRY_SCHEDULE_REFRESH_SECONDS', '30'))
+
+        # Adaptive pacing: target concurrent bot sessions, 0 keeps the fixed CALL_INTERVAL_SECONDS
+        self.PACING_TARGET_SESSIONS = int(os.getenv('PACING_TARGET_SESSIONS', '0'))
+        self.PACING_WINDOW = int(os.getenv('PACING_WINDOW', '50'))
+        self.PACING_MIN_INTERVAL_SECONDS = float(os.getenv('PACING_MIN_INTERVAL_SECONDS', '0.5'))
+        self.PACING_MAX_INTERVAL_SECONDS = float(os.getenv('PACING_MAX_INTERVAL_SECONDS', '30'))
+        self.PACING_DEFAULT_TALK_SECONDS = float(os.getenv('PACING_DEFAULT_TALK_SECONDS', '90'))
+        self.PACING_SYNC_SECONDS = int(os.getenv('PACING_SYNC_SECONDS', '30'))
+
+        # Finished campaigns are moved out of the calls table into compressed files here, by the
+        # worker; with APP_MODE=api the API reads them too, so this must be storage both can see
+        self.ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+        self.ARCHIVE_POLL_SECONDS = int(os.getenv('ARCHIVE_POLL_SECONDS', '3600'))
+
+        # Deleted campaigns are purged in the background; unfinished purges are picked up again
+        self.PURGE_POLL_SECONDS = int(os.getenv('PURGE_POLL_SECONDS', '60'))
+        # A purge/archive claim not finished in this long is taken over by another process
+        self.CAMPAIGN_CLAIM_SECONDS = int(os.getenv('CAMPAIGN_CLAIM_SECONDS', '900'))
+
+        # Local copies of Exotel recordings, fetched in the background (0 concurrent downloads = off)
+        self.RECORDINGS_DIR = os.getenv('RECORDINGS_DIR', 'recordings')
+        self.RECORDING_CONCURRENCY = int(os.getenv('RECORDING_CONCURRENCY', '4'))
+        self.RECORDING_CHUNK_BYTES = int(os.getenv('RECORDING_CHUNK_BYTES', '262144'))
+        self.RECORDING_TIMEOUT_SECONDS = float(os.getenv('RECORDING_TIMEOUT_SECONDS', '60'))
+        self.RECORDING_RESUME_TRIES = int(os.getenv('RECORDING_RESUME_TRIES', '3'))
+        self.RECORDING_MAX_ATTEMPTS = int(os.getenv('RECORDING_MAX_ATTEMPTS', '5'))
+        self.RECORDING_RETRY_SECONDS = float(os.getenv('RECORDING_RETRY_SECONDS', '60'))
+        self.RECORDING_LEASE_SECONDS = float(os.getenv('RECORDING_LEASE_SECONDS', '900'))
+        self.RECORDING_POLL_SECONDS = int(os.getenv('RECORDING_POLL_SECONDS', '30'))
+
+        self.SUPPRESSION_BLOOM_CAPACITY = int(os.getenv('SUPPRESSION_BLOOM_CAPACITY', '1000000'))
+        self.SUPPRESSION_SYNC_SECONDS = int(os.getenv('SUPPRESSION_SYNC_SECONDS', '30'))
+
+        # CPU-heavy parsing above the threshold runs in a 'thread' or 'process' pool (0 workers = auto)
+        self.OFFLOAD_POOL = os.getenv('OFFLOAD_POOL', 'thread')
+        self.OFFLOAD_WORKERS = int(os.getenv('OFFLOAD_WORKERS', '0'))
+        self.OFFLOAD_THRESHOLD_BYTES = int(os.getenv('OFFLOAD_THRESHOLD_BYTES', '32768'))
+
+        # Large API responses are compressed (br if brotli is installed, else gzip) when the client accepts it
+        self.RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', '1024'))
+        self.RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+        self.RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '4'))
+
+        # Event-loop lag probe; loop steps longer than the threshold get a stack sample
+        self.LOOP_MONITOR_TICK_MS = float(os.getenv('LOOP_MONITOR_TICK_MS', '50'))
+        self.LOOP_BLOCK_THRESHOLD_MS = float(os.getenv('LOOP_BLOCK_THRESHOLD_MS', '100'))
+        self.LOOP_LAG_WINDOW = int(os.getenv('LOOP_LAG_WINDOW', '1200'))
+        self.LOOP_STALL_SAMPLES = int(os.getenv('LOOP_STALL_SAMPLES', '50'))
+
+        # Logging goes through a bounded queue to a writer thread; 'json' or 'text' lines on stdout
+        self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+        self.LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+        self.LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+        self.LOG_MAX_FIELD_CHARS = int(os.getenv('LOG_MAX_FIELD_CHARS', '500'))
+        self.LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', '100'))
+
+        # Connection pool, and how much of it only webhooks may use
+        self.DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+        self.DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+        self.DB_WEBHOOK_RESERVED = int(os.getenv('DB_WEBHOOK_RESERVED', '3'))
+        self.ADMISSION_API_TIMEOUT_SECONDS = float(os.getenv('ADMISSION_API_TIMEOUT_SECONDS', '2'))
+        self.ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', '5'))
+
+        # In-process call_sid -> call routing index used by webhooks
+        self.CALL_INDEX_MAX_ENTRIES = int(os.getenv('CALL_INDEX_MAX_ENTRIES', '100000'))
+        self.CALL_INDEX_TTL_SECONDS = int(os.getenv('CALL_INDEX_TTL_SECONDS', '7200'))
         
         self.REDIS_BROKER_URL = os.getenv('REDIS_BROKER_URL', 'redis://localhost:6379/0')
         self.REDIS_BACKEND_URL = os.getenv('REDIS_BACKEND_URL', 'redis://localhost:6379/1')
@@ -27,6 +114,32 @@ class Settings:
         self.DATABASE_URL = os.getenv('DATABASE_URL')
         self.SENTRY_DSN = os.getenv('SENTRY_DSN', '')
 
+        # Campaign ownership: each running campaign is dialed by the process holding its lease
+        self.WORKER_ID = os.getenv('WORKER_ID', f"{socket.gethostname()}:{os.getpid()}")
+        self.CAMPAIGN_LEASE_TTL_SECONDS = int(os.getenv('CAMPAIGN_LEASE_TTL_SECONDS', '60'))
+        self.CAMPAIGN_LEASE_POLL_SECONDS = int(os.getenv('CAMPAIGN_LEASE_POLL_SECONDS', '15'))
+        # Pause/delete wait this long for dialing to stop before returning anyway
+        self.CAMPAIGN_STOP_TIMEOUT_SECONDS = float(os.getenv('CAMPAIGN_STOP_TIMEOUT_SECONDS', '30'))
+
+        # 'all' runs API + dialer/analysis engines in one process, 'api' leaves the engines to worker.py
+        self.APP_MODE = os.getenv('APP_MODE', 'all')
+        self.RUN_ENGINES = self.APP_MODE != 'api'
+        self.ANALYSIS_QUEUE_POLL_SECONDS = int(os.getenv('ANALYSIS_QUEUE_POLL_SECONDS', '5'))
+        # Analysis jobs checkpoint every batch; a job whose heartbeat is this stale is taken over
+        self.ANALYSIS_BATCH_SIZE = int(os.getenv('ANALYSIS_BATCH_SIZE', '5'))
+        self.ANALYSIS_MAX_JOBS = int(os.getenv('ANALYSIS_MAX_JOBS', '2'))
+        self.ANALYSIS_HEARTBEAT_SECONDS = int(os.getenv('ANALYSIS_HEARTBEAT_SECONDS', '15'))
+        self.ANALYSIS_JOB_STALE_SECONDS = int(os.getenv('ANALYSIS_JOB_STALE_SECONDS', '90'))
+        # A batch that gets no results is retried with exponential backoff, then the job fails
+        self.ANALYSIS_BATCH_RETRIES = int(os.getenv('ANALYSIS_BATCH_RETRIES', '5'))
+        self.ANALYSIS_RETRY_SECONDS = float(os.getenv('ANALYSIS_RETRY_SECONDS', '10'))
+        self.ANALYSIS_RETRY_MAX_SECONDS = float(os.getenv('ANALYSIS_RETRY_MAX_SECONDS', '300'))
+
+        # Transcript analysis: 'gemini', or 'http' to POST batches to ANALYSIS_URL instead
+        self.ANALYSIS_BACKEND = os.getenv('ANALYSIS_BACKEND', 'gemini')
+        self.ANALYSIS_URL = os.getenv('ANALYSIS_URL')
+        self.ANALYSIS_TIMEOUT_SECONDS = float(os.getenv('ANALYSIS_TIMEOUT_SECONDS', '120'))
+
         # Optional: Validate required ones
         self._validate()
 
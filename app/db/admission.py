@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from app.config import settings
+
+# Highest priority first
+PRIORITIES = ("webhook", "api", "background")
+
+# Set per request by the HTTP middleware and per task by background loops
+_priority = contextvars.ContextVar("db_priority", default="background")
+
+
+def set_priority(priority: str):
+    _priority.set(priority)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class AdmissionController:
+    """
+    Gate in front of the connection pool, so callers queue here by priority
+    instead of on pool checkout in arrival order.
+
+    Webhooks may use every connection; API and background work stop
+    `webhook_reserved` short of that, so Exotel and bot callbacks always
+    find a connection free. Freed slots go to webhook waiters first. API
+    requests that can't get a slot within `api_timeout` are shed with a
+    503 rather than piling up behind the pool; background loops just wait.
+    """
+
+    def __init__(self, capacity: int, webhook_reserved: int, api_timeout: float, retry_after: int, window: int = 500):
+        self.capacity = capacity
+        self.webhook_reserved = min(webhook_reserved, capacity - 1)
+        self.api_timeout = api_timeout
+        self.retry_after = retry_after
+        self._in_use = 0
+        self._waiters = {priority: deque() for priority in PRIORITIES}
+        self._waits = {priority: deque(maxlen=window) for priority in PRIORITIES}
+        self._shed = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            capacity=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+            webhook_reserved=settings.DB_WEBHOOK_RESERVED,
+            api_timeout=settings.ADMISSION_API_TIMEOUT_SECONDS,
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        )
+
+    def _limit(self, priority: str) -> int:
+        return self.capacity if priority == "webhook" else self.capacity - self.webhook_reserved
+
+    def _queued_ahead(self, priority: str) -> bool:
+        for other in PRIORITIES:
+            if self._waiters[other]:
+                return True
+            if other == priority:
+                return False
+        return False
+
+    async def acquire(self, priority: str):
+        started = time.monotonic()
+
+        if self._in_use < self._limit(priority) and not self._queued_ahead(priority):
+            self._in_use += 1
+            self._waits[priority].append(0.0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        timeout = self.api_timeout if priority == "api" else None
+
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            # release() can hand over the slot just before the timeout cancels
+            # us (wait_for is built on asyncio.timeout from 3.12): it's ours
+            if waiter.done() and not waiter.cancelled():
+                self._waits[priority].append(time.monotonic() - started)
+                return
+            self._shed += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Database busy, retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        except asyncio.CancelledError:
+            # Handed a slot just as we were cancelled: give it back
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters[priority].remove(waiter)
+                except ValueError:
+                    pass
+
+        self._waits[priority].append(time.monotonic() - started)
+
+    def release(self):
+        self._in_use -= 1
+        for priority in PRIORITIES:
+            queue = self._waiters[priority]
+            while queue and self._in_use < self._limit(priority):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._in_use += 1
+                waiter.set_result(None)
+            if queue:
+                # Lower priorities don't jump a queue that is still waiting
+                return
+
+    @asynccontextmanager
+    async def admit(self, priority: str = None):
+        await self.acquire(priority or current_priority())
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        def wait_ms(waits):
+            ordered = sorted(waits)
+            if not ordered:
+                return {"samples": 0}
+            return {
+                "samples": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+                "p99_ms": round(ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+
+        return {
+            "capacity": self.capacity,
+            "webhook_reserved": self.webhook_reserved,
+            "in_use": self._in_use,
+            "waiting": {priority: len(queue) for priority, queue in self._waiters.items()},
+            "queue_wait": {priority: wait_ms(waits) for priority, waits in self._waits.items()},
+            "shed": self._shed,
+        }
+
+
+# One gate per process, sized to this process's engine
+admission = AdmissionController.from_settings()
@@ -1,11 +1,14 @@
+import asyncpg
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from contextlib import asynccontextmanager
 from app.config import settings
+from app.db.admission import admission
 
 engine = create_async_engine(
     settings.DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
 )
 
@@ -15,3 +18,15 @@ AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+@asynccontextmanager
+async def get_autocommit_conn():
+    """Connection outside a transaction block, for DDL such as DETACH PARTITION ... CONCURRENTLY"""
+    async with admission.admit(), engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        yield conn
+
+async def listen_connection() -> asyncpg.Connection:
+    """Dedicated asyncpg connection for LISTEN, outside the pool: it stays open for the life of the process"""
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return await asyncpg.connect(url.render_as_string(hide_password=False))
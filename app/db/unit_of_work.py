@@ -1,22 +1,56 @@
+from app.db.admission import admission
 from app.db.database import get_db
 from app.repositories.campaign_repo import CampaignRepository
 from app.repositories.call_repo import CallRepository
 from app.repositories.campaign_state_repo import CampaignStateRepository
+from app.repositories.archive_repo import ArchiveRepository
+from app.repositories.suppression_repo import SuppressionRepository
+from app.repositories.transcript_repo import TranscriptRepository
+from app.repositories.call_event_repo import CallEventRepository
+from app.repositories.recording_repo import RecordingRepository
+from app.repositories.analysis_job_repo import AnalysisJobRepository
+from app.repositories.caller_id_repo import CallerIdRepository
 
 
 class UnitOfWork:
+    """
+    One transaction on one pooled connection. Entry waits for admission at
+    `priority` (by default the current request's or task's priority); API
+    reads can be shed here with a 503.
+    """
+
+    def __init__(self, priority: str = None):
+        self.priority = priority
 
     async def __aenter__(self):
-        self._ctx = get_db()
-        self.conn = await self._ctx.__aenter__()
+        self._admission = admission.admit(self.priority)
+        await self._admission.__aenter__()
+        try:
+            self._ctx = get_db()
+            self.conn = await self._ctx.__aenter__()
+        except BaseException:
+            await self._admission.__aexit__(None, None, None)
+            raise
         self.campaigns = CampaignRepository(self.conn)
         self.calls = CallRepository(self.conn)
         self.states = CampaignStateRepository(self.conn)
+        self.archives = ArchiveRepository(self.conn)
+        self.suppressions = SuppressionRepository(self.conn)
+        self.transcripts = TranscriptRepository(self.conn)
+        self.events = CallEventRepository(self.conn)
+        self.recordings = RecordingRepository(self.conn)
+        self.analysis_jobs = AnalysisJobRepository(self.conn)
+        self.caller_ids = CallerIdRepository(self.conn)
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        if exc_type:
-            await self.conn.rollback()
-        else:
-            await self.conn.commit()
-        await self._ctx.__aexit__(exc_type, exc, tb)
+        try:
+            if exc_type:
+                await self.conn.rollback()
+            else:
+                await self.conn.commit()
+        finally:
+            try:
+                await self._ctx.__aexit__(exc_type, exc, tb)
+            finally:
+                await self._admission.__aexit__(None, None, None)
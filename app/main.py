@@ -1,35 +1,33 @@
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import datetime
 import asyncio
 from app.config import settings
 from app.utils.auth import verify_token
 from app.webhooks import session_wehbooks, transcript_webhook, status_callback
-from app.services.campaign_service import resume_campaigns
+from app.worker import start_engines
+from app.services.pacing import controller as pacing
 from app.routers import campaign_router
 from app.db.init_db import init_db
+from app.db.admission import admission, set_priority
 from app.routers import auth_router
-from app.db.unit_of_work import UnitOfWork
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
+from app.routers import suppression_router
+from app.services import caller_ids, recordings, suppression_service
+from app.utils import offload
+from app.utils.loop_monitor import monitor as loop_monitor
+from app.utils.log import dropped_records, setup_logging, shutdown_logging
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.routers.campaign_router import limiter
 
 
-async def orphan_cleanup_loop():
-    while True:
-        await asyncio.sleep(600)
-        try:
-            async with UnitOfWork() as uow:
-                await uow.calls.mark_stale_calling_as_failed(10)
-        except Exception as e:
-            print(f"Cleanup error: {e}")
-
-
   # multilingual (Hindi + English)
 
+# sentry_sdk is only imported when it's configured; it's a tenth of a second of startup otherwise
 if settings.SENTRY_DSN:
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+
     sentry_sdk.init(
         dsn=settings.SENTRY_DSN,
         integrations=[FastApiIntegration()],
@@ -47,29 +45,47 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def db_priority(request: Request, call_next):
+    # Exotel and bot callbacks can't be replayed; everything else may be shed under load
+    set_priority("webhook" if request.url.path.startswith("/webhooks/") else "api")
+    return await call_next(request)
+
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 @app.on_event("startup")
 async def startup_event():
+    setup_logging()
+
     print("\n" + "="*50)
     print("Call Campaign System - Starting")
     print("="*50)
     print(f"Backend: http://{settings.BACKEND_HOST}:{settings.BACKEND_PORT}")
     print(f"Database: {settings.DB_PATH}")
     print(f"Exotel Account: {settings.EXOTEL_ACCOUNT_SID}")
+    print(f"Mode: {settings.APP_MODE}")
     print("="*50 + "\n")
     
     init_db()
 
-    asyncio.create_task(orphan_cleanup_loop())
+    loop_monitor.start()
+
+    asyncio.create_task(suppression_service.sync_loop())
 
-    # Resume any campaigns that were running
-    asyncio.create_task(resume_campaigns())
+    # API-only processes leave dialing and analysis to worker.py
+    if settings.RUN_ENGINES:
+        start_engines()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    offload.shutdown()
+    shutdown_logging()
 
 
 @app.get("/")
-def health():
+async def health():
     return {
         "status": "alive",
         "timestamp": datetime.datetime.utcnow().isoformat(),
@@ -79,16 +95,28 @@ def health():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "loop": loop_monitor.snapshot(), "db": admission.snapshot()}
+
+@app.get("/debug/loop", dependencies=[Depends(verify_token)])
+async def debug_loop():
+    """Loop lag percentiles and stack samples of recent stalls, newest first"""
+    return {
+        **loop_monitor.snapshot(),
+        "log_records_dropped": dropped_records(),
+        "recent_stalls": loop_monitor.stalls(),
+    }
 
 @app.get("/config", dependencies=[Depends(verify_token)])
-def get_config():
+async def get_config():
     """Get current configuration (without sensitive data)"""
     return {
         "database": settings.DB_PATH,
         "exotel_account": settings.EXOTEL_ACCOUNT_SID,
         "call_interval": settings.CALL_INTERVAL_SECONDS,
-        "fetch_delay": settings.CALL_DETAILS_FETCH_DELAY
+        "fetch_delay": settings.CALL_DETAILS_FETCH_DELAY,
+        "pacing": pacing.snapshot(),
+        "caller_ids": caller_ids.pool.snapshot(),
+        "recordings": await recordings.stats()
     }
 
 app.include_router(transcript_webhook.router)
@@ -96,3 +124,4 @@ app.include_router(session_wehbooks.router)
 app.include_router(status_callback.router)
 app.include_router(campaign_router.router)
 app.include_router(auth_router.router)
+app.include_router(suppression_router.router)
@@ -0,0 +1,79 @@
+"""
+Call status state machine.
+
+Every status write is an event from TRANSITIONS, mapping each status the
+event may leave to the status it lands in. A status missing from an
+event's map means the event is ignored for calls in that status
+(duplicate or out-of-order webhooks, calls already timed out, ...).
+"""
+
+# Dialed and not yet given a final status by Exotel
+IN_FLIGHT = ("calling", "bot_connected", "user_connected", "bot_end", "user_end")
+
+# Statuses Exotel's status callback (or call details) can report
+EXOTEL_FINAL = ("completed", "missed", "failed", "rejected")
+
+# Can be dialed again once next_attempt_at is due
+RETRYABLE = ("failed", "missed")
+
+TRANSITIONS = {
+    # Dialer
+    "dial": {"pending": "calling", **{status: "calling" for status in RETRYABLE}},
+    "api_error": {"calling": "failed"},
+    "timeout": {"calling": "failed"},
+    "suppress": {"pending": "suppressed", **{status: "suppressed" for status in RETRYABLE}},
+
+    # Bot webhooks. session_start may arrive after transcript events have
+    # already connected the call and still has to record conversation_id.
+    "session_start": {"pending": "bot_connected", "calling": "bot_connected", "bot_connected": "bot_connected"},
+    "transcript": {"pending": "bot_connected", "calling": "bot_connected"},
+    # When Exotel reported completion first, only the duration is recorded
+    "session_end": {
+        "calling": "bot_end",
+        "bot_connected": "bot_end",
+        "user_connected": "user_end",
+        "completed": "completed",
+    },
+
+    # Exotel status callback / call details
+    **{
+        f"exotel_{final}": {status: final for status in IN_FLIGHT}
+        for final in EXOTEL_FINAL
+    },
+}
+
+# Timeline stage codes stored in call_events.stage; append only, never renumber
+STAGES = {
+    "dialed": 1,
+    "sid_assigned": 2,
+    "bot_connected": 3,
+    "user_connected": 4,
+    "bot_end": 5,
+    "user_end": 6,
+    "completed": 7,
+    "missed": 8,
+    "failed": 9,
+    "rejected": 10,
+    "suppressed": 11,
+    "transcript_ready": 12,
+    "analyzed": 13,
+}
+
+# Status a transition lands in -> timeline stage it records
+STATUS_STAGES = {
+    "calling": "dialed",
+    **{status: status for status in ("bot_connected", "user_connected", "bot_end", "user_end", "suppressed")},
+    **{status: status for status in EXOTEL_FINAL},
+}
+
+# Spans reported by the timeline percentiles: (start stages, end stages).
+# Each end event is measured from the latest start event before it, so
+# retried calls contribute one sample per attempt.
+TIMELINE_SPANS = {
+    "dial_to_sid": (("dialed",), ("sid_assigned",)),
+    "dial_to_bot_connect": (("dialed",), ("bot_connected",)),
+    "talk": (("bot_connected", "user_connected"), ("bot_end", "user_end")),
+    "hangup_to_transcript": (("bot_end", "user_end"), ("transcript_ready",)),
+    "transcript_to_analysis": (("transcript_ready",), ("analyzed",)),
+    "dial_to_outcome": (("dialed",), EXOTEL_FINAL),
+}
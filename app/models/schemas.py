@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
 from typing import Optional, List
 
 class CallRecord(BaseModel):
@@ -21,3 +22,63 @@ class CampaignResponse(BaseModel):
     completed_calls: int
     failed_calls: int
     created_at: str
+
+class SuppressionRequest(BaseModel):
+    phones: List[str]
+    reason: Optional[str] = 'opt_out'
+
+# Response shapes for the campaign read endpoints. They document the API;
+# the routes serialise rows directly, so they are never validated against
+# (extra="allow" because the rows are SELECT * and grow with migrations).
+
+class CampaignSummary(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    name: str
+    created_at: str
+    status: Optional[str] = None
+    total_calls: Optional[int] = None
+    completed_calls: Optional[int] = None
+    failed_calls: Optional[int] = None
+    is_running: Optional[int] = None
+
+class CallRow(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: int
+    campaign_id: str
+    name: str
+    phone: str
+    status: Optional[str] = None
+    call_sid: Optional[str] = None
+    caller_id: Optional[str] = None
+    duration: Optional[int] = None
+    retry_count: Optional[int] = None
+    next_attempt_at: Optional[datetime] = None
+    recording_url: Optional[str] = None
+    recording_status: Optional[str] = None
+    transcript: Optional[str] = None
+    preferred_city: Optional[str] = None
+    interested: Optional[str] = None
+    feedback: Optional[str] = None
+    analysis_status: Optional[str] = None
+
+class CampaignStateRow(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    campaign_id: str
+    is_running: Optional[int] = None
+    current_index: Optional[int] = None
+    analysis_status: Optional[str] = None
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+
+class CampaignListResponse(BaseModel):
+    campaigns: List[CampaignSummary]
+
+class CampaignDetailResponse(BaseModel):
+    campaign: CampaignSummary
+    calls: List[CallRow]
+    state: Optional[CampaignStateRow] = None
+    analysis_status: Optional[str] = None
@@ -0,0 +1,113 @@
+from sqlalchemy import text
+
+ACTIVE = "('queued', 'running')"
+
+
+class AnalysisJobRepository:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def create(self, campaign_id: str):
+        """Queue a job for the campaign's unanalysed transcripts; None if one is already queued or running"""
+        result = await self.conn.execute(text(f"""
+            INSERT INTO analysis_jobs (campaign_id, total_calls)
+            SELECT :campaign_id, COUNT(*)
+            FROM calls
+            WHERE campaign_id = :campaign_id
+            AND transcript IS NOT NULL
+            AND analysis_status = 'pending'
+            ON CONFLICT (campaign_id) WHERE status IN {ACTIVE} DO NOTHING
+            RETURNING id
+        """), {"campaign_id": campaign_id})
+        row = result.fetchone()
+        return row._mapping["id"] if row else None
+
+    async def claim(self, owner: str, stale_seconds: float, running_ids: list):
+        """
+        Take the oldest queued job, or a running one that is abandoned: its
+        heartbeat expired, or it carries our own worker id but isn't among
+        `running_ids` (left over from before a restart).
+        """
+        result = await self.conn.execute(text(f"""
+            UPDATE analysis_jobs
+            SET status = 'running',
+                owner = :owner,
+                heartbeat_at = NOW(),
+                attempts = attempts + 1
+            WHERE id = (
+                SELECT id FROM analysis_jobs
+                WHERE status IN {ACTIVE}
+                AND (
+                    status = 'queued'
+                    OR heartbeat_at < NOW() - make_interval(secs => CAST(:stale AS float8))
+                    OR owner = :owner
+                )
+                AND NOT (id = ANY(CAST(:running_ids AS integer[])))
+                ORDER BY created_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, campaign_id, last_call_id, batches_done, calls_done, attempts
+        """), {"owner": owner, "stale": stale_seconds, "running_ids": running_ids})
+        row = result.fetchone()
+        return dict(row._mapping) if row else None
+
+    async def next_batch(self, campaign_id: str, after_call_id: int, limit: int):
+        result = await self.conn.execute(text("""
+            SELECT id, call_sid, transcript
+            FROM calls
+            WHERE campaign_id = :campaign_id
+            AND id > :after
+            AND transcript IS NOT NULL
+            AND analysis_status = 'pending'
+            ORDER BY id
+            LIMIT :limit
+        """), {"campaign_id": campaign_id, "after": after_call_id, "limit": limit})
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def heartbeat(self, job_id: int, owner: str):
+        """False once the job is no longer ours (reclaimed after a missed heartbeat)"""
+        result = await self.conn.execute(text("""
+            UPDATE analysis_jobs
+            SET heartbeat_at = NOW()
+            WHERE id = :id AND owner = :owner AND status = 'running'
+            RETURNING id
+        """), {"id": job_id, "owner": owner})
+        return result.fetchone() is not None
+
+    async def checkpoint(self, job_id: int, owner: str, last_call_id: int, calls: int, analyzed: int):
+        result = await self.conn.execute(text("""
+            UPDATE analysis_jobs
+            SET last_call_id = :last_call_id,
+                batches_done = batches_done + 1,
+                calls_done = calls_done + :calls,
+                calls_analyzed = calls_analyzed + :analyzed,
+                heartbeat_at = NOW()
+            WHERE id = :id AND owner = :owner AND status = 'running'
+            RETURNING id
+        """), {"last_call_id": last_call_id, "calls": calls, "analyzed": analyzed, "id": job_id, "owner": owner})
+        return result.fetchone() is not None
+
+    async def finish(self, job_id: int, owner: str, status: str, error: str = None):
+        result = await self.conn.execute(text("""
+            UPDATE analysis_jobs
+            SET status = :status,
+                error = :error,
+                finished_at = NOW()
+            WHERE id = :id AND owner = :owner AND status = 'running'
+            RETURNING id
+        """), {"status": status, "error": error, "id": job_id, "owner": owner})
+        return result.fetchone() is not None
+
+    async def latest(self, campaign_id: str):
+        result = await self.conn.execute(text("""
+            SELECT id, status, attempts, total_calls, batches_done, calls_done, calls_analyzed,
+                   heartbeat_at, created_at, finished_at, error
+            FROM analysis_jobs
+            WHERE campaign_id = :campaign_id
+            ORDER BY id DESC
+            LIMIT 1
+        """), {"campaign_id": campaign_id})
+        row = result.fetchone()
+        return dict(row._mapping) if row else None
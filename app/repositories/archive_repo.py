@@ -0,0 +1,76 @@
+import json
+from sqlalchemy import text
+
+
+class ArchiveRepository:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def create(self, campaign_id: str, path: str, row_count: int, byte_size: int, stats: dict):
+        await self.conn.execute(text("""
+            INSERT INTO campaign_archives (campaign_id, path, row_count, byte_size, stats, archived_at)
+            VALUES (:campaign_id, :path, :row_count, :byte_size, :stats, NOW())
+            ON CONFLICT (campaign_id) DO UPDATE
+            SET path = EXCLUDED.path,
+                row_count = EXCLUDED.row_count,
+                byte_size = EXCLUDED.byte_size,
+                stats = EXCLUDED.stats,
+                archived_at = EXCLUDED.archived_at
+        """), {
+            "campaign_id": campaign_id,
+            "path": path,
+            "row_count": row_count,
+            "byte_size": byte_size,
+            "stats": json.dumps(stats, default=str)
+        })
+
+    async def get(self, campaign_id: str):
+        result = await self.conn.execute(text(
+            "SELECT * FROM campaign_archives WHERE campaign_id = :campaign_id"
+        ), {"campaign_id": campaign_id})
+        row = result.fetchone()
+        if not row:
+            return None
+        archive = dict(row._mapping)
+        archive["stats"] = json.loads(archive["stats"]) if archive["stats"] else {}
+        return archive
+
+    async def delete(self, campaign_id: str):
+        await self.conn.execute(text(
+            "DELETE FROM campaign_archives WHERE campaign_id = :campaign_id"
+        ), {"campaign_id": campaign_id})
+
+    async def claim_archivable(self, owner: str, claim_seconds: int, limit: int = 10):
+        """
+        Claim finished, analysed campaigns with no recording left to fetch
+        by moving them to 'archiving', plus 'archiving' ones whose claim
+        lapsed (failed, or their process died). SKIP LOCKED keeps two
+        processes off the same one.
+        """
+        result = await self.conn.execute(text("""
+            UPDATE campaigns
+            SET status = 'archiving',
+                claimed_by = :owner,
+                claimed_until = NOW() + make_interval(secs => CAST(:claim_seconds AS float8))
+            WHERE id IN (
+                SELECT c.id
+                FROM campaigns c
+                JOIN campaign_state cs ON cs.campaign_id = c.id
+                WHERE (
+                    (c.status = 'completed' AND cs.analysis_status = 'completed' AND cs.is_running = 0)
+                    OR (c.status = 'archiving' AND (c.claimed_until IS NULL OR c.claimed_until < NOW()))
+                )
+                AND NOT EXISTS (SELECT 1 FROM campaign_archives a WHERE a.campaign_id = c.id)
+                -- Recordings still to fetch need their rows; they end stored or failed
+                AND NOT EXISTS (
+                    SELECT 1 FROM calls k
+                    WHERE k.campaign_id = c.id AND k.recording_status = 'pending'
+                )
+                ORDER BY c.id
+                LIMIT :limit
+                FOR UPDATE OF c SKIP LOCKED
+            )
+            RETURNING id
+        """), {"owner": owner, "claim_seconds": claim_seconds, "limit": limit})
+        return [row._mapping["id"] for row in result.fetchall()]
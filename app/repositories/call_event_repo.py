@@ -0,0 +1,79 @@
+from sqlalchemy import text
+from app.models.call_states import STAGES, TIMELINE_SPANS
+
+
+def timeline_insert(source: str, stage_sql: str) -> str:
+    """
+    CTE body appending a timeline event for every row of `source` (a CTE
+    with campaign_id and id columns), so transitions record their event
+    in the same statement that makes them.
+    """
+    return f"""
+        INSERT INTO call_events (campaign_id, call_id, stage)
+        SELECT CAST(campaign_id AS uuid), id, {stage_sql}
+        FROM {source}
+    """
+
+
+class CallEventRepository:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def span_percentiles(self, campaign_id: str):
+        """p50/p90/p99 seconds for each TIMELINE_SPANS entry, measured per attempt"""
+        pairs = [
+            (name, STAGES[start], STAGES[end])
+            for name, (starts, ends) in TIMELINE_SPANS.items()
+            for start in starts
+            for end in ends
+        ]
+        result = await self.conn.execute(text("""
+            SELECT p.span,
+                   COUNT(*) AS samples,
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY d.seconds) AS p50,
+                   percentile_cont(0.9) WITHIN GROUP (ORDER BY d.seconds) AS p90,
+                   percentile_cont(0.99) WITHIN GROUP (ORDER BY d.seconds) AS p99,
+                   MAX(d.seconds) AS max
+            FROM unnest(
+                CAST(:spans AS text[]),
+                CAST(:starts AS smallint[]),
+                CAST(:ends AS smallint[])
+            ) AS p(span, start_stage, end_stage)
+            JOIN call_events e
+              ON e.campaign_id = CAST(:campaign_id AS uuid)
+             AND e.stage = p.end_stage
+            CROSS JOIN LATERAL (
+                SELECT EXTRACT(EPOCH FROM e.at - MAX(s.at))::float8 AS seconds
+                FROM call_events s
+                WHERE s.campaign_id = e.campaign_id
+                AND s.call_id = e.call_id
+                AND s.stage = p.start_stage
+                AND s.at <= e.at
+            ) d
+            WHERE d.seconds IS NOT NULL
+            GROUP BY p.span
+        """), {
+            "campaign_id": campaign_id,
+            "spans": [pair[0] for pair in pairs],
+            "starts": [pair[1] for pair in pairs],
+            "ends": [pair[2] for pair in pairs],
+        })
+        return {row._mapping["span"]: {
+            key: row._mapping[key] for key in ("samples", "p50", "p90", "p99", "max")
+        } for row in result.fetchall()}
+
+    async def stage_counts(self, campaign_id: str):
+        result = await self.conn.execute(text("""
+            SELECT stage, COUNT(*) AS events
+            FROM call_events
+            WHERE campaign_id = CAST(:campaign_id AS uuid)
+            GROUP BY stage
+        """), {"campaign_id": campaign_id})
+        names = {code: name for name, code in STAGES.items()}
+        return {names.get(row._mapping["stage"], row._mapping["stage"]): row._mapping["events"] for row in result.fetchall()}
+
+    async def delete_for_campaign(self, campaign_id: str):
+        await self.conn.execute(text(
+            "DELETE FROM call_events WHERE campaign_id = CAST(:campaign_id AS uuid)"
+        ), {"campaign_id": campaign_id})
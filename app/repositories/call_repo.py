@@ -1,4 +1,45 @@
+import uuid
 from sqlalchemy import text
+from app.models.call_states import IN_FLIGHT, RETRYABLE, STAGES, STATUS_STAGES, TRANSITIONS
+from app.repositories.call_event_repo import timeline_insert
+from app.repositories.recording_repo import RECORDING_PENDING_SQL
+
+# helper.normalize_phone in SQL; ix_calls_phone_key indexes exactly this expression
+PHONE_KEY_SQL = "RIGHT(regexp_replace(phone, '[^0-9]', '', 'g'), 10)"
+
+# Next attempt after another failure, computed from the pre-update row;
+# used with the params from _policy_params
+RETRY_AT_SQL = """CASE
+    WHEN old.retry_count + 1 <= :max_retries
+    THEN NOW() + make_interval(secs => LEAST(
+        CAST(:base AS float8) * power(CAST(:factor AS float8), old.retry_count),
+        CAST(:max_delay AS float8)
+    ))
+END"""
+
+
+def partition_name(campaign_id: str) -> str:
+    """calls is list-partitioned by campaign; campaign ids are UUIDs, which also keeps this safe to interpolate"""
+    return f"calls_{uuid.UUID(campaign_id).hex}"
+
+
+def match_call(call_sid: str, route=None):
+    """
+    WHERE clause and params for a webhook's call: by primary key (one
+    partition) when the routing index knows the call, else by call_sid.
+    """
+    if route:
+        return "campaign_id = :campaign_id AND id = :id", {"campaign_id": route.campaign_id, "id": route.id}
+    return "call_sid = :call_sid", {"call_sid": call_sid}
+
+
+def _policy_params(policy) -> dict:
+    return {
+        "base": policy.base_seconds,
+        "factor": policy.factor,
+        "max_retries": policy.max_retries,
+        "max_delay": policy.max_delay_seconds
+    }
 
 
 class CallRepository:
@@ -6,40 +47,120 @@ class CallRepository:
     def __init__(self, conn):
         self.conn = conn
 
-    async def mark_calling(self, call_id: int, timestamp: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = 'calling',
-                timestamp = :timestamp
-            WHERE id = :id
-        """), {"timestamp": timestamp, "id": call_id})
+    async def transition(self, event: str, where: str, params: dict, assignments: dict = None, campaign_id: str = None):
+        """
+        Apply a state-machine event to the calls matched by `where` in a
+        single statement, appending a call_events row for every status
+        change. Rows whose status the event doesn't allow are left alone. `assignments` are extra column = expression pairs,
+        where `c.` is the row being updated and `old.` the row before the
+        update. Returns the rows that moved, with from_status and
+        to_status. Pass `campaign_id` when known so only one partition is
+        touched.
+        """
+        mapping = TRANSITIONS[event]
+        status_case = " ".join(f"WHEN '{old}' THEN '{new}'" for old, new in mapping.items())
+        stage_case = " ".join(
+            f"WHEN '{new}' THEN {STAGES[STATUS_STAGES[new]]}" for new in set(mapping.values())
+        )
+        extra = "".join(f", {column} = {expr}" for column, expr in (assignments or {}).items())
+        params = {**params, "allowed_from": list(mapping)}
+        prune = ""
+        if campaign_id:
+            prune = "AND c.campaign_id = :prune_campaign_id"
+            params["prune_campaign_id"] = campaign_id
 
-    async def save_call_sid(self, call_id: int, call_sid: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET call_sid = :call_sid
-            WHERE id = :id
-        """), {"call_sid": call_sid, "id": call_id})
+        result = await self.conn.execute(text(f"""
+            WITH moved AS (
+                UPDATE calls c
+                SET status = CASE old.status {status_case} END{extra}
+                FROM (
+                    SELECT campaign_id, id, status, retry_count
+                    FROM calls
+                    WHERE {where}
+                    AND status = ANY(:allowed_from)
+                    FOR UPDATE
+                ) old
+                WHERE c.campaign_id = old.campaign_id
+                AND c.id = old.id
+                {prune}
+                RETURNING c.id, c.campaign_id, c.call_sid, old.status AS from_status,
+                          c.status AS to_status, c.retry_count, c.next_attempt_at
+            ),
+            changed AS (
+                SELECT * FROM moved WHERE from_status <> to_status
+            ),
+            timeline AS ({timeline_insert("changed", f"CASE to_status {stage_case} END")})
+            SELECT * FROM moved
+        """), params)
+        return [dict(row._mapping) for row in result.fetchall()]
 
-    async def mark_failed(self, call_id: int, error_msg: str, timestamp: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = 'failed',
-                error_message = :error_msg,
-                retry_count = retry_count + 1,
-                timestamp = :timestamp
-            WHERE id = :id
-        """), {"error_msg": error_msg, "timestamp": timestamp, "id": call_id})
-
-    async def update_after_fetch(self, call_id: int, status: str, duration: int, recording_url: str, timestamp: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = :status,
-                duration = :duration,
-                recording_url = :recording_url,
-                timestamp = :timestamp
-            WHERE id = :id
-        """), {"status": status, "duration": duration, "recording_url": recording_url, "timestamp": timestamp, "id": call_id})
+    async def _transition_one(self, event: str, call_sid: str, route=None, assignments: dict = None, params: dict = None):
+        where, match_params = match_call(call_sid, route)
+        rows = await self.transition(
+            event,
+            where,
+            {**match_params, **(params or {})},
+            assignments,
+            route.campaign_id if route else None
+        )
+        return rows[0] if rows else None
+
+    async def mark_calling(self, campaign_id: str, call_id: int, timestamp: str, caller_id: str = None):
+        """Returns False when the call is no longer dialable (suppressed, already dialed, ...)"""
+        rows = await self.transition(
+            "dial",
+            "campaign_id = :campaign_id AND id = :id",
+            {"timestamp": timestamp, "caller_id": caller_id, "campaign_id": campaign_id, "id": call_id},
+            {"timestamp": ":timestamp", "caller_id": ":caller_id", "next_attempt_at": "NULL"},
+            campaign_id
+        )
+        return bool(rows)
+
+    async def save_call_sid(self, campaign_id: str, call_id: int, call_sid: str):
+        await self.conn.execute(text(f"""
+            WITH saved AS (
+                UPDATE calls
+                SET call_sid = :call_sid
+                WHERE campaign_id = :campaign_id AND id = :id
+                RETURNING campaign_id, id
+            )
+            {timeline_insert("saved", str(STAGES["sid_assigned"]))}
+        """), {"call_sid": call_sid, "campaign_id": campaign_id, "id": call_id})
+
+    async def mark_failed(self, campaign_id: str, call_id: int, error_msg: str, timestamp: str, retry_policy=None):
+        """Fail an attempt that is still 'calling'; returns the moved row with its next_attempt_at"""
+        params = {"error_msg": error_msg, "timestamp": timestamp, "campaign_id": campaign_id, "id": call_id}
+        if retry_policy:
+            params.update(_policy_params(retry_policy))
+
+        rows = await self.transition(
+            "api_error",
+            "campaign_id = :campaign_id AND id = :id",
+            params,
+            {
+                "error_message": ":error_msg",
+                "retry_count": "c.retry_count + 1",
+                "timestamp": ":timestamp",
+                "next_attempt_at": RETRY_AT_SQL if retry_policy else "NULL",
+            },
+            campaign_id
+        )
+        return rows[0] if rows else None
+
+    async def update_after_fetch(self, campaign_id: str, call_id: int, status: str, duration: int, recording_url: str, timestamp: str):
+        rows = await self.transition(
+            f"exotel_{status}",
+            "campaign_id = :campaign_id AND id = :id",
+            {"duration": duration, "recording_url": recording_url, "timestamp": timestamp, "campaign_id": campaign_id, "id": call_id},
+            {
+                "duration": ":duration",
+                "recording_url": ":recording_url",
+                "recording_status": RECORDING_PENDING_SQL,
+                "timestamp": ":timestamp"
+            },
+            campaign_id
+        )
+        return bool(rows)
 
     async def insert_calls_bulk(self, campaign_id, calls):
         for call in calls:
@@ -56,6 +177,31 @@ class CallRepository:
                 "recording_url": call.recording_url
             })
 
+    async def find_phones_in_running_campaigns(self, keys: list):
+        """
+        Which of the normalised phone `keys` a running campaign may still
+        dial; stored numbers are normalised the way helper.normalize_phone
+        does, through the ix_calls_phone_key expression index.
+        """
+        result = await self.conn.execute(text(f"""
+            SELECT DISTINCT {PHONE_KEY_SQL} AS phone_key
+            FROM calls c
+            JOIN campaign_state cs ON cs.campaign_id = c.campaign_id
+            WHERE cs.is_running = 1
+            AND {PHONE_KEY_SQL} = ANY(CAST(:keys AS text[]))
+            AND c.status IN ('pending', 'calling', 'failed', 'missed')
+        """), {"keys": list(keys)})
+        return {row._mapping["phone_key"] for row in result.fetchall()}
+
+    async def mark_suppressed(self, campaign_id: str, call_id: int):
+        await self.transition(
+            "suppress",
+            "campaign_id = :campaign_id AND id = :id",
+            {"campaign_id": campaign_id, "id": call_id},
+            {"next_attempt_at": "NULL"},
+            campaign_id
+        )
+
     async def get_next_pending_call(self, campaign_id):
         result = await self.conn.execute(text("""
             SELECT * FROM calls
@@ -66,69 +212,88 @@ class CallRepository:
         row = result.fetchone()
         return dict(row._mapping) if row else None
 
-    async def mark_bot_connected(self, call_sid: str, conversation_id: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = 'bot_connected',
-                conversation_id = COALESCE(conversation_id, :conversation_id)
-            WHERE call_sid = :call_sid
-        """), {"conversation_id": conversation_id, "call_sid": call_sid})
+    async def mark_bot_connected(self, call_sid: str, conversation_id: str = None, route=None):
+        """session-start when a conversation_id is given, otherwise the first transcript event"""
+        if conversation_id is None:
+            return await self._transition_one("transcript", call_sid, route)
+        return await self._transition_one(
+            "session_start",
+            call_sid,
+            route,
+            {"conversation_id": "COALESCE(c.conversation_id, :conversation_id)"},
+            {"conversation_id": conversation_id}
+        )
 
-    async def exists_by_conversation(self, conversation_id: str):
-        result = await self.conn.execute(text(
-            "SELECT id FROM calls WHERE conversation_id = :conversation_id"
-        ), {"conversation_id": conversation_id})
-        return result.fetchone() is not None
-
-    async def update_justification_and_interest(self, conversation_id: str, preferred_city: str, justification: str, interested: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET feedback = COALESCE(feedback, '') || :justification,
-                interested = :interested,
-                preferred_city = COALESCE(preferred_city, :preferred_city)
-            WHERE conversation_id = :conversation_id
+    async def apply_session_outcomes(self, outcomes: list):
+        """
+        Apply previous-session outcomes {conversation_id, preferred_city,
+        justification, interested} in one statement. Calls that already
+        received their outcome are skipped; returns the ones updated.
+        """
+        result = await self.conn.execute(text("""
+            UPDATE calls c
+            SET feedback = COALESCE(c.feedback, '') || v.justification,
+                interested = v.interested,
+                preferred_city = COALESCE(c.preferred_city, v.preferred_city),
+                session_outcome_applied = TRUE
+            FROM unnest(
+                CAST(:conversation_ids AS text[]),
+                CAST(:cities AS text[]),
+                CAST(:justifications AS text[]),
+                CAST(:interested AS text[])
+            ) AS v(conversation_id, preferred_city, justification, interested)
+            WHERE c.conversation_id = v.conversation_id
+            AND NOT c.session_outcome_applied
+            RETURNING c.conversation_id
         """), {
-            "justification": justification,
-            "interested": interested,
-            "preferred_city": preferred_city,
-            "conversation_id": conversation_id
+            "conversation_ids": [o["conversation_id"] for o in outcomes],
+            "cities": [o["preferred_city"] for o in outcomes],
+            "justifications": [o["justification"] for o in outcomes],
+            "interested": [o["interested"] for o in outcomes]
         })
+        return [row._mapping["conversation_id"] for row in result.fetchall()]
 
     # ---------- SESSION END ----------
 
-    async def mark_session_end(self, call_sid: str, new_status: str, duration: int):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = :new_status,
-                duration = :duration
-            WHERE call_sid = :call_sid
-        """), {"new_status": new_status, "duration": duration, "call_sid": call_sid})
-
-    async def get_call_status_and_campaign(self, call_sid: str):
-        result = await self.conn.execute(text(
-            "SELECT status, campaign_id FROM calls WHERE call_sid = :call_sid"
-        ), {"call_sid": call_sid})
-        return result.fetchone()
+    async def mark_session_end(self, call_sid: str, duration: int, route=None):
+        """bot_end, or user_end when the user was connected; returns the moved row"""
+        return await self._transition_one(
+            "session_end",
+            call_sid,
+            route,
+            {"duration": ":duration"},
+            {"duration": duration}
+        )
 
     async def update_status_from_callback(
         self,
         call_sid: str,
         final_status: str,
         recording_url: str,
-        timestamp: str
+        timestamp: str,
+        retry_policy=None,
+        route=None
     ):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = :final_status,
-                recording_url = COALESCE(:recording_url, recording_url),
-                timestamp = :timestamp
-            WHERE call_sid = :call_sid
-        """), {
-            "final_status": final_status,
-            "recording_url": recording_url,
-            "timestamp": timestamp,
-            "call_sid": call_sid
-        })
+        """
+        Apply Exotel's final status; with a retry policy the attempt counts
+        as a failure and the next attempt is scheduled from the row's own
+        retry_count. Returns the moved row, or None for a duplicate or
+        stale callback.
+        """
+        assignments = {
+            "recording_url": "COALESCE(:recording_url, c.recording_url)",
+            "recording_status": RECORDING_PENDING_SQL,
+            "timestamp": ":timestamp",
+            "next_attempt_at": "NULL",
+        }
+        params = {"recording_url": recording_url, "timestamp": timestamp}
+
+        if retry_policy:
+            assignments["retry_count"] = "c.retry_count + 1"
+            assignments["next_attempt_at"] = RETRY_AT_SQL
+            params.update(_policy_params(retry_policy))
+
+        return await self._transition_one(f"exotel_{final_status}", call_sid, route, assignments, params)
 
     async def update_preferred_city(self, call_sid: str, city: str):
         await self.conn.execute(text("""
@@ -137,29 +302,6 @@ class CallRepository:
             WHERE call_sid = :call_sid
         """), {"city": city, "call_sid": call_sid})
 
-    async def get_status_by_sid(self, call_sid: str):
-        result = await self.conn.execute(text(
-            "SELECT status FROM calls WHERE call_sid = :call_sid"
-        ), {"call_sid": call_sid})
-        return result.fetchone()
-
-    async def mark_bot_connected_if_needed(self, call_sid: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = 'bot_connected'
-            WHERE call_sid = :call_sid
-            AND status NOT IN (
-                'bot_connected',
-                'user_connected',
-                'completed',
-                'failed',
-                'missed',
-                'rejected',
-                'bot_end',
-                'user_end'
-            )
-        """), {"call_sid": call_sid})
-
     async def get_by_campaign(self, campaign_id: str):
         result = await self.conn.execute(text("""
             SELECT * FROM calls
@@ -168,6 +310,16 @@ class CallRepository:
         """), {"campaign_id": campaign_id})
         return [dict(row._mapping) for row in result.fetchall()]
 
+    async def stream_by_campaign(self, campaign_id: str, columns: list, chunk_size: int = 1000):
+        """Yield lists of row dicts from a server-side cursor instead of materialising the campaign"""
+        result = await self.conn.stream(text(f"""
+            SELECT {", ".join(columns)} FROM calls
+            WHERE campaign_id = :campaign_id
+            ORDER BY id ASC
+        """), {"campaign_id": campaign_id}, execution_options={"yield_per": chunk_size})
+        async for rows in result.partitions(chunk_size):
+            yield [dict(row._mapping) for row in rows]
+
     async def get_campaign_stats(self, campaign_id: str):
         result = await self.conn.execute(text("""
             SELECT
@@ -176,7 +328,7 @@ class CallRepository:
                 SUM(CASE WHEN status IN ('failed','missed','rejected') THEN 1 ELSE 0 END) AS failed,
                 SUM(CASE WHEN status IN ('pending','calling','bot_connected','user_connected') THEN 1 ELSE 0 END) AS pending,
                 SUM(CASE
-                    WHEN status IN ('completed','failed','missed','rejected','bot_end','user_end')
+                    WHEN status IN ('completed','failed','missed','rejected','bot_end','user_end','suppressed')
                     THEN 1 ELSE 0
                 END) AS done,
                 (SELECT analysis_status FROM campaign_state WHERE campaign_id = :campaign_id) AS analysis_status
@@ -192,8 +344,46 @@ class CallRepository:
         row = result.fetchone()
         return dict(row._mapping) if row else None
 
-    async def delete_by_campaign(self, campaign_id: str):
-        await self.conn.execute(text("DELETE FROM calls WHERE campaign_id = :campaign_id"), {"campaign_id": campaign_id})
+    # ---------- PARTITIONS ----------
+
+    async def create_partition(self, campaign_id: str):
+        # Build standalone and attach: ATTACH only takes SHARE UPDATE EXCLUSIVE on calls
+        name = partition_name(campaign_id)
+        await self.conn.execute(text(
+            f"CREATE TABLE {name} (LIKE calls INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        await self.conn.execute(text(
+            f"ALTER TABLE calls ATTACH PARTITION {name} FOR VALUES IN ('{campaign_id}')"
+        ))
+
+    async def partition_exists(self, campaign_id: str):
+        result = await self.conn.execute(text("""
+            SELECT 1 FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'calls'::regclass AND c.relname = :name
+        """), {"name": partition_name(campaign_id)})
+        return result.fetchone() is not None
+
+    async def detach_partition(self, campaign_id: str):
+        """Needs an autocommit connection: CONCURRENTLY cannot run inside a transaction block"""
+        await self.conn.execute(text(
+            f"ALTER TABLE calls DETACH PARTITION {partition_name(campaign_id)} CONCURRENTLY"
+        ))
+
+    async def drop_detached_partition(self, campaign_id: str):
+        await self.conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(campaign_id)}"))
+
+    async def delete_chunk_by_campaign(self, campaign_id: str, chunk_size: int):
+        result = await self.conn.execute(text("""
+            DELETE FROM calls
+            WHERE campaign_id = :campaign_id
+            AND id IN (
+                SELECT id FROM calls
+                WHERE campaign_id = :campaign_id
+                LIMIT :chunk_size
+            )
+        """), {"campaign_id": campaign_id, "chunk_size": chunk_size})
+        return result.rowcount
 
     async def get_all_pending(self, campaign_id):
         result = await self.conn.execute(text("""
@@ -214,12 +404,32 @@ class CallRepository:
         row = result.fetchone()
         return row._mapping["count"]
 
-    async def update_transcript(self, call_sid: str, transcript: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET transcript = :transcript, analysis_status = 'pending'
-            WHERE call_sid = :call_sid
-        """), {"transcript": transcript, "call_sid": call_sid})
+    async def count_unfinished(self, campaign_id: str):
+        """Calls that may still be dialed or change outcome: pending, in flight, or with a retry scheduled"""
+        result = await self.conn.execute(text("""
+            SELECT COUNT(*) AS count
+            FROM calls
+            WHERE campaign_id = :campaign_id
+            AND (
+                status = 'pending'
+                OR status = ANY(CAST(:in_flight AS text[]))
+                OR (status = ANY(CAST(:retryable AS text[])) AND next_attempt_at IS NOT NULL)
+            )
+        """), {"campaign_id": campaign_id, "in_flight": list(IN_FLIGHT), "retryable": list(RETRYABLE)})
+        return result.fetchone()._mapping["count"]
+
+    async def update_transcript(self, call_sid: str, transcript: str, route=None):
+        where, params = match_call(call_sid, route)
+        await self.conn.execute(text(f"""
+            WITH updated AS (
+                UPDATE calls
+                SET transcript = :transcript, analysis_status = 'pending'
+                WHERE {where}
+                AND transcript IS DISTINCT FROM CAST(:transcript AS text)
+                RETURNING campaign_id, id
+            )
+            {timeline_insert("updated", str(STAGES["transcript_ready"]))}
+        """), {"transcript": transcript, **params})
 
     async def mark_call_analysis_failed(self, call_sid: str, error: str):
         await self.conn.execute(text("""
@@ -229,22 +439,95 @@ class CallRepository:
             WHERE call_sid = :call_sid
         """), {"error": error, "call_sid": call_sid})
 
-    async def get_next_pending_or_retryable(self, campaign_id: str):
+    async def get_scheduled_retries(self, campaign_id: str):
         result = await self.conn.execute(text("""
-            SELECT * FROM calls
+            SELECT id, EXTRACT(EPOCH FROM next_attempt_at)::float8 AS due
+            FROM calls
             WHERE campaign_id = :campaign_id
-            AND (status = 'pending' OR (status = 'failed' AND retry_count < 3))
-            ORDER BY id ASC
-            LIMIT 1
+            AND next_attempt_at IS NOT NULL
+            AND status IN ('failed', 'missed')
         """), {"campaign_id": campaign_id})
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def get_due_retry(self, campaign_id: str, call_id: int):
+        result = await self.conn.execute(text("""
+            SELECT * FROM calls
+            WHERE campaign_id = :campaign_id
+            AND id = :id
+            AND status IN ('failed', 'missed')
+            AND next_attempt_at <= NOW()
+        """), {"campaign_id": campaign_id, "id": call_id})
         row = result.fetchone()
         return dict(row._mapping) if row else None
 
-    async def mark_stale_calling_as_failed(self, cutoff_minutes: int = 10):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET status = 'failed',
-                error_message = 'call timed out - marked by cleanup'
+    async def get_recent_outcomes(self, limit: int):
+        result = await self.conn.execute(text("""
+            SELECT status IN ('bot_connected', 'user_connected', 'bot_end', 'user_end', 'completed') AS answered,
+                   duration
+            FROM calls
+            WHERE status IN ('bot_connected', 'user_connected', 'bot_end', 'user_end', 'completed',
+                             'missed', 'rejected', 'failed')
+            ORDER BY id DESC
+            LIMIT :limit
+        """), {"limit": limit})
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def count_live_sessions(self, stale_seconds: float) -> int:
+        """Calls connected to the bot right now, ignoring ones connected longer than `stale_seconds` ago"""
+        result = await self.conn.execute(text(f"""
+            SELECT COUNT(*)
+            FROM calls c
+            WHERE c.status IN ('bot_connected', 'user_connected')
+            AND EXISTS (
+                SELECT 1 FROM call_events e
+                WHERE e.campaign_id = CAST(c.campaign_id AS uuid)
+                AND e.call_id = c.id
+                AND e.stage IN ({STAGES["bot_connected"]}, {STAGES["user_connected"]})
+                AND e.at > NOW() - make_interval(secs => CAST(:stale_seconds AS float8))
+            )
+        """), {"stale_seconds": stale_seconds})
+        return result.scalar()
+
+    async def get_caller_id_outcomes(self, caller_ids: list, window: int):
+        """Answered/rejected counts over each caller ID's last `window` finished calls"""
+        result = await self.conn.execute(text("""
+            SELECT n.caller_id,
+                   COUNT(*) FILTER (
+                       WHERE r.status IN ('bot_connected', 'user_connected', 'bot_end', 'user_end', 'completed')
+                   ) AS answered,
+                   COUNT(*) FILTER (WHERE r.status = 'rejected') AS rejected,
+                   COUNT(r.status) AS total
+            FROM unnest(CAST(:caller_ids AS text[])) AS n(caller_id)
+            LEFT JOIN LATERAL (
+                SELECT status
+                FROM calls
+                WHERE caller_id = n.caller_id
+                AND status IN ('bot_connected', 'user_connected', 'bot_end', 'user_end', 'completed',
+                               'missed', 'rejected', 'failed')
+                ORDER BY id DESC
+                LIMIT :window
+            ) r ON TRUE
+            GROUP BY n.caller_id
+        """), {"caller_ids": caller_ids, "window": window})
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def get_calling_ages(self):
+        result = await self.conn.execute(text("""
+            SELECT id,
+                   EXTRACT(EPOCH FROM NOW() - timestamp::timestamptz)::float8 AS age_seconds
+            FROM calls
             WHERE status = 'calling'
-            AND timestamp < NOW() - INTERVAL ':minutes minutes'
-        """), {"minutes": cutoff_minutes})
+        """))
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def mark_calls_timed_out(self, call_ids: list, policy):
+        return await self.transition(
+            "timeout",
+            "id = ANY(:ids)",
+            {"ids": list(call_ids), **_policy_params(policy)},
+            {
+                "error_message": "'call timed out - no status callback'",
+                "retry_count": "c.retry_count + 1",
+                "next_attempt_at": RETRY_AT_SQL,
+            }
+        )
@@ -0,0 +1,53 @@
+from sqlalchemy import text
+
+
+class CallerIdRepository:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def reserve_dial(self, caller_id: str, per_minute: int) -> dict:
+        """
+        Take one of the caller ID's `per_minute` dials for the sliding minute,
+        across every process. Reservations for one number are serialised by
+        a transaction-scoped advisory lock. Returns the dials counted,
+        whether this one was granted, and when refused, the seconds until a
+        slot frees up.
+        """
+        params = {"caller_id": caller_id}
+        await self.conn.execute(text(
+            "SELECT pg_advisory_xact_lock(hashtext('caller_id_dials:' || :caller_id))"
+        ), params)
+        await self.conn.execute(text("""
+            DELETE FROM caller_id_dials
+            WHERE caller_id = :caller_id
+            AND dialed_at <= NOW() - INTERVAL '1 minute'
+        """), params)
+
+        result = await self.conn.execute(text("""
+            SELECT COUNT(*) AS dials,
+                   CAST(EXTRACT(EPOCH FROM MIN(dialed_at) + INTERVAL '1 minute' - NOW()) AS float8) AS wait_seconds
+            FROM caller_id_dials
+            WHERE caller_id = :caller_id
+        """), params)
+        row = result.fetchone()._mapping
+
+        if row["dials"] >= per_minute:
+            return {"granted": False, "dials": row["dials"], "wait_seconds": max(row["wait_seconds"] or 0.0, 0.0)}
+
+        await self.conn.execute(text(
+            "INSERT INTO caller_id_dials (caller_id, dialed_at) VALUES (:caller_id, NOW())"
+        ), params)
+        return {"granted": True, "dials": row["dials"] + 1, "wait_seconds": 0.0}
+
+    async def release_dial(self, caller_id: str):
+        """Hand back a reserved dial that was never placed. Rows are interchangeable, so the newest goes"""
+        await self.conn.execute(text("""
+            DELETE FROM caller_id_dials
+            WHERE ctid = (
+                SELECT ctid FROM caller_id_dials
+                WHERE caller_id = :caller_id
+                ORDER BY dialed_at DESC
+                LIMIT 1
+            )
+        """), {"caller_id": caller_id})
@@ -62,13 +62,65 @@ class CampaignRepository:
                 FROM campaigns c
                 LEFT JOIN campaign_state cs
                     ON c.id = cs.campaign_id
+                WHERE c.status <> 'deleting'
                 ORDER BY c.created_at DESC
             """))
         return [dict(row._mapping) for row in result.fetchall()]
 
     async def get_by_id(self, campaign_id: str):
+        """None for unknown campaigns and for deleted ones still being purged"""
         result = await self.conn.execute(text(
-                "SELECT * FROM campaigns WHERE id = :campaign_id"
+                "SELECT * FROM campaigns WHERE id = :campaign_id AND status <> 'deleting'"
             ), {"campaign_id": campaign_id})
         row = result.fetchone()
         return dict(row._mapping) if row else None
+
+    async def mark_deleting(self, campaign_id: str, owner: str, claim_seconds: int):
+        """
+        Hide the campaign and claim its purge for `owner`; purge_loop takes over
+        if the claim lapses. With no owner the purge is left for the next sweep.
+        """
+        await self.conn.execute(text("""
+                UPDATE campaigns
+                SET status = 'deleting',
+                    claimed_by = CAST(:owner AS text),
+                    claimed_until = CASE WHEN CAST(:owner AS text) IS NULL THEN NULL
+                        ELSE NOW() + make_interval(secs => CAST(:claim_seconds AS float8)) END
+                WHERE id = :campaign_id
+            """), {"campaign_id": campaign_id, "owner": owner, "claim_seconds": claim_seconds})
+
+    async def claim_deleting(self, owner: str, claim_seconds: int, limit: int = 10):
+        """Claim deleted campaigns whose purge nobody is working on (never started, failed, or owner died)"""
+        result = await self.conn.execute(text("""
+                UPDATE campaigns
+                SET claimed_by = :owner,
+                    claimed_until = NOW() + make_interval(secs => CAST(:claim_seconds AS float8))
+                WHERE id IN (
+                    SELECT id FROM campaigns
+                    WHERE status = 'deleting'
+                    AND (claimed_until IS NULL OR claimed_until < NOW())
+                    ORDER BY id
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id
+            """), {"owner": owner, "claim_seconds": claim_seconds, "limit": limit})
+        return [row._mapping["id"] for row in result.fetchall()]
+
+    async def mark_archived(self, campaign_id: str, owner: str) -> bool:
+        """False if the archive claim has been taken over by another process"""
+        result = await self.conn.execute(text("""
+                UPDATE campaigns
+                SET status = 'archived', claimed_by = NULL, claimed_until = NULL
+                WHERE id = :campaign_id AND status = 'archiving' AND claimed_by = :owner
+                RETURNING id
+            """), {"campaign_id": campaign_id, "owner": owner})
+        return result.fetchone() is not None
+
+    async def release_claim(self, campaign_id: str, owner: str):
+        """Let another process retry straight away instead of waiting out the claim"""
+        await self.conn.execute(text("""
+                UPDATE campaigns
+                SET claimed_until = NULL
+                WHERE id = :campaign_id AND claimed_by = :owner
+            """), {"campaign_id": campaign_id, "owner": owner})
@@ -1,4 +1,10 @@
+import json
 from sqlalchemy import text
+from app.models.call_states import STAGES
+from app.repositories.call_event_repo import timeline_insert
+
+# LISTEN/NOTIFY channel for pause/resume/delete (app.services.campaign_control)
+CONTROL_CHANNEL = "campaign_control"
 
 
 class CampaignStateRepository:
@@ -34,6 +40,64 @@ class CampaignStateRepository:
         """))
         return result.fetchall()
 
+    async def get_unowned_running_campaigns(self):
+        result = await self.conn.execute(text("""
+            SELECT campaign_id FROM campaign_state
+            WHERE is_running = 1
+            AND (lease_owner IS NULL OR lease_expires_at < NOW())
+        """))
+        return result.fetchall()
+
+    async def acquire_lease(self, campaign_id: str, owner: str, ttl_seconds: int):
+        result = await self.conn.execute(text("""
+            UPDATE campaign_state
+            SET lease_owner = :owner,
+                lease_expires_at = NOW() + make_interval(secs => :ttl)
+            WHERE campaign_id = :campaign_id
+            AND is_running = 1
+            AND (lease_owner IS NULL OR lease_owner = :owner OR lease_expires_at < NOW())
+            RETURNING campaign_id
+        """), {"owner": owner, "ttl": float(ttl_seconds), "campaign_id": campaign_id})
+        return result.fetchone() is not None
+
+    async def renew_lease(self, campaign_id: str, owner: str, ttl_seconds: int):
+        """Extend the lease; returns False if the campaign stopped running or the lease was taken over."""
+        result = await self.conn.execute(text("""
+            UPDATE campaign_state
+            SET lease_expires_at = NOW() + make_interval(secs => :ttl)
+            WHERE campaign_id = :campaign_id
+            AND lease_owner = :owner
+            AND is_running = 1
+            RETURNING campaign_id
+        """), {"owner": owner, "ttl": float(ttl_seconds), "campaign_id": campaign_id})
+        return result.fetchone() is not None
+
+    async def is_leased(self, campaign_id: str):
+        """True while some process holds an unexpired lease on the campaign"""
+        result = await self.conn.execute(text("""
+            SELECT 1 FROM campaign_state
+            WHERE campaign_id = :campaign_id
+            AND lease_owner IS NOT NULL
+            AND lease_expires_at > NOW()
+        """), {"campaign_id": campaign_id})
+        return result.fetchone() is not None
+
+    async def notify_control(self, campaign_id: str, action: str):
+        """Tell every process's dial loops to pause, resume or delete; delivered when the transaction commits"""
+        await self.conn.execute(text("SELECT pg_notify(:channel, :payload)"), {
+            "channel": CONTROL_CHANNEL,
+            "payload": json.dumps({"campaign_id": campaign_id, "action": action})
+        })
+
+    async def release_lease(self, campaign_id: str, owner: str):
+        await self.conn.execute(text("""
+            UPDATE campaign_state
+            SET lease_owner = NULL,
+                lease_expires_at = NULL
+            WHERE campaign_id = :campaign_id
+            AND lease_owner = :owner
+        """), {"owner": owner, "campaign_id": campaign_id})
+
     async def delete(self, campaign_id):
         await self.conn.execute(text(
             "DELETE FROM campaign_state WHERE campaign_id = :campaign_id"
@@ -73,16 +137,6 @@ class CampaignStateRepository:
         row = result.fetchone()
         return dict(row._mapping) if row else None
 
-    async def get_calls_for_analysis(self, campaign_id: str):
-        result = await self.conn.execute(text("""
-            SELECT *
-            FROM calls
-            WHERE campaign_id = :campaign_id
-            AND transcript IS NOT NULL
-            AND analysis_status = 'pending'
-        """), {"campaign_id": campaign_id})
-        return result.fetchall()
-
     async def update_analysis_status(self, campaign_id: str, status: str):
         await self.conn.execute(text("""
             UPDATE campaign_state
@@ -90,12 +144,19 @@ class CampaignStateRepository:
             WHERE campaign_id = :campaign_id
         """), {"status": status, "campaign_id": campaign_id})
 
-    async def update_analysis_result(self, call_sid: str, city: str, interest: str, outcome: str):
-        await self.conn.execute(text("""
-            UPDATE calls
-            SET preferred_city = :city,
-                interested = :interest,
-                feedback = :outcome,
-                analysis_status = 'completed'
-            WHERE call_sid = :call_sid
-        """), {"city": city, "interest": interest, "outcome": outcome, "call_sid": call_sid})
+    async def update_analysis_result(self, campaign_id: str, call_sid: str, city: str, interest: str, outcome: str):
+        await self.conn.execute(text(f"""
+            WITH analyzed AS (
+                UPDATE calls
+                SET preferred_city = :city,
+                    interested = :interest,
+                    feedback = :outcome,
+                    analysis_status = 'completed'
+                WHERE campaign_id = :campaign_id AND call_sid = :call_sid
+                -- A retried batch writing the same result records no second event
+                AND (preferred_city, interested, feedback, analysis_status)
+                    IS DISTINCT FROM (CAST(:city AS text), CAST(:interest AS text), CAST(:outcome AS text), 'completed')
+                RETURNING campaign_id, id
+            )
+            {timeline_insert("analyzed", str(STAGES["analyzed"]))}
+        """), {"city": city, "interest": interest, "outcome": outcome, "campaign_id": campaign_id, "call_sid": call_sid})
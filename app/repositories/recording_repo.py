@@ -0,0 +1,95 @@
+from sqlalchemy import text
+
+# recording_status is NULL until a call has a recording_url, then
+# pending -> stored, or failed once attempts run out or the URL is gone.
+RECORDING_PENDING_SQL = """CASE
+    WHEN c.recording_status IS NULL AND COALESCE(:recording_url, c.recording_url) IS NOT NULL
+    THEN 'pending'
+    ELSE c.recording_status
+END"""
+
+
+class RecordingRepository:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def claim_due(self, limit: int, lease_seconds: float):
+        """
+        Take up to `limit` pending recordings across all campaigns. The claim
+        is a lease on recording_next_attempt_at, so a download lost with its
+        process comes due again once the lease runs out.
+        """
+        result = await self.conn.execute(text("""
+            UPDATE calls c
+            SET recording_attempts = c.recording_attempts + 1,
+                recording_next_attempt_at = NOW() + make_interval(secs => CAST(:lease AS float8))
+            FROM (
+                SELECT campaign_id, id
+                FROM calls
+                WHERE recording_status = 'pending'
+                AND (recording_next_attempt_at IS NULL OR recording_next_attempt_at <= NOW())
+                ORDER BY recording_next_attempt_at NULLS FIRST
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            ) due
+            WHERE c.campaign_id = due.campaign_id
+            AND c.id = due.id
+            RETURNING c.campaign_id, c.id, c.recording_url, c.recording_attempts
+        """), {"limit": limit, "lease": lease_seconds})
+        return [dict(row._mapping) for row in result.fetchall()]
+
+    async def mark_stored(self, campaign_id: str, call_id: int, path: str, byte_size: int, sha256: str):
+        await self.conn.execute(text("""
+            UPDATE calls
+            SET recording_status = 'stored',
+                recording_path = :path,
+                recording_bytes = :bytes,
+                recording_sha256 = :sha256,
+                recording_next_attempt_at = NULL,
+                recording_stored_at = NOW()
+            WHERE campaign_id = :campaign_id AND id = :id
+        """), {"path": path, "bytes": byte_size, "sha256": sha256, "campaign_id": campaign_id, "id": call_id})
+
+    async def mark_attempt_failed(self, campaign_id: str, call_id: int, permanent: bool, max_attempts: int, retry_seconds: float):
+        """Back off exponentially from the attempt count; give up when out of attempts or `permanent`"""
+        await self.conn.execute(text("""
+            UPDATE calls
+            SET recording_status = CASE
+                    WHEN :permanent OR recording_attempts >= :max_attempts THEN 'failed'
+                    ELSE 'pending'
+                END,
+                recording_next_attempt_at = CASE
+                    WHEN :permanent OR recording_attempts >= :max_attempts THEN NULL
+                    ELSE NOW() + make_interval(secs => CAST(:retry_seconds AS float8) * power(2, recording_attempts - 1))
+                END
+            WHERE campaign_id = :campaign_id AND id = :id
+        """), {
+            "permanent": permanent,
+            "max_attempts": max_attempts,
+            "retry_seconds": retry_seconds,
+            "campaign_id": campaign_id,
+            "id": call_id
+        })
+
+
+    async def stats(self, window_seconds: float) -> dict:
+        """
+        Fetcher progress as every process sees it: the pending backlog and what
+        was stored in the last `window_seconds`, whichever worker stored it.
+        Both scans stay on the partial indexes.
+        """
+        result = await self.conn.execute(text("""
+            SELECT
+                (SELECT COUNT(*) FROM calls WHERE recording_status = 'pending') AS pending,
+                (SELECT COUNT(*) FROM calls
+                    WHERE recording_status = 'pending'
+                    AND (recording_next_attempt_at IS NULL OR recording_next_attempt_at <= NOW())) AS due,
+                recent.stored, recent.bytes
+            FROM (
+                SELECT COUNT(*) AS stored, COALESCE(SUM(recording_bytes), 0) AS bytes
+                FROM calls
+                WHERE recording_stored_at > NOW() - make_interval(secs => CAST(:window AS float8))
+            ) recent
+        """), {"window": window_seconds})
+        return dict(result.fetchone()._mapping)
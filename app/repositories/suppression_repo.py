@@ -0,0 +1,43 @@
+from sqlalchemy import text
+
+
+class SuppressionRepository:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def add_many(self, phones: list, reason: str, campaign_id: str = None):
+        await self.conn.execute(text("""
+            INSERT INTO suppression_list (phone, reason, campaign_id)
+            SELECT phone, :reason, :campaign_id FROM unnest(CAST(:phones AS text[])) AS phone
+            ON CONFLICT (phone) DO NOTHING
+        """), {"phones": list(phones), "reason": reason, "campaign_id": campaign_id})
+
+    async def remove(self, phone: str):
+        await self.conn.execute(text(
+            "DELETE FROM suppression_list WHERE phone = :phone"
+        ), {"phone": phone})
+
+    async def find_existing(self, phones: list):
+        result = await self.conn.execute(text("""
+            SELECT phone FROM suppression_list
+            WHERE phone = ANY(:phones)
+        """), {"phones": list(phones)})
+        return {row._mapping["phone"] for row in result.fetchall()}
+
+    async def get(self, phone: str):
+        result = await self.conn.execute(text(
+            "SELECT * FROM suppression_list WHERE phone = :phone"
+        ), {"phone": phone})
+        row = result.fetchone()
+        return dict(row._mapping) if row else None
+
+    async def stream_since(self, since=None, chunk_size: int = 10000):
+        """Phones added after `since` (all of them when None), with their created_at"""
+        result = await self.conn.stream(text("""
+            SELECT phone, created_at FROM suppression_list
+            WHERE CAST(:since AS timestamptz) IS NULL OR created_at > CAST(:since AS timestamptz)
+            ORDER BY created_at ASC
+        """), {"since": since}, execution_options={"yield_per": chunk_size})
+        async for rows in result.partitions(chunk_size):
+            yield [dict(row._mapping) for row in rows]
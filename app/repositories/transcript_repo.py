@@ -0,0 +1,67 @@
+from sqlalchemy import text
+from app.models.call_states import STAGES
+from app.repositories.call_event_repo import timeline_insert
+from app.repositories.call_repo import match_call
+
+
+class TranscriptRepository:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def append_segments(self, call_sid: str, segments: list):
+        """Segments are already normalised; re-delivered ones are dropped by the (call_sid, segment_id) key"""
+        await self.conn.execute(text("""
+            INSERT INTO transcript_segments (call_sid, segment_id, seq, role, content)
+            SELECT :call_sid, s.segment_id, s.seq, s.role, s.content
+            FROM unnest(
+                CAST(:segment_ids AS text[]),
+                CAST(:seqs AS bigint[]),
+                CAST(:roles AS text[]),
+                CAST(:contents AS text[])
+            ) AS s(segment_id, seq, role, content)
+            ON CONFLICT (call_sid, segment_id) DO NOTHING
+        """), {
+            "call_sid": call_sid,
+            "segment_ids": [s["segment_id"] for s in segments],
+            "seqs": [s["seq"] for s in segments],
+            "roles": [s["role"] for s in segments],
+            "contents": [s["content"] for s in segments]
+        })
+
+    async def finalize_transcript(self, call_sid: str, route=None):
+        """
+        Write the assembled transcript onto the call. A redelivered session-end
+        that assembles the same transcript changes nothing and records no
+        timeline event; returns whether the transcript changed.
+        """
+        where, params = match_call(call_sid, route)
+        result = await self.conn.execute(text(f"""
+            WITH finalized AS (
+                UPDATE calls
+                SET transcript = t.transcript,
+                    analysis_status = 'pending'
+                FROM (
+                    SELECT string_agg(role || ': ' || content, E'\\n' ORDER BY seq NULLS LAST, arrival) AS transcript
+                    FROM transcript_segments
+                    WHERE call_sid = :call_sid
+                ) t
+                WHERE {where}
+                AND t.transcript IS NOT NULL
+                AND calls.transcript IS DISTINCT FROM t.transcript
+                RETURNING calls.campaign_id, calls.id
+            ),
+            timeline AS ({timeline_insert("finalized", str(STAGES["transcript_ready"]))})
+            SELECT COUNT(*) AS finalized FROM finalized
+        """), {"call_sid": call_sid, **params})
+        return result.scalar() > 0
+
+    async def delete_for_campaign(self, campaign_id: str):
+        await self.conn.execute(text("""
+            DELETE FROM transcript_segments
+            WHERE call_sid IN (
+                SELECT call_sid FROM calls
+                WHERE campaign_id = :campaign_id
+                AND call_sid IS NOT NULL
+            )
+        """), {"campaign_id": campaign_id})
@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends, Request
-from app.models.schemas import CampaignCreate
-from app.services import campaign_service
+from fastapi.responses import StreamingResponse
+from app.models.schemas import CampaignCreate, CampaignDetailResponse, CampaignListResponse
+from app.services import campaign_service, export_service
 from app.utils.auth import verify_token
+from app.utils.json_response import FastJSONResponse, json_response
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 limiter = Limiter(key_func=get_remote_address)
 
-router = APIRouter(prefix="/api/campaigns", tags=["Campaigns"],dependencies=[Depends(verify_token)])
+router = APIRouter(
+    prefix="/api/campaigns",
+    tags=["Campaigns"],
+    dependencies=[Depends(verify_token)],
+    default_response_class=FastJSONResponse
+)
 
 
 @router.post("/upload")
@@ -37,14 +44,27 @@ async def analyze_campaign(campaign_id: str):
 # async def get_analysis_status_func(campaign_id: str):
 #     return await campaign_service.get_analysis_status_and_calls_func(campaign_id)
 
-@router.get("")
-async def list_campaigns():
-    return await campaign_service.list_campaigns()
+# The read endpoints return whole campaigns; they skip jsonable_encoder and are compressed when accepted
+@router.get("", response_model=CampaignListResponse)
+async def list_campaigns(request: Request):
+    return await json_response(request, await campaign_service.list_campaigns())
 
 
-@router.get("/{campaign_id}")
-async def get_campaign(campaign_id: str):
-    return await campaign_service.get_campaign(campaign_id)
+@router.get("/{campaign_id}", response_model=CampaignDetailResponse)
+async def get_campaign(campaign_id: str, request: Request):
+    return await json_response(request, await campaign_service.get_campaign(campaign_id))
+
+
+@router.get("/{campaign_id}/export")
+async def export_campaign(campaign_id: str, request: Request, format: str = "csv"):
+    body = await export_service.export_campaign(campaign_id, format)
+    headers = {"Content-Disposition": f'attachment; filename="{campaign_id}.{format}"'}
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = export_service.gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type=export_service.MEDIA_TYPES[format], headers=headers)
 
 
 @router.get("/{campaign_id}/stats")
@@ -52,6 +72,11 @@ async def get_stats(campaign_id: str):
     return await campaign_service.get_campaign_stats(campaign_id)
 
 
+@router.get("/{campaign_id}/timeline")
+async def get_timeline(campaign_id: str):
+    return await campaign_service.get_campaign_timeline(campaign_id)
+
+
 @router.delete("/{campaign_id}")
 async def delete_campaign(campaign_id: str):
     return await campaign_service.delete_campaign(campaign_id)
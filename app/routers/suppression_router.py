@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.models.schemas import SuppressionRequest
+from app.services import suppression_service
+from app.db.unit_of_work import UnitOfWork
+from app.utils.auth import verify_token
+from app.utils.helper import normalize_phone
+
+router = APIRouter(prefix="/api/suppression", tags=["Suppression"], dependencies=[Depends(verify_token)])
+
+
+@router.post("")
+async def suppress_numbers(data: SuppressionRequest):
+    added = await suppression_service.suppress(data.phones, data.reason)
+    return {"status": "suppressed", "count": len(added)}
+
+
+@router.get("/{phone}")
+async def get_suppression(phone: str):
+    async with UnitOfWork() as uow:
+        entry = await uow.suppressions.get(normalize_phone(phone))
+    if not entry:
+        raise HTTPException(status_code=404, detail="Number is not suppressed")
+    return entry
+
+
+@router.delete("/{phone}")
+async def unsuppress_number(phone: str):
+    await suppression_service.unsuppress(phone)
+    return {"status": "removed"}
@@ -0,0 +1,174 @@
+import asyncio
+from app.config import settings
+from app.db import admission
+from app.db.unit_of_work import UnitOfWork
+from app.utils.analysis_helper import send_to_analysis_service
+from app.utils.log import bind as bind_log_context, get_logger
+
+log = get_logger(__name__)
+
+
+class _JobLost(Exception):
+    """The job was reclaimed by another worker; its batch is rolled back"""
+
+
+# Jobs running in this process, keyed by job id
+_running: dict[int, asyncio.Task] = {}
+_wake = asyncio.Event()
+
+
+def wake():
+    """Claim newly queued jobs now instead of at the next poll"""
+    _wake.set()
+
+
+async def job_loop():
+    """
+    Run queued analysis jobs, up to ANALYSIS_MAX_JOBS at a time, and take
+    over abandoned ones, so runs interrupted by a restart carry on from
+    their last checkpoint without anyone asking again.
+    """
+    admission.set_priority("background")
+
+    while True:
+        _wake.clear()
+        try:
+            while len(_running) < settings.ANALYSIS_MAX_JOBS:
+                async with UnitOfWork() as uow:
+                    job = await uow.analysis_jobs.claim(
+                        settings.WORKER_ID,
+                        settings.ANALYSIS_JOB_STALE_SECONDS,
+                        list(_running)
+                    )
+                    if job:
+                        await uow.states.update_analysis_status(job["campaign_id"], "processing")
+
+                if not job:
+                    break
+
+                task = asyncio.create_task(run_job(job))
+                _running[job["id"]] = task
+                task.add_done_callback(lambda _, job_id=job["id"]: (_running.pop(job_id, None), _wake.set()))
+
+        except Exception as e:
+            log.exception("analysis_claim_failed", error=str(e))
+
+        try:
+            await asyncio.wait_for(_wake.wait(), settings.ANALYSIS_QUEUE_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _heartbeat(job_id: int, job_task: asyncio.Task):
+    while True:
+        await asyncio.sleep(settings.ANALYSIS_HEARTBEAT_SECONDS)
+        try:
+            async with UnitOfWork() as uow:
+                alive = await uow.analysis_jobs.heartbeat(job_id, settings.WORKER_ID)
+        except Exception as e:
+            log.warning("analysis_heartbeat_failed", job_id=job_id, error=str(e))
+            continue
+
+        if not alive:
+            log.warning("analysis_job_lost", job_id=job_id)
+            job_task.cancel()
+            return
+
+
+async def run_job(job: dict):
+    job_id, campaign_id = job["id"], job["campaign_id"]
+    owner = settings.WORKER_ID
+    bind_log_context(campaign_id=campaign_id, analysis_job=job_id)
+    admission.set_priority("background")
+
+    after = job["last_call_id"]
+    if job["attempts"] > 1:
+        log.info("analysis_job_resumed", after_call_id=after, batches_done=job["batches_done"], attempt=job["attempts"])
+
+    heartbeat = asyncio.create_task(_heartbeat(job_id, asyncio.current_task()))
+    failures = 0
+    try:
+        while True:
+            async with UnitOfWork() as uow:
+                batch = await uow.analysis_jobs.next_batch(campaign_id, after, settings.ANALYSIS_BATCH_SIZE)
+
+            if not batch:
+                break
+
+            # Transcripts are normalised when they are ingested
+            payload = [{"call_sid": call["call_sid"], "transcript": call["transcript"]} for call in batch]
+            error = None
+            try:
+                results = await send_to_analysis_service(payload)
+            except Exception as e:
+                results, error = [], e
+
+            by_sid = {call["call_sid"]: call for call in batch}
+            analyzed = set()
+
+            # Results and checkpoint commit together. The checkpoint only moves
+            # past the leading run of analysed calls: the others stay pending
+            # and come back in the next batch instead of being skipped
+            async with UnitOfWork() as uow:
+                for result in results:
+                    call = by_sid.get(result.get("call_sid")) if isinstance(result, dict) else None
+                    if call is None or call["id"] in analyzed:
+                        continue
+                    await uow.states.update_analysis_result(
+                        campaign_id,
+                        call["call_sid"],
+                        result.get("city"),
+                        result.get("interest"),
+                        result.get("outcome")
+                    )
+                    analyzed.add(call["id"])
+
+                done = 0
+                while done < len(batch) and batch[done]["id"] in analyzed:
+                    done += 1
+                checkpoint_at = batch[done - 1]["id"] if done else after
+
+                if analyzed and not await uow.analysis_jobs.checkpoint(job_id, owner, checkpoint_at, len(analyzed), len(analyzed)):
+                    raise _JobLost()
+
+            after = checkpoint_at
+            if len(analyzed) == len(batch):
+                failures = 0
+                continue
+
+            log.warning(
+                "analysis_batch_incomplete",
+                batch_size=len(batch),
+                analyzed=len(analyzed),
+                error=str(error) if error else None
+            )
+            if analyzed:
+                failures = 0
+                continue
+
+            # Nothing came back: back off and retry, and give up (job failed,
+            # calls still pending) rather than mark the campaign analysed
+            failures += 1
+            if failures > settings.ANALYSIS_BATCH_RETRIES:
+                raise error or RuntimeError(f"no results for {len(batch)} calls after {failures} attempts")
+            await asyncio.sleep(min(settings.ANALYSIS_RETRY_SECONDS * 2 ** (failures - 1), settings.ANALYSIS_RETRY_MAX_SECONDS))
+
+        async with UnitOfWork() as uow:
+            if await uow.analysis_jobs.finish(job_id, owner, "completed"):
+                await uow.states.update_analysis_status(campaign_id, "completed")
+
+    except _JobLost:
+        log.warning("analysis_job_lost", job_id=job_id)
+
+    except asyncio.CancelledError:
+        # Lost heartbeat or shutdown: the job stays 'running' for whoever reclaims it
+        raise
+
+    except Exception as e:
+        log.exception("analysis_job_failed", error=str(e))
+        async with UnitOfWork() as uow:
+            if await uow.analysis_jobs.finish(job_id, owner, "failed", str(e)):
+                await uow.states.update_analysis_status(campaign_id, "failed")
+
+    finally:
+        heartbeat.cancel()
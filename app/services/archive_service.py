@@ -0,0 +1,121 @@
+import asyncio
+import os
+from fastapi import HTTPException
+from app.config import settings
+from app.db.unit_of_work import UnitOfWork
+from app.services.partitions import drop_campaign_calls
+from app.utils.columnar import iter_columns, read_columns, write_columns
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+def _archive_path(campaign_id: str) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, f"{campaign_id}.calls.json.gz")
+
+
+class _ClaimLost(Exception):
+    """Another process took over the archive claim; this attempt is rolled back"""
+
+
+async def archive_campaign(campaign_id: str):
+    """
+    Move a finished campaign's calls to a columnar file, keeping only a
+    summary row in the DB. The campaign must have been claimed ('archiving')
+    by this process.
+    """
+    async with UnitOfWork() as uow:
+        calls = await uow.calls.get_by_campaign(campaign_id)
+        stats = await uow.calls.get_campaign_stats(campaign_id)
+
+    path = _archive_path(campaign_id)
+    os.makedirs(settings.ARCHIVE_DIR, exist_ok=True)
+    byte_size = await asyncio.to_thread(write_columns, path, calls)
+
+    async with UnitOfWork() as uow:
+        await uow.archives.create(campaign_id, path, len(calls), byte_size, stats)
+        if not await uow.campaigns.mark_archived(campaign_id, settings.WORKER_ID):
+            raise _ClaimLost()
+
+    # Only once the summary row is committed do the hot rows go
+    await drop_campaign_calls(campaign_id)
+
+    log.info("campaign_archived", campaign_id=campaign_id, calls=len(calls), bytes=byte_size)
+
+
+async def archived_path(campaign_id: str):
+    """
+    The campaign's archive file, None if it has no archive. Archives are
+    written by whichever process runs archive_loop, so with APP_MODE=api
+    ARCHIVE_DIR must be storage shared with the workers; a file this
+    process can't see is an error, not an empty campaign.
+    """
+    async with UnitOfWork() as uow:
+        archive = await uow.archives.get(campaign_id)
+
+    if not archive:
+        return None
+
+    if not await asyncio.to_thread(os.path.exists, archive["path"]):
+        log.error("archive_unreadable", campaign_id=campaign_id, path=archive["path"], archive_dir=settings.ARCHIVE_DIR)
+        raise HTTPException(
+            status_code=503,
+            detail="Campaign archive is not readable from this process; ARCHIVE_DIR must be shared with the workers",
+        )
+    return archive["path"]
+
+
+async def read_archived_calls(campaign_id: str):
+    path = await archived_path(campaign_id)
+    if not path:
+        return []
+    return await asyncio.to_thread(read_columns, path)
+
+
+async def iter_archived_calls(path: str, columns: list = None):
+    """Stream an archive a block at a time; the gzip reads and JSON decoding run in a thread"""
+    blocks = iter_columns(path, columns)
+    try:
+        while True:
+            block = await asyncio.to_thread(next, blocks, None)
+            if block is None:
+                return
+            yield block
+    finally:
+        await asyncio.to_thread(blocks.close)
+
+
+async def delete_archive(campaign_id: str):
+    async with UnitOfWork() as uow:
+        archive = await uow.archives.get(campaign_id)
+        if not archive:
+            return
+        await uow.archives.delete(campaign_id)
+
+    try:
+        os.remove(archive["path"])
+    except FileNotFoundError:
+        # Purges run in the engine processes, next to the archives; a missing file is really gone
+        log.warning("archive_file_missing", campaign_id=campaign_id, path=archive["path"])
+
+
+async def archive_loop():
+    while True:
+        try:
+            async with UnitOfWork() as uow:
+                campaign_ids = await uow.archives.claim_archivable(settings.WORKER_ID, settings.CAMPAIGN_CLAIM_SECONDS)
+
+            for campaign_id in campaign_ids:
+                try:
+                    await archive_campaign(campaign_id)
+                except _ClaimLost:
+                    log.warning("archive_claim_lost", campaign_id=campaign_id)
+                except Exception as e:
+                    log.exception("archive_failed", campaign_id=campaign_id, error=str(e))
+                    async with UnitOfWork() as uow:
+                        await uow.campaigns.release_claim(campaign_id, settings.WORKER_ID)
+
+        except Exception as e:
+            log.exception("archive_sweep_failed", error=str(e))
+
+        await asyncio.sleep(settings.ARCHIVE_POLL_SECONDS)
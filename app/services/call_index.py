@@ -0,0 +1,40 @@
+from typing import NamedTuple, Optional
+from app.config import settings
+from app.models.call_states import EXOTEL_FINAL
+from app.utils.ttl_cache import TTLCache
+
+
+class CallRoute(NamedTuple):
+    id: int
+    campaign_id: str
+    status: str
+
+
+# call_sid -> CallRoute for calls this process dialed or has seen webhooks for
+_routes = TTLCache(settings.CALL_INDEX_MAX_ENTRIES, settings.CALL_INDEX_TTL_SECONDS)
+
+
+def remember(call_sid: str, call_id: int, campaign_id: str, status: str = "calling"):
+    _routes.set(call_sid, CallRoute(call_id, campaign_id, status))
+
+
+def lookup(call_sid: str) -> Optional[CallRoute]:
+    return _routes.get(call_sid) if call_sid else None
+
+
+def record_transition(call_sid: str, moved: dict):
+    """
+    Keep the route current after a status transition. `moved` is the row a
+    transition returns (id, campaign_id, to_status), so a SID this process
+    didn't dial is cached from its first webhook here, and the rest of its
+    webhooks go straight to the partition.
+    """
+    # Later webhooks for the SID are rare once Exotel has reported the outcome
+    if moved["to_status"] in EXOTEL_FINAL:
+        _routes.pop(call_sid)
+    else:
+        _routes.set(call_sid, CallRoute(moved["id"], moved["campaign_id"], moved["to_status"]))
+
+
+def forget(call_sid: str):
+    _routes.pop(call_sid)
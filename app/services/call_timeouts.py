@@ -0,0 +1,88 @@
+import asyncio
+import time
+from app.config import settings
+from app.db.unit_of_work import UnitOfWork
+from app.services import call_index, retry_schedule
+from app.utils.timer_wheel import TimerWheel
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Deadlines for calls sitting in 'calling', keyed by call id
+_wheel = TimerWheel(tick_seconds=1.0)
+_sid_to_id: dict[str, int] = {}
+
+
+def arm(call_id: int, timeout_seconds: float = None):
+    """Start the no-answer deadline for a call that was just marked 'calling'"""
+    if timeout_seconds is None:
+        timeout_seconds = settings.CALL_TIMEOUT_SECONDS
+    _wheel.arm(call_id, time.monotonic() + timeout_seconds)
+
+
+def bind_sid(call_id: int, call_sid: str):
+    """Remember the Exotel SID so webhooks, which only know the SID, can cancel the deadline"""
+    if call_id in _wheel:
+        _sid_to_id[call_sid] = call_id
+
+
+def cancel(call_id: int):
+    _wheel.cancel(call_id)
+
+
+def cancel_sid(call_sid: str):
+    """
+    Called on webhooks that move a call out of 'calling'. A miss is harmless:
+    in split API/worker deployments the deadline lives in the worker, and an
+    expiry only fails calls that are still 'calling'.
+    """
+    call_id = _sid_to_id.pop(call_sid, None)
+    if call_id is not None:
+        _wheel.cancel(call_id)
+
+
+async def rebuild():
+    """Re-arm deadlines for calls left in 'calling' by a previous process"""
+    async with UnitOfWork() as uow:
+        rows = await uow.calls.get_calling_ages()
+
+    for row in rows:
+        arm(row["id"], settings.CALL_TIMEOUT_SECONDS - (row["age_seconds"] or 0))
+
+
+async def _expire(call_ids: list):
+    async with UnitOfWork() as uow:
+        timed_out = await uow.calls.mark_calls_timed_out(
+            call_ids,
+            retry_schedule.RETRY_POLICIES["timeout"]
+        )
+
+    for row in timed_out:
+        retry_schedule.push(row["campaign_id"], row["id"], row["next_attempt_at"])
+        if row["call_sid"]:
+            call_index.record_transition(row["call_sid"], row)
+
+    if timed_out:
+        log.info("calls_timed_out", count=len(timed_out))
+
+    if len(_sid_to_id) > len(_wheel):
+        live = {sid: call_id for sid, call_id in _sid_to_id.items() if call_id in _wheel}
+        _sid_to_id.clear()
+        _sid_to_id.update(live)
+
+
+async def call_timeout_loop():
+    try:
+        await rebuild()
+    except Exception as e:
+        log.exception("timeout_rebuild_failed", error=str(e))
+
+    while True:
+        await asyncio.sleep(_wheel.tick_seconds)
+        expired = _wheel.advance()
+        if not expired:
+            continue
+        try:
+            await _expire(expired)
+        except Exception as e:
+            log.exception("timeout_expiry_failed", error=str(e))
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from typing import NamedTuple, Optional
+from app.config import settings
+from app.db.unit_of_work import UnitOfWork
+from app.services.retry_schedule import DialBudget
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+class CallerHealth(NamedTuple):
+    answered: int
+    rejected: int
+    total: int
+
+
+class CallerLine:
+    """
+    One outbound number (and the Exoml app it connects to) with its own
+    dial cap. The cap is shared by every dialing process: each dial is
+    reserved in caller_id_dials first, and what the reservations report
+    is cached here so dial loops can skip a capped number without a query.
+    """
+
+    def __init__(self, number: str, app_sid: str, per_minute: int):
+        self.number = number
+        self.app_sid = app_sid
+        self.per_minute = per_minute
+        # This process's own dials; the only load figure when the number is uncapped
+        self.local = DialBudget(0)
+        # Dials by all processes in the last minute, as of the last reservation
+        self.recent = 0
+        self.recent_at = 0.0
+        self.capped_until = 0.0
+        self.health = CallerHealth(0, 0, 0)
+
+    def score(self) -> float:
+        """
+        Answer rate with a small prior, where a reject counts as two misses:
+        carriers flag numbers as spam mostly through rejections.
+        """
+        answered, rejected, total = self.health
+        return (answered + 1) / (total + rejected + 3)
+
+    def load(self) -> int:
+        recent = self.recent if time.monotonic() - self.recent_at < 60 else 0
+        return max(recent, self.local.used())
+
+    def available(self) -> bool:
+        return not self.per_minute or time.monotonic() >= self.capped_until
+
+    def seconds_until_available(self) -> float:
+        return max(self.capped_until - time.monotonic(), 0.0) if self.per_minute else 0.0
+
+    async def reserve(self) -> bool:
+        """Claim one dial under the shared per-minute cap"""
+        if self.per_minute:
+            async with UnitOfWork() as uow:
+                reservation = await uow.caller_ids.reserve_dial(self.number, self.per_minute)
+            self.recent, self.recent_at = reservation["dials"], time.monotonic()
+            if not reservation["granted"]:
+                self.capped_until = time.monotonic() + reservation["wait_seconds"]
+                return False
+        self.local.spend()
+        return True
+
+    async def release(self):
+        """Give back a reserved dial that wasn't placed, so it doesn't count against the cap"""
+        if self.per_minute:
+            async with UnitOfWork() as uow:
+                await uow.caller_ids.release_dial(self.number)
+            self.recent = max(self.recent - 1, 0)
+            self.capped_until = 0.0
+        self.local.refund()
+
+
+class CallerIdPool:
+    """
+    Picks the caller ID for each dial: among the numbers still under their
+    per-minute cap (counted over all processes), the least loaded relative
+    to its health. Numbers whose health has dropped below `min_health`
+    rest until it recovers, unless every number is that unhealthy.
+    """
+
+    def __init__(self, lines: list, min_health: float = 0.05):
+        self.lines = lines
+        self.min_health = min_health
+
+    @classmethod
+    def from_settings(cls):
+        lines = []
+        for entry in settings.EXOTEL_CALLER_IDS:
+            number, _, app_sid = entry.partition(":")
+            lines.append(CallerLine(number, app_sid or settings.EXOTEL_APP_SID, settings.CALLER_ID_DIALS_PER_MINUTE))
+        return cls(lines, settings.CALLER_ID_MIN_HEALTH)
+
+    def _candidates(self) -> list:
+        open_lines = [line for line in self.lines if line.available()]
+        healthy = [line for line in open_lines if line.score() >= self.min_health]
+        return healthy or open_lines
+
+    def available(self) -> bool:
+        return bool(self._candidates())
+
+    def seconds_until_available(self) -> float:
+        if not self.lines or self.available():
+            return 0.0
+        return min(line.seconds_until_available() for line in self.lines)
+
+    async def acquire(self) -> Optional[CallerLine]:
+        """The best candidate whose reservation is granted; None if other processes used up every cap"""
+        for line in sorted(self._candidates(), key=lambda line: (line.load() + 1) / line.score()):
+            if await line.reserve():
+                return line
+        return None
+
+    def update_health(self, rows: list):
+        by_number = {row["caller_id"]: row for row in rows}
+        for line in self.lines:
+            row = by_number.get(line.number)
+            line.health = CallerHealth(row["answered"], row["rejected"], row["total"]) if row else CallerHealth(0, 0, 0)
+
+    def snapshot(self) -> list:
+        return [{
+            "caller_id": line.number,
+            "app_sid": line.app_sid,
+            "dials_last_minute": line.load(),
+            "capped": not line.available(),
+            "health": round(line.score(), 3),
+            "answered": line.health.answered,
+            "rejected": line.health.rejected,
+            "outcomes": line.health.total,
+        } for line in self.lines]
+
+
+pool = CallerIdPool.from_settings()
+
+
+async def sync_health_loop():
+    """Health comes from the calls table, so it holds however webhooks and dialers are spread over processes"""
+    while len(pool.lines) > 1:
+        try:
+            async with UnitOfWork() as uow:
+                rows = await uow.calls.get_caller_id_outcomes(
+                    [line.number for line in pool.lines],
+                    settings.CALLER_ID_HEALTH_WINDOW
+                )
+            pool.update_health(rows)
+        except Exception as e:
+            log.exception("caller_id_sync_failed", error=str(e))
+
+        await asyncio.sleep(settings.CALLER_ID_SYNC_SECONDS)
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+from typing import Callable, Optional
+from app.config import settings
+from app.db.database import listen_connection
+from app.db.unit_of_work import UnitOfWork
+from app.repositories.campaign_state_repo import CONTROL_CHANNEL
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+class DialControl:
+    """Stop signal for one campaign's dial loop in this process, and notice that the loop has exited"""
+
+    def __init__(self):
+        self.stop = asyncio.Event()
+        self.stopped = asyncio.Event()
+        self.reason = None
+
+    def request_stop(self, reason: str):
+        self.reason = self.reason or reason
+        self.stop.set()
+
+    async def sleep(self, seconds: float) -> bool:
+        """Sleep up to `seconds`, waking as soon as a stop is requested; True if it was"""
+        try:
+            await asyncio.wait_for(self.stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self.stop.is_set()
+
+
+# Controls of the dial loops running in this process, keyed by campaign_id
+_controls: dict[str, DialControl] = {}
+
+
+def open_control(campaign_id: str) -> DialControl:
+    control = _controls[campaign_id] = DialControl()
+    return control
+
+
+def close_control(campaign_id: str, control: DialControl):
+    """Called by the dial loop on its way out, after it has released its lease"""
+    if _controls.get(campaign_id) is control:
+        del _controls[campaign_id]
+    control.stopped.set()
+
+
+def stop_local(campaign_id: str, reason: str) -> Optional[DialControl]:
+    control = _controls.get(campaign_id)
+    if control:
+        control.request_stop(reason)
+    return control
+
+
+async def wait_stopped(campaign_id: str, timeout: float = None) -> bool:
+    """
+    Wait until nobody is dialing the campaign: the local loop has exited,
+    or, when another process owns it, its lease has been released or has
+    run out. False if that didn't happen within `timeout`.
+    """
+    timeout = settings.CAMPAIGN_STOP_TIMEOUT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    control = _controls.get(campaign_id)
+    if control:
+        try:
+            await asyncio.wait_for(control.stopped.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    while True:
+        async with UnitOfWork() as uow:
+            if not await uow.states.is_leased(campaign_id):
+                return True
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.2)
+
+
+def _on_notify(on_resume: Callable[[str], object]):
+    def handle(connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+            campaign_id, action = message["campaign_id"], message["action"]
+        except (ValueError, KeyError):
+            log.warning("control_message_invalid", payload=payload)
+            return
+
+        if action == "resume":
+            on_resume(campaign_id)
+        else:
+            stop_local(campaign_id, action)
+
+    return handle
+
+
+async def listen_loop(on_resume: Callable[[str], object]):
+    """
+    Apply pause/resume/delete messages from any process to the dial loops
+    here, as they are committed. Messages sent while the connection is down
+    are lost; the lease renewal and the unowned-campaign watch still catch
+    those, just not immediately.
+    """
+    handler = _on_notify(on_resume)
+
+    while True:
+        conn = None
+        try:
+            conn = await listen_connection()
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _: closed.set())
+            await conn.add_listener(CONTROL_CHANNEL, handler)
+            log.info("control_listening", channel=CONTROL_CHANNEL)
+            await closed.wait()
+            log.warning("control_connection_lost", channel=CONTROL_CHANNEL)
+
+        except Exception as e:
+            log.exception("control_listen_failed", error=str(e))
+
+        finally:
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+
+        await asyncio.sleep(settings.CAMPAIGN_LEASE_POLL_SECONDS)
@@ -1,46 +1,85 @@
 from app.config import settings
 from app.models.schemas import CampaignCreate
 import uuid
-from datetime import datetime, timezone
 from fastapi import HTTPException
 import asyncio
+import time
 from app.services.exotel_service import make_call
+from app.services import analysis_jobs, caller_ids, campaign_control, pacing, recordings, retry_schedule, suppression_service
 # from app.tasks.campaign_tasks import enqueue_campaign_calls
 from app.db.unit_of_work import UnitOfWork
-from app.utils.helper import clean_transcript
-from app.utils.analysis_helper import send_to_analysis_service
+from app.db import admission
+from app.services.partitions import drop_campaign_calls
+from app.services.archive_service import delete_archive, read_archived_calls
+from app.utils.helper import utc_timestamp
+from app.utils.log import bind as bind_log_context, get_logger
+
+log = get_logger(__name__)
+
+# Dial loops owned by this process, keyed by campaign_id
+_dial_tasks: dict[str, asyncio.Task] = {}
+
+
+def spawn_dial_loop(campaign_id: str):
+    """Start process_campaign for a campaign unless this process already drives it"""
+    task = _dial_tasks.get(campaign_id)
+    if task and not task.done():
+        return task
+
+    task = asyncio.create_task(process_campaign(campaign_id))
+    _dial_tasks[campaign_id] = task
+
+    def _forget(done: asyncio.Task):
+        if _dial_tasks.get(campaign_id) is done:
+            del _dial_tasks[campaign_id]
+
+    task.add_done_callback(_forget)
+    return task
+
 
 async def resume_campaigns():
-    """Resume campaigns that were running before shutdown"""
+    """Resume running campaigns nobody owns: left over from a shutdown, or whose owner stopped heartbeating"""
     await asyncio.sleep(2)
 
-    async with UnitOfWork() as uow:
-        running = await uow.states.get_running_campaigns()
+    while True:
+        try:
+            async with UnitOfWork() as uow:
+                running = await uow.states.get_unowned_running_campaigns()
 
-    for campaign in running:
-        asyncio.create_task(
-            process_campaign(campaign["campaign_id"])
-        )
+            for campaign in running:
+                spawn_dial_loop(campaign["campaign_id"])
+
+        except Exception as e:
+            log.exception("lease_watch_failed", error=str(e))
+
+        await asyncio.sleep(settings.CAMPAIGN_LEASE_POLL_SECONDS)
 
 
 
 async def upload_campaign(campaign: CampaignCreate):
     """Create a new campaign from uploaded CSV data"""
     campaign_id = str(uuid.uuid4())
-    created_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    created_at = utc_timestamp()
 
     async with UnitOfWork() as uow:
 
+        calls, skipped_duplicates, skipped_suppressed = await suppression_service.filter_upload(
+            uow,
+            campaign.calls
+        )
+
         await uow.campaigns.create_campaign(
             campaign_id,
             campaign.name,
             created_at,
-            len(campaign.calls)
+            len(calls)
         )
 
+        await uow.calls.create_partition(campaign_id)
+
         await uow.calls.insert_calls_bulk(
             campaign_id,
-            campaign.calls
+            calls
         )
 
         await uow.states.initialize(
@@ -51,7 +90,9 @@ async def upload_campaign(campaign: CampaignCreate):
     return {
         "campaign_id": campaign_id,
         "status": "created",
-        "total_calls": len(campaign.calls)
+        "total_calls": len(calls),
+        "skipped_duplicates": skipped_duplicates,
+        "skipped_suppressed": skipped_suppressed
     }
 
 
@@ -59,30 +100,47 @@ async def start_campaign(campaign_id: str):
 
     async with UnitOfWork() as uow:
 
-        if not await uow.campaigns.exists(campaign_id):
+        campaign = await uow.campaigns.get_by_id(campaign_id)
+
+        if not campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
 
+        if campaign["status"] == "archived":
+            raise HTTPException(status_code=409, detail="Campaign is archived")
+
         if await uow.states.is_running(campaign_id):
             return {"status": "already_running"}
 
         await uow.states.set_running(campaign_id, True)
         await uow.campaigns.update_status(campaign_id, "running")
+        # Lets a worker pick it up now rather than at its next lease poll
+        await uow.states.notify_control(campaign_id, "resume")
 
-    asyncio.create_task(
-            process_campaign(campaign_id)
-        )
+    # In API-only mode the worker's lease watch picks the campaign up
+    if settings.RUN_ENGINES:
+        spawn_dial_loop(campaign_id)
 
 
     return {"status": "started"}
 
 
+async def _stop_dialing(campaign_id: str, action: str) -> bool:
+    """Stop every dial loop on the campaign, here or in another process, and wait until they have"""
+    campaign_control.stop_local(campaign_id, action)
+    return await campaign_control.wait_stopped(campaign_id)
+
+
 async def pause_campaign(campaign_id: str):
 
     async with UnitOfWork() as uow:
         await uow.states.pause(campaign_id)
         await uow.campaigns.mark_paused(campaign_id)
+        await uow.states.notify_control(campaign_id, "pause")
+
+    # Returns once no more calls will be dialed (an in-flight dial finishes first)
+    stopped = await _stop_dialing(campaign_id, "pause")
 
-    return {"status": "paused"}
+    return {"status": "paused", "stopped": stopped}
 
 
 async def list_campaigns():
@@ -99,9 +157,16 @@ async def get_campaign(campaign_id: str):
         if not campaign:
             raise HTTPException(status_code=404, detail="Campaign not found")
 
-        calls = await uow.calls.get_by_campaign(campaign_id)
+        calls = None
+        if campaign["status"] != "archived":
+            calls = await uow.calls.get_by_campaign(campaign_id)
         state = await uow.states.get_state(campaign_id)
         analysis_status = await uow.states.get_analysis_status(campaign_id)
+
+    # Cold campaigns are served from their archive file
+    if calls is None:
+        calls = await read_archived_calls(campaign_id)
+
     return {
         "campaign": campaign,
         "calls": calls,
@@ -113,11 +178,29 @@ async def get_campaign(campaign_id: str):
 async def get_campaign_stats(campaign_id: str):
 
     async with UnitOfWork() as uow:
-        stats = await uow.calls.get_campaign_stats(campaign_id)
+        archive = await uow.archives.get(campaign_id)
+        if archive:
+            stats = dict(archive["stats"])
+        else:
+            stats = await uow.calls.get_campaign_stats(campaign_id)
         stats["is_running"] = await uow.states.is_running(campaign_id)
         stats["analysis_status"] = await uow.states.get_analysis_status(campaign_id)
+        stats["analysis_job"] = await uow.analysis_jobs.latest(campaign_id)
     return stats
 
+async def get_campaign_timeline(campaign_id: str):
+    """Per-stage latency percentiles (seconds) from the call_events timeline; kept for archived campaigns too"""
+    async with UnitOfWork() as uow:
+        campaign = await uow.campaigns.get_by_id(campaign_id)
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+
+        return {
+            "campaign_id": campaign_id,
+            "spans": await uow.events.span_percentiles(campaign_id),
+            "stages": await uow.events.stage_counts(campaign_id),
+        }
+
 async def get_analysis_status_and_calls_func(campaign_id: str):
 
     async with UnitOfWork() as uow:
@@ -133,99 +216,184 @@ async def get_analysis_status_and_calls_func(campaign_id: str):
 
 async def process_campaign(campaign_id: str):
 
-    while True:
+    # Runs as its own task, so these cover every log line and query of this dial loop
+    bind_log_context(campaign_id=campaign_id)
+    admission.set_priority("background")
+    owner = settings.WORKER_ID
+    ttl = settings.CAMPAIGN_LEASE_TTL_SECONDS
 
+    # Registered before the lease is taken: a pause committed earlier makes
+    # the acquire fail, and one committed later reaches this control
+    control = campaign_control.open_control(campaign_id)
+    try:
         async with UnitOfWork() as uow:
+            if not await uow.states.acquire_lease(campaign_id, owner, ttl):
+                return
+        await _dial(campaign_id, control, owner, ttl)
+    finally:
+        campaign_control.close_control(campaign_id, control)
 
-            if not await uow.states.is_running(campaign_id):
-                break
 
-            call = await uow.calls.get_next_pending_or_retryable(campaign_id)
+async def _dial(campaign_id: str, control, owner: str, ttl: int):
+    schedule = retry_schedule.open_schedule(campaign_id)
+    fresh_budget = retry_schedule.DialBudget(settings.FRESH_DIALS_PER_MINUTE)
+    retry_budget = retry_schedule.DialBudget(settings.RETRY_DIALS_PER_MINUTE)
+    renewed_at = time.monotonic()
+
+    try:
+        while not control.stop.is_set():
+
+            async with UnitOfWork() as uow:
+
+                # Pauses arrive through `control`; the lease is only a heartbeat
+                # now (and the fallback for a missed notification)
+                if time.monotonic() - renewed_at >= ttl / 3:
+                    if not await uow.states.renew_lease(campaign_id, owner, ttl):
+                        break
+                    renewed_at = time.monotonic()
+
+                if schedule.needs_refresh():
+                    await schedule.refresh(uow)
+
+                call = None
+
+                # A call is only claimed when some caller ID is under its own cap
+                line_free = caller_ids.pool.available()
+
+                # Due retries first, each kind of dial within its own cap
+                if line_free and retry_budget.available():
+                    call = await schedule.pop_due(uow)
+                    if call:
+                        retry_budget.spend()
+
+                if not call and line_free and fresh_budget.available():
+                    call = await uow.calls.get_next_pending_call(campaign_id)
+                    if call:
+                        fresh_budget.spend()
+
+                if not call:
+                    await schedule.refresh(uow)
+                    # Calls still ringing can come back busy/no-answer with a retry
+                    # scheduled, so the campaign waits for their outcomes
+                    if schedule.next_due() is None and not await uow.calls.count_unfinished(campaign_id):
+                        await uow.states.set_running(campaign_id, False)
+                        await uow.campaigns.update_status(campaign_id, "completed")
+                        break
 
             if not call:
-                await uow.states.set_running(campaign_id, False)
-                await uow.campaigns.update_status(campaign_id, "completed")
+                await control.sleep(_idle_wait(schedule, fresh_budget, retry_budget))
+                continue
+
+            # Numbers can opt out after upload
+            if await suppression_service.is_suppressed(call["phone"]):
+                async with UnitOfWork() as uow:
+                    await uow.calls.mark_suppressed(campaign_id, call["id"])
+                continue
+
+            # The picked call is still pending, so it's simply dialed on resume
+            if control.stop.is_set():
                 break
 
-        await make_call(campaign_id, call)
-        await asyncio.sleep(settings.CALL_INTERVAL_SECONDS)
+            await make_call(campaign_id, call)
+            await control.sleep(pacing.controller.interval(len(_dial_tasks)))
+
+    finally:
+        retry_schedule.close_schedule(campaign_id)
+        async with UnitOfWork() as uow:
+            await uow.states.release_lease(campaign_id, owner)
+
+
+def _idle_wait(schedule, fresh_budget, retry_budget) -> float:
+    """How long a dial loop with nothing dialable may sleep; bounded so the lease keeps being renewed"""
+    waits = [settings.CAMPAIGN_LEASE_TTL_SECONDS / 3]
+
+    next_due = schedule.next_due()
+    if next_due is not None:
+        waits.append(max(next_due - time.time(), 0) + retry_budget.seconds_until_available())
+
+    if not fresh_budget.available():
+        waits.append(fresh_budget.seconds_until_available())
+
+    if not caller_ids.pool.available():
+        waits.append(caller_ids.pool.seconds_until_available())
+
+    return max(min(waits), 1)
 
 
 async def delete_campaign(campaign_id: str):
 
+    # Dialing stops while the state row still carries the lease to wait on
     async with UnitOfWork() as uow:
-        await uow.states.delete(campaign_id)
-        await uow.calls.delete_by_campaign(campaign_id)
-        await uow.campaigns.delete(campaign_id)
-
-    return {"status": "deleted"}
+        await uow.states.pause(campaign_id)
+        await uow.states.notify_control(campaign_id, "delete")
+    await _stop_dialing(campaign_id, "delete")
 
-async def analyze_process_campaign(campaign_id: str):
-    print(f"Starting analysis for campaign {campaign_id}")
+    # From here the campaign is gone for the API. Archives and recordings live
+    # on the engine hosts, so an API-only process leaves the purge to purge_loop there
+    owner = settings.WORKER_ID if settings.RUN_ENGINES else None
     async with UnitOfWork() as uow:
-        campaign = await uow.states.get_analysis_status(campaign_id)
-        if not campaign:
-            raise HTTPException(status_code=404, detail="analysis status not found")
+        await uow.states.delete(campaign_id)
+        await uow.campaigns.mark_deleting(campaign_id, owner, settings.CAMPAIGN_CLAIM_SECONDS)
 
-        if campaign == "processing":
-            return {"status": "already_processing"}
+    # Calls go with their partition in the background; webhooks never wait on it
+    if owner:
+        asyncio.create_task(purge_campaign(campaign_id))
 
-        await uow.states.update_analysis_status(
-            campaign_id,
-            "processing"
-        )
+    return {"status": "deleted"}
 
-    asyncio.create_task(run_analysis_pipeline(campaign_id))
 
-    return {"status": "processing_started"}
+async def purge_campaign(campaign_id: str):
+    """Every step is idempotent, so a purge that died halfway is simply run again"""
+    admission.set_priority("background")
+    try:
+        await drop_campaign_calls(campaign_id)
+        await delete_archive(campaign_id)
+        await recordings.delete_campaign_recordings(campaign_id)
 
-BATCH_SIZE = 5
+        async with UnitOfWork() as uow:
+            await uow.events.delete_for_campaign(campaign_id)
+            await uow.campaigns.delete(campaign_id)
 
-async def run_analysis_pipeline(campaign_id: str):
-    try:
+    except Exception as e:
+        log.exception("purge_failed", campaign_id=campaign_id, error=str(e))
         async with UnitOfWork() as uow:
-            calls = await uow.states.get_calls_for_analysis(campaign_id)
+            await uow.campaigns.release_claim(campaign_id, settings.WORKER_ID)
+
 
-        if not calls:
+async def purge_loop():
+    """Finish deletes whose purge failed or whose process exited before it was done"""
+    while True:
+        try:
             async with UnitOfWork() as uow:
-                await uow.states.update_analysis_status(campaign_id, "completed")
-            return
-
-        # Create batches
-        batches = [
-            calls[i:i + BATCH_SIZE]
-            for i in range(0, len(calls), BATCH_SIZE)
-        ]
-
-        for batch in batches:
-            try:
-                payload = []
-
-                for call in batch:
-                    cleaned = clean_transcript(call["transcript"])
-                    payload.append({
-                        "call_sid": call["call_sid"],
-                        "transcript": cleaned
-                    })
-
-                results = await send_to_analysis_service(payload)
-
-                # results expected as list
-                for result in results:
-                    async with UnitOfWork() as uow:
-                        await uow.states.update_analysis_result(
-                            result.get("call_sid"),
-                            result.get("city"),
-                            result.get("interest"),
-                            result.get("outcome")
-                        )
-
-            except Exception as e:
-                print("Batch failed:", e)
+                campaign_ids = await uow.campaigns.claim_deleting(settings.WORKER_ID, settings.CAMPAIGN_CLAIM_SECONDS)
 
-        async with UnitOfWork() as uow:
-            await uow.states.update_analysis_status(campaign_id, "completed")
+            for campaign_id in campaign_ids:
+                log.info("purge_resumed", campaign_id=campaign_id)
+                await purge_campaign(campaign_id)
 
-    except Exception:
-        async with UnitOfWork() as uow:
-            await uow.states.update_analysis_status(campaign_id, "failed")
+        except Exception as e:
+            log.exception("purge_sweep_failed", error=str(e))
+
+        await asyncio.sleep(settings.PURGE_POLL_SECONDS)
+
+
+async def analyze_process_campaign(campaign_id: str):
+    log.info("analysis_requested", campaign_id=campaign_id)
+    async with UnitOfWork() as uow:
+        if not await uow.states.get_analysis_status(campaign_id):
+            raise HTTPException(status_code=404, detail="analysis status not found")
+
+        # A live job, not the status column, decides: a run orphaned by a restart is resumed, not blocking
+        job_id = await uow.analysis_jobs.create(campaign_id)
+        if job_id is None:
+            return {"status": "already_processing"}
+
+        await uow.states.update_analysis_status(campaign_id, "queued")
+
+    # In API-only mode a worker's job loop claims it
+    if not settings.RUN_ENGINES:
+        return {"status": "queued", "job_id": job_id}
+
+    analysis_jobs.wake()
+
+    return {"status": "processing_started", "job_id": job_id}
@@ -1,10 +1,36 @@
 from app.db.database import get_db
 from app.config import settings
 import httpx
-from datetime import datetime, timezone 
 from xml.etree import ElementTree as ET
 from app.config import settings
 from app.db.unit_of_work import UnitOfWork
+from app.services import call_index, call_timeouts, caller_ids, recordings, retry_schedule
+from app.utils.helper import utc_timestamp
+from app.utils.offload import run_cpu
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+def _find_call(xml: str):
+    call_element = ET.fromstring(xml).find('.//Call')
+    if call_element is None:
+        raise Exception("No Call element found")
+    return call_element
+
+
+def parse_call_sid(xml: str) -> str:
+    return _find_call(xml).find('Sid').text
+
+
+def parse_call_details(xml: str) -> tuple:
+    """(status, duration, recording_url) from a Calls/{sid} response"""
+    call_element = _find_call(xml)
+    return (
+        call_element.find('Status').text,
+        int(call_element.find('Duration').text or 0),
+        call_element.find('RecordingUrl').text or "",
+    )
 
 async def make_call(campaign_id: str, call_record: dict):
 
@@ -12,22 +38,39 @@ async def make_call(campaign_id: str, call_record: dict):
     phone = call_record['phone']
     name = call_record['name']
 
-    print(f"📞 Calling: {name} ({phone})")
+    # Another dial loop, here or in another process, may have taken the last
+    # free number since this one checked; the call stays dialable and is picked up again
+    line = await caller_ids.pool.acquire()
+    if line is None and caller_ids.pool.lines:
+        return
+    caller_id = line.number if line else settings.EXOTEL_CALLER_ID
+    app_sid = line.app_sid if line else settings.EXOTEL_APP_SID
+
+    # Once per dial and never sampled: with call_initiated, the only link from call_id to call_sid
+    log.info("dialing", call_id=call_id, caller_id=caller_id)
 
-    # Mark calling (separate small transaction)
+    # Mark calling (separate small transaction); a call that stopped being dialable isn't dialed
     async with UnitOfWork() as uow:
-        await uow.calls.mark_calling(
+        claimed = await uow.calls.mark_calling(
+            campaign_id,
             call_id,
-            datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+            utc_timestamp(),
+            caller_id
         )
+    if not claimed:
+        # The dial reserved above isn't placed; hand it back instead of wasting the slot
+        if line:
+            await line.release()
+        return
+    call_timeouts.arm(call_id)
 
     try:
-        url = f"https://{settings.EXOTEL_API_KEY}:{settings.EXOTEL_API_TOKEN}@{settings.EXOTEL_SUBDOMAIN}/v1/Accounts/{settings.EXOTEL_ACCOUNT_SID}/Calls/connect"
+        url = f"{settings.EXOTEL_SCHEME}://{settings.EXOTEL_API_KEY}:{settings.EXOTEL_API_TOKEN}@{settings.EXOTEL_SUBDOMAIN}/v1/Accounts/{settings.EXOTEL_ACCOUNT_SID}/Calls/connect"
 
         data = {
             'From': phone,
-            'CallerId': settings.EXOTEL_CALLER_ID,
-            'Url': f"http://my.exotel.com/{settings.EXOTEL_ACCOUNT_SID}/exoml/start_voice/{settings.EXOTEL_APP_SID}",
+            'CallerId': caller_id,
+            'Url': f"http://my.exotel.com/{settings.EXOTEL_ACCOUNT_SID}/exoml/start_voice/{app_sid}",
             'StatusCallback': f"{settings.CALLBACK_BASE_URL}/webhooks/status-callback",
             'StatusCallbackContentType': 'application/json'
         }
@@ -35,51 +78,49 @@ async def make_call(campaign_id: str, call_record: dict):
         async with httpx.AsyncClient(timeout=10) as client:
             response = await client.post(url, data=data)
             response.raise_for_status()
-        print("✅ Call request accepted:", response.text)
-        root = ET.fromstring(response.text)
-        call_element = root.find('.//Call')
-        if call_element is None:
-            raise Exception("No Call element found")
+        call_sid = await run_cpu(parse_call_sid, response.text, size=len(response.text))
 
-        call_sid = call_element.find('Sid').text
-
-        print(f"✓ Call initiated - SID: {call_sid}")
+        log.info("call_initiated", call_id=call_id, call_sid=call_sid)
 
         # Save call_sid (small transaction)
         async with UnitOfWork() as uow:
-            await uow.calls.save_call_sid(call_id, call_sid)
+            await uow.calls.save_call_sid(campaign_id, call_id, call_sid)
+        call_timeouts.bind_sid(call_id, call_sid)
+        call_index.remember(call_sid, call_id, campaign_id)
 
     except Exception as e:
 
         error_msg = str(e)
-        print(f"✗ Call failed: {error_msg}")
+        log.warning("call_failed", call_id=call_id, error=error_msg)
+        call_timeouts.cancel(call_id)
 
         # Atomic failure update
         async with UnitOfWork() as uow:
-            await uow.calls.mark_failed(
+            moved = await uow.calls.mark_failed(
+                campaign_id,
                 call_id,
                 error_msg,
-                datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+                utc_timestamp(),
+                retry_schedule.RETRY_POLICIES["api_error"]
             )
-            await uow.campaigns.increment_failed(campaign_id)
+            if moved:
+                await uow.campaigns.increment_failed(campaign_id)
+
+        if moved:
+            retry_schedule.push(campaign_id, call_id, moved["next_attempt_at"])
 
 async def fetch_call_details(campaign_id: str, call_id: int, call_sid: str):
 
     try:
-        url = f"https://{settings.EXOTEL_API_KEY}:{settings.EXOTEL_API_TOKEN}@{settings.EXOTEL_SUBDOMAIN}/v1/Accounts/{settings.EXOTEL_ACCOUNT_SID}/Calls/{call_sid}"
+        url = f"{settings.EXOTEL_SCHEME}://{settings.EXOTEL_API_KEY}:{settings.EXOTEL_API_TOKEN}@{settings.EXOTEL_SUBDOMAIN}/v1/Accounts/{settings.EXOTEL_ACCOUNT_SID}/Calls/{call_sid}"
 
         async with httpx.AsyncClient(timeout=10) as client:
             response = await client.get(url)
             response.raise_for_status()
 
-        root = ET.fromstring(response.text)
-        call_element = root.find('.//Call')
-        if call_element is None:
-            raise Exception("No Call element found")
-
-        status = call_element.find('Status').text
-        duration = int(call_element.find('Duration').text or 0)
-        recording_url = call_element.find('RecordingUrl').text or ""
+        status, duration, recording_url = await run_cpu(
+            parse_call_details, response.text, size=len(response.text)
+        )
 
         status_mapping = {
             'completed': 'completed',
@@ -91,32 +132,37 @@ async def fetch_call_details(campaign_id: str, call_id: int, call_sid: str):
 
         final_status = status_mapping.get(status.lower(), 'completed')
 
-        print(f"✓ Status: {final_status} | Duration: {duration}s")
+        log.info("call_details", call_sid=call_sid, status=final_status, duration=duration)
 
         async with UnitOfWork() as uow:
 
-            await uow.calls.update_after_fetch(
+            moved = await uow.calls.update_after_fetch(
+                campaign_id,
                 call_id,
                 final_status,
                 duration,
                 recording_url,
-                datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+                utc_timestamp()
 
             )
 
-            if final_status == "completed":
+            if moved and final_status == "completed":
                 await uow.campaigns.increment_completed(campaign_id)
 
-            elif final_status == "failed":
+            elif moved and final_status == "failed":
                 await uow.campaigns.increment_failed(campaign_id)
 
+        if moved and recording_url:
+            recordings.notify()
+
     except Exception as e:
-        print(f"⚠ Error fetching details: {e}")
+        log.warning("call_details_failed", call_sid=call_sid, error=str(e))
 
         # fallback minimal safe update
         async with UnitOfWork() as uow:
             await uow.calls.mark_failed(
+                campaign_id,
                 call_id,
                 str(e),
-                datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+                utc_timestamp()
             )
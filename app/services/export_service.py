@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import zlib
+from fastapi import HTTPException
+from app.db.unit_of_work import UnitOfWork
+from app.services.archive_service import archived_path, iter_archived_calls
+
+EXPORT_COLUMNS = [
+    "id", "name", "phone", "call_sid", "status", "duration",
+    "preferred_city", "interested", "feedback", "recording_url", "caller_id",
+]
+EXPORT_CHUNK_SIZE = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _encode_csv(rows: list, header: bool) -> bytes:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows: list) -> bytes:
+    return "".join(
+        json.dumps({c: row.get(c) for c in EXPORT_COLUMNS}, default=str) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+async def _hot_chunks(campaign_id: str):
+    # Runs after the response has started, when a 503 can no longer be sent, so it queues instead
+    async with UnitOfWork(priority="background") as uow:
+        async for rows in uow.calls.stream_by_campaign(campaign_id, EXPORT_COLUMNS, EXPORT_CHUNK_SIZE):
+            yield rows
+
+
+async def _archived_chunks(path: str):
+    # One archive block in memory at a time, like the server-side cursor for hot campaigns
+    async for calls in iter_archived_calls(path, EXPORT_COLUMNS):
+        for i in range(0, len(calls), EXPORT_CHUNK_SIZE):
+            yield calls[i:i + EXPORT_CHUNK_SIZE]
+
+
+async def _no_chunks():
+    return
+    yield
+
+
+async def export_campaign(campaign_id: str, fmt: str):
+    """Validate up front, then hand back an async iterator of encoded chunks"""
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(MEDIA_TYPES)}")
+
+    async with UnitOfWork() as uow:
+        campaign = await uow.campaigns.get_by_id(campaign_id)
+
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    if campaign["status"] == "archived":
+        # Resolved before the response starts, so an unreadable archive is still a clean error
+        path = await archived_path(campaign_id)
+        chunks = _archived_chunks(path) if path else _no_chunks()
+    else:
+        chunks = _hot_chunks(campaign_id)
+
+    async def body():
+        if fmt == "csv":
+            # Header goes out even for an empty campaign
+            yield _encode_csv([], header=True)
+        async for rows in chunks:
+            yield _encode_csv(rows, header=False) if fmt == "csv" else _encode_ndjson(rows)
+
+    return body()
+
+
+async def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,162 @@
+import asyncio
+import math
+import time
+from collections import deque
+from app.config import settings
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+class PacingController:
+    """
+    Picks the gap between dials so answered calls keep about
+    `target_sessions` bot sessions busy.
+
+    By Little's law, live sessions = dial rate * P(answer) * talk time,
+    so the rate needed is target / (P(answer) * talk time). Both
+    estimates come from a sliding window of recent outcomes; a small
+    prior keeps the first few calls from swinging the rate around.
+    The gap is then nudged by how far live sessions are from target, in
+    both directions, so the mean settles on the target rather than below.
+    """
+
+    PRIOR_CALLS = 5
+
+    def __init__(
+        self,
+        target_sessions: int,
+        window: int = 50,
+        min_interval: float = 0.5,
+        max_interval: float = 30.0,
+        default_talk_seconds: float = 90.0,
+        default_answer_rate: float = 0.3,
+        clock=time.monotonic,
+    ):
+        self.target_sessions = target_sessions
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_talk_seconds = default_talk_seconds
+        self.default_answer_rate = default_answer_rate
+        self._answers = deque(maxlen=window)
+        self._talk_times = deque(maxlen=window)
+        self._clock = clock
+        self._live = {}
+        self._live_from_db = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            target_sessions=settings.PACING_TARGET_SESSIONS,
+            window=settings.PACING_WINDOW,
+            min_interval=settings.PACING_MIN_INTERVAL_SECONDS,
+            max_interval=settings.PACING_MAX_INTERVAL_SECONDS,
+            default_talk_seconds=settings.PACING_DEFAULT_TALK_SECONDS,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_sessions > 0
+
+    # ---------- outcome stream ----------
+
+    def record_answered(self, call_sid: str = None):
+        self._answers.append(1)
+        if call_sid:
+            self._live[call_sid] = self._clock()
+
+    def record_unanswered(self):
+        self._answers.append(0)
+
+    def record_session_end(self, call_sid: str = None, talk_seconds: float = None):
+        if call_sid:
+            self._live.pop(call_sid, None)
+        if talk_seconds and talk_seconds > 0:
+            self._talk_times.append(talk_seconds)
+
+    def reset_samples(self, answers: list, talk_times: list, live_sessions: int = None):
+        """Replace the window, and the live session count, with what was read back from the database"""
+        self._answers.clear()
+        self._answers.extend(answers)
+        self._talk_times.clear()
+        self._talk_times.extend(talk_times)
+        self._live_from_db = live_sessions
+
+    # ---------- estimates ----------
+
+    def answer_rate(self) -> float:
+        answered = sum(self._answers) + self.default_answer_rate * self.PRIOR_CALLS
+        return answered / (len(self._answers) + self.PRIOR_CALLS)
+
+    def talk_time(self) -> float:
+        total = sum(self._talk_times) + self.default_talk_seconds * self.PRIOR_CALLS
+        return total / (len(self._talk_times) + self.PRIOR_CALLS)
+
+    def stale_after(self) -> float:
+        """Seconds after which a session whose session-end never arrived is no longer counted"""
+        return max(600.0, 4 * self.talk_time())
+
+    def live_sessions(self) -> int:
+        # Processes without webhooks count sessions in the database instead
+        if self._live_from_db is not None:
+            return self._live_from_db
+
+        # Drop sessions whose session-end never arrived
+        cutoff = self._clock() - self.stale_after()
+        for call_sid in [sid for sid, started in self._live.items() if started < cutoff]:
+            del self._live[call_sid]
+        return len(self._live)
+
+    def interval(self, dial_loops: int = 1) -> float:
+        """Seconds one dial loop should wait before its next call, with `dial_loops` loops sharing the bot"""
+        if not self.enabled:
+            return settings.CALL_INTERVAL_SECONDS
+
+        rate = self.target_sessions / (max(self.answer_rate(), 0.01) * self.talk_time())
+        gap = max(dial_loops, 1) / rate
+
+        # Stretch the gap above target and shorten it below. A brake that only
+        # ever slows down holds the mean under target, since sessions spend
+        # about half their time at or above their mean
+        gap *= math.exp((self.live_sessions() - self.target_sessions) / self.target_sessions)
+
+        return min(max(gap, self.min_interval), self.max_interval)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "target_sessions": self.target_sessions,
+            "live_sessions": self.live_sessions(),
+            "answer_rate": round(self.answer_rate(), 3),
+            "talk_seconds": round(self.talk_time(), 1),
+            "samples": len(self._answers),
+        }
+
+
+controller = PacingController.from_settings()
+
+
+async def sync_from_db_loop():
+    """
+    For dial processes that don't receive webhooks themselves (worker.py):
+    rebuild the window from the most recent finished calls, and count live
+    sessions from connected calls, instead.
+    """
+    # Imported here so the offline simulator can use the controller without a database
+    from app.db.unit_of_work import UnitOfWork
+
+    while controller.enabled:
+        try:
+            async with UnitOfWork() as uow:
+                rows = await uow.calls.get_recent_outcomes(settings.PACING_WINDOW)
+                live = await uow.calls.count_live_sessions(controller.stale_after())
+
+            controller.reset_samples(
+                [1 if row["answered"] else 0 for row in rows],
+                [row["duration"] for row in rows if row["answered"] and row["duration"]],
+                live,
+            )
+        except Exception as e:
+            log.exception("pacing_sync_failed", error=str(e))
+
+        await asyncio.sleep(settings.PACING_SYNC_SECONDS)
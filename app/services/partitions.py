@@ -0,0 +1,34 @@
+import asyncio
+from app.db.database import get_autocommit_conn
+from app.db.unit_of_work import UnitOfWork
+from app.repositories.call_repo import CallRepository
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+PURGE_CHUNK_SIZE = 5000
+
+
+async def drop_campaign_calls(campaign_id: str):
+    """Remove every call of a campaign by dropping its partition, falling back to chunked deletes"""
+    async with UnitOfWork() as uow:
+        await uow.transcripts.delete_for_campaign(campaign_id)
+        partitioned = await uow.calls.partition_exists(campaign_id)
+
+    if partitioned:
+        try:
+            async with get_autocommit_conn() as conn:
+                calls = CallRepository(conn)
+                await calls.detach_partition(campaign_id)
+                await calls.drop_detached_partition(campaign_id)
+            return
+        except Exception as e:
+            log.warning("partition_drop_failed", campaign_id=campaign_id, error=str(e))
+
+    # Small transactions so no single DELETE holds locks on calls for long
+    while True:
+        async with UnitOfWork() as uow:
+            deleted = await uow.calls.delete_chunk_by_campaign(campaign_id, PURGE_CHUNK_SIZE)
+        if not deleted:
+            break
+        await asyncio.sleep(0)
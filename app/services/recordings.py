@@ -0,0 +1,161 @@
+import asyncio
+import os
+import shutil
+import time
+from collections import deque
+import httpx
+from app.config import settings
+from app.db import admission
+from app.db.unit_of_work import UnitOfWork
+from app.utils.download import DownloadError, download
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+def recording_path(campaign_id: str, call_id: int) -> str:
+    return os.path.join(settings.RECORDINGS_DIR, campaign_id, f"{call_id}.mp3")
+
+
+class RecordingFetcher:
+    """
+    Copies call recordings to RECORDINGS_DIR, at most `concurrency` at a
+    time. The calls table is the queue (recording_status = 'pending'), so
+    recordings set by any process get fetched; `notify()` only wakes this
+    process's loop early instead of waiting for the next poll.
+    """
+
+    THROUGHPUT_WINDOW_SECONDS = 60
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._wake = asyncio.Event()
+        self._active = set()
+        self._finished = deque()  # (monotonic, bytes) of recent downloads, for throughput
+        self.stored = 0
+        self.failed = 0
+        self.retried = 0
+        self.bytes_total = 0
+        self.seconds_total = 0.0
+
+    def notify(self):
+        self._wake.set()
+
+    async def run(self):
+        admission.set_priority("background")
+        auth = (settings.EXOTEL_API_KEY, settings.EXOTEL_API_TOKEN)
+        timeout = httpx.Timeout(settings.RECORDING_TIMEOUT_SECONDS, connect=10)
+
+        async with httpx.AsyncClient(auth=auth, timeout=timeout, follow_redirects=True) as client:
+            while True:
+                self._wake.clear()
+                try:
+                    free = self.concurrency - len(self._active)
+                    if free > 0:
+                        async with UnitOfWork() as uow:
+                            rows = await uow.recordings.claim_due(free, settings.RECORDING_LEASE_SECONDS)
+                        for row in rows:
+                            task = asyncio.create_task(self._fetch(client, row))
+                            self._active.add(task)
+                            task.add_done_callback(self._done)
+
+                except Exception as e:
+                    log.exception("recording_claim_failed", error=str(e))
+
+                try:
+                    await asyncio.wait_for(self._wake.wait(), settings.RECORDING_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _done(self, task):
+        self._active.discard(task)
+        self._wake.set()
+
+    async def _fetch(self, client: httpx.AsyncClient, row: dict):
+        campaign_id, call_id = row["campaign_id"], row["id"]
+        path = recording_path(campaign_id, call_id)
+        started = time.monotonic()
+
+        try:
+            await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+            byte_size, sha256 = await download(
+                client, row["recording_url"], path, settings.RECORDING_CHUNK_BYTES, settings.RECORDING_RESUME_TRIES
+            )
+
+        except Exception as e:
+            permanent = isinstance(e, DownloadError) and e.permanent
+            gave_up = permanent or row["recording_attempts"] >= settings.RECORDING_MAX_ATTEMPTS
+            if gave_up:
+                self.failed += 1
+            else:
+                self.retried += 1
+            log.warning(
+                "recording_fetch_failed",
+                campaign_id=campaign_id,
+                call_id=call_id,
+                attempt=row["recording_attempts"],
+                gave_up=gave_up,
+                error=str(e)
+            )
+            async with UnitOfWork() as uow:
+                await uow.recordings.mark_attempt_failed(
+                    campaign_id, call_id, permanent, settings.RECORDING_MAX_ATTEMPTS, settings.RECORDING_RETRY_SECONDS
+                )
+            return
+
+        async with UnitOfWork() as uow:
+            await uow.recordings.mark_stored(campaign_id, call_id, path, byte_size, sha256)
+
+        elapsed = time.monotonic() - started
+        self.stored += 1
+        self.bytes_total += byte_size
+        self.seconds_total += elapsed
+        self._finished.append((time.monotonic(), byte_size))
+        log.info("recording_stored", call_id=call_id, bytes=byte_size, seconds=round(elapsed, 2), sample=settings.LOG_SAMPLE_EVERY)
+
+    def snapshot(self) -> dict:
+        """This process's fetcher only; idle in an APP_MODE=api process, see stats() for all workers"""
+        now = time.monotonic()
+        while self._finished and now - self._finished[0][0] > self.THROUGHPUT_WINDOW_SECONDS:
+            self._finished.popleft()
+        recent_bytes = sum(size for _, size in self._finished)
+
+        return {
+            "enabled": self.concurrency > 0,
+            "concurrency": self.concurrency,
+            "active": len(self._active),
+            "stored": self.stored,
+            "failed": self.failed,
+            "retried": self.retried,
+            "bytes_total": self.bytes_total,
+            # Aggregate rate over the last minute, and the mean rate of a single download
+            "bytes_per_second": round(recent_bytes / self.THROUGHPUT_WINDOW_SECONDS),
+            "per_download_bytes_per_second": round(self.bytes_total / self.seconds_total) if self.seconds_total else 0,
+        }
+
+
+fetcher = RecordingFetcher(settings.RECORDING_CONCURRENCY)
+
+
+def notify():
+    fetcher.notify()
+
+
+async def stats() -> dict:
+    """Backlog and throughput of the recording fetchers across all processes, from the calls table"""
+    window = RecordingFetcher.THROUGHPUT_WINDOW_SECONDS
+    async with UnitOfWork() as uow:
+        recent = await uow.recordings.stats(window)
+
+    return {
+        "pending": recent["pending"],
+        "due": recent["due"],
+        "stored_last_minute": recent["stored"],
+        "bytes_per_second": round(recent["bytes"] / window),
+        # Per-process counters are only meaningful where the fetcher runs
+        "this_process": fetcher.snapshot() if settings.RUN_ENGINES else None,
+    }
+
+
+async def delete_campaign_recordings(campaign_id: str):
+    await asyncio.to_thread(shutil.rmtree, os.path.join(settings.RECORDINGS_DIR, campaign_id), True)
@@ -0,0 +1,131 @@
+import heapq
+import time
+from collections import deque
+from datetime import datetime
+from typing import NamedTuple, Optional
+from app.config import settings
+
+
+class RetryPolicy(NamedTuple):
+    base_seconds: float
+    factor: float
+    max_retries: int
+    max_delay_seconds: float = 6 * 3600
+
+
+# Backoff per outcome; delay = base * factor ** (failures - 1), applied in SQL (call_repo.RETRY_AT_SQL)
+RETRY_POLICIES = {
+    "busy": RetryPolicy(300, 2, 3),          # line busy: 5, 10, 20 min
+    "no_answer": RetryPolicy(1800, 2, 2),    # rang out: 30 min, 1 h
+    "failed": RetryPolicy(900, 2, 2),        # carrier/network failure reported by Exotel
+    "api_error": RetryPolicy(60, 2, 3),      # our Calls/connect request failed: 1, 2, 4 min
+    "timeout": RetryPolicy(600, 2, 2),       # never got a status callback
+}
+
+# Exotel call status -> retry outcome; statuses not listed are never retried
+EXOTEL_RETRY_OUTCOMES = {
+    "busy": "busy",
+    "no-answer": "no_answer",
+    "failed": "failed",
+}
+
+
+class DialBudget:
+    """Sliding one-minute cap on dials; a limit of 0 means uncapped"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._dials = deque()
+
+    def _trim(self, now: float):
+        while self._dials and now - self._dials[0] >= 60:
+            self._dials.popleft()
+
+    def available(self) -> bool:
+        if not self.per_minute:
+            return True
+        self._trim(time.monotonic())
+        return len(self._dials) < self.per_minute
+
+    def spend(self):
+        now = time.monotonic()
+        self._trim(now)
+        self._dials.append(now)
+
+    def refund(self):
+        """Give back the latest dial, for one that was spent but never made"""
+        if self._dials:
+            self._dials.pop()
+
+    def used(self) -> int:
+        """Dials in the last minute"""
+        self._trim(time.monotonic())
+        return len(self._dials)
+
+    def seconds_until_available(self) -> float:
+        if self.available():
+            return 0.0
+        return max(60 - (time.monotonic() - self._dials[0]), 0.0)
+
+
+class RetrySchedule:
+    """
+    Min-heap of (due epoch, call id) for one campaign's scheduled retries.
+
+    The heap is a cache of the indexed calls.next_attempt_at column: it is
+    reloaded periodically (webhooks handled by other processes only write
+    the column) and every popped entry is re-checked against the row.
+    """
+
+    def __init__(self, campaign_id: str):
+        self.campaign_id = campaign_id
+        self._heap = []
+        self._loaded_at = None
+
+    def push(self, call_id: int, due: datetime):
+        heapq.heappush(self._heap, (due.timestamp(), call_id))
+
+    def needs_refresh(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= settings.RETRY_SCHEDULE_REFRESH_SECONDS
+        )
+
+    async def refresh(self, uow):
+        rows = await uow.calls.get_scheduled_retries(self.campaign_id)
+        self._heap = [(row["due"], row["id"]) for row in rows]
+        heapq.heapify(self._heap)
+        self._loaded_at = time.monotonic()
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    async def pop_due(self, uow):
+        while self._heap and self._heap[0][0] <= time.time():
+            _, call_id = heapq.heappop(self._heap)
+            call = await uow.calls.get_due_retry(self.campaign_id, call_id)
+            if call:
+                return call
+        return None
+
+
+# Schedules of the campaigns this process is dialing
+_schedules: dict[str, RetrySchedule] = {}
+
+
+def open_schedule(campaign_id: str) -> RetrySchedule:
+    schedule = _schedules.get(campaign_id)
+    if schedule is None:
+        schedule = _schedules[campaign_id] = RetrySchedule(campaign_id)
+    return schedule
+
+
+def close_schedule(campaign_id: str):
+    _schedules.pop(campaign_id, None)
+
+
+def push(campaign_id: str, call_id: int, due: Optional[datetime]):
+    """Hand a freshly scheduled retry to the local dial loop, if this process runs it"""
+    schedule = _schedules.get(campaign_id)
+    if schedule and due:
+        schedule.push(call_id, due)
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import timedelta
+from app.config import settings
+from app.db.unit_of_work import UnitOfWork
+from app.utils.bloom import BloomFilter
+from app.utils.helper import normalize_phone
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Pre-check for the suppression table: a miss is definitive, a hit is confirmed against the DB
+_filter = BloomFilter(settings.SUPPRESSION_BLOOM_CAPACITY)
+_synced_until = None
+# Set once the filter holds the whole table; until then every check goes to the DB
+_loaded = asyncio.Event()
+
+# Re-read a little history on each sync so rows from transactions that committed late aren't missed
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+async def _load(since=None):
+    global _synced_until
+    async with UnitOfWork() as uow:
+        async for rows in uow.suppressions.stream_since(since):
+            for row in rows:
+                _filter.add(row["phone"])
+            if rows:
+                _synced_until = rows[-1]["created_at"]
+    if since is None:
+        _loaded.set()
+
+
+async def rebuild():
+    global _filter, _synced_until
+    _loaded.clear()
+    _filter = BloomFilter(settings.SUPPRESSION_BLOOM_CAPACITY)
+    _synced_until = None
+    await _load()
+
+
+async def sync_loop():
+    """
+    Rebuild at startup, then pick up numbers suppressed by other processes.
+    A rebuild that fails is retried from scratch; checks stay exact meanwhile.
+    """
+    while True:
+        try:
+            if _loaded.is_set():
+                await _load(_synced_until - SYNC_OVERLAP if _synced_until else None)
+            else:
+                await rebuild()
+        except Exception as e:
+            log.exception("suppression_sync_failed", loaded=_loaded.is_set(), error=str(e))
+
+        await asyncio.sleep(settings.SUPPRESSION_SYNC_SECONDS)
+
+
+async def suppress(phones: list, reason: str = "opt_out", campaign_id: str = None):
+    keys = sorted({normalize_phone(p) for p in phones if normalize_phone(p)})
+    if not keys:
+        return []
+
+    async with UnitOfWork() as uow:
+        await uow.suppressions.add_many(keys, reason, campaign_id)
+
+    for key in keys:
+        _filter.add(key)
+    return keys
+
+
+async def unsuppress(phone: str):
+    # The bloom filter keeps the bit until the next rebuild; that only costs an exact check
+    async with UnitOfWork() as uow:
+        await uow.suppressions.remove(normalize_phone(phone))
+
+
+async def find_suppressed(uow, phones: list) -> set:
+    """Normalised keys of `phones` that are on the list; only filter hits reach the DB"""
+    candidates = [key for key in {normalize_phone(p) for p in phones} if key and (key in _filter or not _loaded.is_set())]
+    if not candidates:
+        return set()
+    return await uow.suppressions.find_existing(candidates)
+
+
+async def is_suppressed(phone: str) -> bool:
+    key = normalize_phone(phone)
+    if not key or (_loaded.is_set() and key not in _filter):
+        return False
+    async with UnitOfWork() as uow:
+        return bool(await uow.suppressions.find_existing([key]))
+
+
+async def filter_upload(uow, calls: list):
+    """
+    Drop uploaded calls whose number is suppressed, repeated within the
+    upload, or still waiting to be dialed by another running campaign.
+    Returns (kept_calls, skipped_duplicates, skipped_suppressed).
+    """
+    phones = [call.phone for call in calls]
+    suppressed = await find_suppressed(uow, phones)
+    in_flight = await uow.calls.find_phones_in_running_campaigns(
+        sorted({normalize_phone(p) for p in phones if normalize_phone(p)})
+    )
+
+    kept, seen = [], set()
+    skipped_duplicates = skipped_suppressed = 0
+
+    for call in calls:
+        key = normalize_phone(call.phone)
+        if key in suppressed:
+            skipped_suppressed += 1
+        elif key in seen or key in in_flight:
+            skipped_duplicates += 1
+        else:
+            seen.add(key)
+            kept.append(call)
+
+    return kept, skipped_duplicates, skipped_suppressed
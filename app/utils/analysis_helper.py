@@ -1,18 +1,34 @@
+import asyncio
 import json
-import google.generativeai as genai
+import httpx
 import os
+from app.config import settings
+from app.utils.offload import run_cpu
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+_model = None
 
-# Initialize model with JSON response configuration
-MODEL = genai.GenerativeModel(
-    "gemini-2.0-flash",
-    generation_config={"response_mime_type": "application/json"}
-)
 
-async def send_to_analysis_service(batch_payload: list) -> list:
-    try:
-        prompt = f"""
+def _get_model():
+    """
+    The Gemini client, built on first use: importing google.generativeai
+    costs more than the rest of the app put together, and most processes
+    never run an analysis.
+    """
+    global _model
+    if _model is None:
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+        # Initialize model with JSON response configuration
+        _model = genai.GenerativeModel(
+            "gemini-2.0-flash",
+            generation_config={"response_mime_type": "application/json"}
+        )
+    return _model
+
+def build_prompt(batch_payload: list) -> str:
+    return f"""
         Analyze these call transcripts. For each, extract:
         - call_sid
         - city (string or null)
@@ -22,12 +38,37 @@ async def send_to_analysis_service(batch_payload: list) -> list:
         Transcripts: {json.dumps(batch_payload)}
         """
 
-        # Use the async version of the generate method
-        response = await MODEL.generate_content_async(prompt)
+async def _analyze_gemini(batch_payload: list) -> list:
+    size = sum(len(item.get("transcript") or "") for item in batch_payload)
+    prompt = await run_cpu(build_prompt, batch_payload, size=size)
+
+    # The first call imports the SDK; keep that off the event loop
+    model = _model or await asyncio.to_thread(_get_model)
 
-        # In JSON mode, response.text is guaranteed to be a valid JSON string
-        return json.loads(response.text)
+    # Use the async version of the generate method
+    response = await model.generate_content_async(prompt)
+
+    # In JSON mode, response.text is guaranteed to be a valid JSON string
+    return await run_cpu(json.loads, response.text, size=len(response.text))
+
+async def _analyze_http(batch_payload: list) -> list:
+    """Same batch and result shape as the Gemini path, from an analysis service at ANALYSIS_URL"""
+    async with httpx.AsyncClient(timeout=settings.ANALYSIS_TIMEOUT_SECONDS) as client:
+        response = await client.post(settings.ANALYSIS_URL, json={"calls": batch_payload})
+        response.raise_for_status()
+    return await run_cpu(json.loads, response.content, size=len(response.content))
+
+async def send_to_analysis_service(batch_payload: list) -> list:
+    """
+    Results for the batch, one per analysed call. Errors (rate limits,
+    outages, malformed replies) are raised: the analysis job retries the
+    batch instead of checkpointing past it.
+    """
+    if settings.ANALYSIS_BACKEND == "http":
+        results = await _analyze_http(batch_payload)
+    else:
+        results = await _analyze_gemini(batch_payload)
 
-    except Exception as e:
-        print(f"Gemini error: {e}")
-        return []
+    if not isinstance(results, list):
+        raise ValueError(f"analysis returned {type(results).__name__}, expected a list")
+    return results
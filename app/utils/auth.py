@@ -1,6 +1,5 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
 from datetime import datetime, timedelta
 import os
 
@@ -14,7 +13,12 @@ if not SECRET_KEY:
     raise RuntimeError("JWT_SECRET is not set in environment variables")
 
 
+# python-jose (and the cryptography backend behind it) is imported on the
+# first token, not at startup: webhook-only processes never need it
+
 def create_token():
+    from jose import jwt
+
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {
         "type": "access",
@@ -26,6 +30,8 @@ def create_token():
 def verify_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
+    from jose import jwt, JWTError
+
     token = credentials.credentials
 
     try:
@@ -0,0 +1,52 @@
+import gzip
+import json
+import os
+
+FORMAT_VERSION = 2
+
+# Rows per column block: big enough to compress well, small enough to read one at a time
+BLOCK_ROWS = 10000
+
+
+def write_columns(path: str, rows: list) -> int:
+    """
+    Write dict rows column-by-column as gzip-compressed JSON lines: a
+    header line, then one line per block of BLOCK_ROWS rows.
+
+    Within a block the values of one column sit next to each other, so
+    repetitive columns (status, campaign_id, analysis_status...) compress
+    to almost nothing, and readers can stream the file a block at a time.
+    The file is written to a temp name and renamed, so readers never see
+    a partial archive. Returns the compressed size in bytes.
+    """
+    columns = list(rows[0].keys()) if rows else []
+    header = {"version": FORMAT_VERSION, "rows": len(rows), "columns": columns}
+
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=9) as f:
+        f.write(json.dumps(header, separators=(",", ":")) + "\n")
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = rows[start:start + BLOCK_ROWS]
+            data = {column: [row.get(column) for row in block] for column in columns}
+            f.write(json.dumps({"data": data}, default=str, separators=(",", ":")) + "\n")
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def iter_columns(path: str, columns: list = None):
+    """Yield an archive's rows as lists of dicts, one block at a time, optionally keeping only some columns"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        names = [c for c in header.get("columns", []) if columns is None or c in columns]
+
+        # Version 1 archives are a single JSON document holding every row
+        blocks = [header] if header.get("version", 1) == 1 else (json.loads(line) for line in f)
+
+        for block in blocks:
+            data = block["data"]
+            yield [dict(zip(names, values)) for values in zip(*(data[name] for name in names))]
+
+
+def read_columns(path: str, columns: list = None) -> list:
+    """Read an archive back into dict rows, optionally keeping only some columns"""
+    return [row for block in iter_columns(path, columns) for row in block]
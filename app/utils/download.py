@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import os
+import httpx
+
+# Client errors that another attempt won't fix (expired or missing recordings)
+_PERMANENT_STATUSES = {400, 401, 403, 404, 410}
+
+
+class DownloadError(Exception):
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+def _hash_file(path: str, chunk_size: int):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(block)
+    return hasher
+
+
+def _append(f, hasher, chunk: bytes):
+    hasher.update(chunk)
+    f.write(chunk)
+
+
+async def stream_to_file(client: httpx.AsyncClient, url: str, path: str, chunk_size: int = 262144):
+    """
+    Stream `url` to `path` a chunk at a time, hashing as it goes. Bytes are
+    kept raw (not content-decoded) so Content-Length and Range offsets line
+    up, and land in `path + ".part"` first; when a partial file is already
+    there the request asks for the rest with a Range header, and starts
+    over if the server ignores it. Returns (bytes, sha256 hex) once the file
+    is complete and renamed into place; a transfer cut short leaves the
+    .part file for the next call to resume.
+    """
+    part = path + ".part"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    hasher = await asyncio.to_thread(_hash_file, part, chunk_size) if offset else hashlib.sha256()
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 416:
+            # Our partial file doesn't fit what the server now has
+            os.remove(part)
+            raise DownloadError("range not satisfiable, restarting")
+        if response.status_code in _PERMANENT_STATUSES:
+            raise DownloadError(f"HTTP {response.status_code}", permanent=True)
+        if response.status_code >= 400:
+            raise DownloadError(f"HTTP {response.status_code}")
+
+        if offset and response.status_code != 206:
+            offset, hasher = 0, hashlib.sha256()
+
+        length = response.headers.get("content-length")
+        expected = offset + int(length) if length and length.isdigit() else None
+
+        written = offset
+        f = await asyncio.to_thread(open, part, "ab" if offset else "wb")
+        try:
+            async for chunk in response.aiter_raw(chunk_size):
+                await asyncio.to_thread(_append, f, hasher, chunk)
+                written += len(chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+
+    if expected is not None and written != expected:
+        raise DownloadError(f"got {written} of {expected} bytes")
+
+    os.replace(part, path)
+    return written, hasher.hexdigest()
+
+
+async def download(client: httpx.AsyncClient, url: str, path: str, chunk_size: int = 262144, resume_tries: int = 3):
+    """stream_to_file, resuming straight away after dropped connections and short reads"""
+    for attempt in range(resume_tries):
+        try:
+            return await stream_to_file(client, url, path, chunk_size)
+        except DownloadError as e:
+            if e.permanent or attempt == resume_tries - 1:
+                raise
+        except httpx.TransportError as e:
+            if attempt == resume_tries - 1:
+                raise DownloadError(f"{type(e).__name__}: {e}") from e
@@ -1,4 +1,7 @@
+import hashlib
+import json
 import re
+from datetime import datetime, timezone
 
 def extract_city_from_session(session: dict):
     intents = session.get("intents", [])
@@ -15,35 +18,100 @@ def extract_city_from_session(session: dict):
     
     return None
 
-def extract_transcript_from_session(data: dict) -> str:
-    events = data.get("events") or []
-    transcript_lines = []
-
-    for event in events:
+def extract_interest_from_session(session: dict) -> str:
+    for intent_obj in session.get("intents", []):
+        if intent_obj.get("intent", "").replace(" ", "") == "RIDER_RESEARCH":
+            return "yes"
+    return "no"
+
+_WHITESPACE = re.compile(r"\s+")
+_ROLE_PREFIXES = {"user": "User", "assistant": "Assistant"}
+
+
+def normalize_segment(role: str, content: str):
+    """Cleaned (prefix, content) for one transcript segment, or None when it should be dropped"""
+    prefix = _ROLE_PREFIXES.get((role or "").strip().lower())
+    content = _WHITESPACE.sub(" ", content or "").strip()
+    if not prefix or not content:
+        return None
+    return prefix, content
+
+
+def _event_millis(event: dict):
+    stamp = event.get("timestamp") or event.get("created_at")
+    if not stamp:
+        return None
+    try:
+        return int(datetime.fromisoformat(str(stamp).replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def _event_identity(event: dict) -> str:
+    """
+    What tells this event apart from every other one of the session and
+    stays the same on re-delivery; without a timestamp, id or sequence,
+    the whole event is the only such thing.
+    """
+    # Same key as before for events with a timestamp or id, so stored segments still dedupe
+    if event.get("timestamp") or event.get("id"):
+        return str(event.get("timestamp") or event.get("id"))
+    if event.get("sequence") is not None:
+        return f"sequence:{event['sequence']}"
+    encoded = json.dumps(event, sort_keys=True, default=str, ensure_ascii=False)
+    return "event:" + hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def extract_transcript_segments(events: list) -> list:
+    """
+    Normalised transcript segments from bot events, each with a stable
+    segment_id (so re-delivered events dedupe) and a seq to order by.
+    """
+    segments = []
+
+    for event in events or []:
         if event.get("event_type") != "transcript":
             continue
 
-        event_data = event.get("event_data") or []
-
-        for segment in event_data:
-            role = (segment.get("role") or "").strip().lower()
-            content = (segment.get("content") or "").strip()
+        event_millis = _event_millis(event)
+        event_identity = None
 
-            if not content:
+        for index, segment in enumerate(event.get("event_data") or []):
+            normalized = normalize_segment(segment.get("role"), segment.get("content"))
+            if not normalized:
                 continue
+            prefix, content = normalized
+
+            # 0 is a real sequence number (the first utterance)
+            seq = next(
+                (value for value in (segment.get("sequence"), segment.get("seq"), event.get("sequence")) if value is not None),
+                None
+            )
+            if not isinstance(seq, int):
+                seq = int(seq) if str(seq).isdigit() else None
+            if seq is None and event_millis is not None:
+                seq = event_millis * 1000 + index
+
+            segment_id = segment.get("id") or segment.get("segment_id")
+            if not segment_id:
+                event_identity = event_identity or _event_identity(event)
+                key = f"{event_identity}|{index}|{prefix}|{content}"
+                segment_id = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+            segments.append({
+                "segment_id": str(segment_id),
+                "seq": seq,
+                "role": prefix,
+                "content": content,
+            })
+
+    return segments
 
-            if role == "user":
-                prefix = "User"
-            elif role == "assistant":
-                prefix = "Assistant"
-            else:
-                continue  # skip unknown roles safely
 
-            transcript_lines.append(f"{prefix}: {content}")
-
-    return "\n".join(transcript_lines).strip()
+def extract_transcript_from_session(data: dict) -> str:
+    segments = extract_transcript_segments(data.get("events") or [])
+    return "\n".join(f"{s['role']}: {s['content']}" for s in segments)
 
-import re
 
 def clean_transcript(transcript: str) -> str:
     if not transcript:
@@ -52,23 +120,22 @@ def clean_transcript(transcript: str) -> str:
     cleaned_lines = []
 
     for line in transcript.split("\n"):
-        line = line.strip()
-        if not line:
+        role, sep, content = line.partition(":")
+        if not sep:
             continue
+        normalized = normalize_segment(role, content)
+        if normalized:
+            cleaned_lines.append(f"{normalized[0]}: {normalized[1]}")
 
-        # Normalize whitespace
-        line = re.sub(r"\s+", " ", line)
+    return "\n".join(cleaned_lines)
 
-        # Ensure proper role formatting
-        if line.lower().startswith("user:"):
-            content = line[5:].strip()
-            if content:
-                cleaned_lines.append(f"User: {content}")
 
-        elif line.lower().startswith("assistant:"):
-            content = line[10:].strip()
-            if content:
-                cleaned_lines.append(f"Assistant: {content}")
+def utc_timestamp() -> str:
+    """The one format for TEXT timestamp columns: UTC, microseconds, Z suffix"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
-    return "\n".join(cleaned_lines).strip()
 
+def normalize_phone(phone: str) -> str:
+    """Canonical key for a phone number: digits only, national 10 digits when a country/trunk prefix is present"""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) > 10 else digits
@@ -0,0 +1,170 @@
+import contextvars
+import json
+import logging
+import queue
+import reprlib
+import sys
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from app.config import settings
+
+# Per-request/per-task fields (campaign_id, call_sid, ...) added to every record
+_context = contextvars.ContextVar("log_context", default={})
+
+_listener = None
+_dropped = 0
+
+# Bounded repr: cost stays flat no matter how big the payload is
+_repr = reprlib.Repr()
+_repr.maxlevel = 3
+_repr.maxdict = 12
+_repr.maxlist = 12
+_repr.maxstring = 200
+_repr.maxother = 200
+
+
+def bind(**fields):
+    """Add fields to the log context of the current task; returns a token for reset()"""
+    return _context.set({**_context.get(), **fields})
+
+
+def reset(token):
+    _context.reset(token)
+
+
+@contextmanager
+def log_context(**fields):
+    token = bind(**fields)
+    try:
+        yield
+    finally:
+        reset(token)
+
+
+def _truncate(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        limit = settings.LOG_MAX_FIELD_CHARS
+        return value if len(value) <= limit else f"{value[:limit]}…(+{len(value) - limit})"
+    return _repr.repr(value)
+
+
+class Logger:
+    """
+    Thin structured wrapper over logging.Logger: an event name plus keyword
+    fields. Level is checked before any field is touched, `sample=N` keeps
+    one record in N for chatty events, and values are truncated on the
+    calling side so the queue never holds a whole payload.
+    """
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name)
+        self._counts = {}
+
+    def _log(self, level: int, event: str, sample: int = 0, exc_info=None, **fields):
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample > 1:
+            seen = self._counts.get(event, 0)
+            self._counts[event] = seen + 1
+            if seen % sample:
+                return
+            fields["sampled"] = sample
+
+        fields = {key: _truncate(value) for key, value in fields.items()}
+        self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields, "ctx": _context.get()})
+
+    def debug(self, event: str, **fields):
+        self._log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields):
+        self._log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields):
+        self._log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields):
+        self._log(logging.ERROR, event, **fields)
+
+    def exception(self, event: str, **fields):
+        self._log(logging.ERROR, event, exc_info=True, **fields)
+
+
+def get_logger(name: str) -> Logger:
+    return Logger(name)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "ctx", {}),
+            **getattr(record, "fields", {}),
+        }
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        fields = {**getattr(record, "ctx", {}), **getattr(record, "fields", {})}
+        line = f"{self.formatTime(record)} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: when the writer falls behind, records are counted and dropped"""
+
+    def prepare(self, record):
+        # Merge args and render tracebacks now: the objects they point at may change before the writer runs
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            trace = logging.Formatter().formatException(record.exc_info)
+            record.fields = {**getattr(record, "fields", {}), "exc": trace[-settings.LOG_MAX_FIELD_CHARS * 4:]}
+            record.exc_info = None
+            record.exc_text = None
+        return record
+
+    def enqueue(self, record):
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+
+def setup_logging():
+    """Route the root logger through a bounded queue to a background writer thread"""
+    global _listener
+    if _listener:
+        return
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    records = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.handlers = [_DroppingQueueHandler(records)]
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = QueueListener(records, writer, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush what is queued and stop the writer"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    return _dropped
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from app.config import settings
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and catches the code responsible for stalls.
+
+    A probe coroutine sleeps for `tick` seconds and records how late it
+    wakes up. A watchdog thread watches the probe's heartbeat; once the
+    loop has gone `threshold` seconds without running the probe, some
+    callback is holding it, so the watchdog grabs the loop thread's
+    current stack with sys._current_frames() and keeps it with the stall.
+    """
+
+    def __init__(self, tick: float = 0.05, threshold: float = 0.1, window: int = 1200, max_stalls: int = 50):
+        self.tick = tick
+        self.threshold = threshold
+        self._lags = deque(maxlen=window)
+        self._stalls = deque(maxlen=max_stalls)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = None
+        self._current_stall = None
+        self._task = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            tick=settings.LOOP_MONITOR_TICK_MS / 1000,
+            threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+            window=settings.LOOP_LAG_WINDOW,
+            max_stalls=settings.LOOP_STALL_SAMPLES,
+        )
+
+    def start(self):
+        """Attach to the running loop; call once from a coroutine"""
+        if self._task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._probe())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.tick)
+            lag = max(loop.time() - started - self.tick, 0.0)
+            self._lags.append(lag)
+            self._heartbeat = time.monotonic()
+
+            stall = self._current_stall
+            if stall is not None:
+                self._current_stall = None
+                stall["blocked_ms"] = round(lag * 1000, 1)
+                log.warning("event_loop_blocked", blocked_ms=stall["blocked_ms"], culprit=stall["culprit"])
+
+    def _watch(self):
+        while True:
+            time.sleep(self.threshold / 2)
+            blocked = time.monotonic() - self._heartbeat - self.tick
+            if blocked < self.threshold or self._current_stall is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            stall = {
+                "at": time.time(),
+                "blocked_ms": round(blocked * 1000, 1),
+                "culprit": _culprit(stack),
+                "stack": traceback.format_list(stack[-15:]),
+            }
+            self._current_stall = stall
+            self._stalls.append(stall)
+
+    def percentiles(self) -> dict:
+        lags = sorted(self._lags)
+        if not lags:
+            return {"samples": 0}
+
+        def pick(q):
+            return round(lags[min(int(len(lags) * q), len(lags) - 1)] * 1000, 2)
+
+        return {
+            "samples": len(lags),
+            "p50_ms": pick(0.50),
+            "p95_ms": pick(0.95),
+            "p99_ms": pick(0.99),
+            "max_ms": round(lags[-1] * 1000, 2),
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "tick_ms": self.tick * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "lag": self.percentiles(),
+            "stalls": len(self._stalls),
+        }
+
+    def stalls(self) -> list:
+        return list(reversed(self._stalls))
+
+
+def _culprit(stack) -> str:
+    """Innermost frame in our own code, which is usually the function to fix"""
+    for entry in reversed(stack):
+        if entry.filename.startswith(APP_ROOT):
+            return f"{os.path.relpath(entry.filename, os.path.dirname(APP_ROOT))}:{entry.lineno} in {entry.name}"
+    entry = stack[-1]
+    return f"{entry.filename}:{entry.lineno} in {entry.name}"
+
+
+# One monitor per process
+monitor = LoopMonitor.from_settings()
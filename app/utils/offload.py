@@ -0,0 +1,41 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from app.config import settings
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        workers = settings.OFFLOAD_WORKERS or min(4, os.cpu_count() or 1)
+        if settings.OFFLOAD_POOL == "process":
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="offload")
+    return _pool
+
+
+async def run_cpu(fn, *args, size: int = None):
+    """
+    Run a CPU-bound helper without stalling the event loop.
+
+    Inputs smaller than OFFLOAD_THRESHOLD_BYTES run inline, where a pool
+    hop would cost more than the work. Anything larger (or of unknown
+    size) goes to the offload pool. With OFFLOAD_POOL=process, `fn` and
+    its arguments must be picklable, i.e. module-level functions.
+    """
+    if size is not None and size < settings.OFFLOAD_THRESHOLD_BYTES:
+        return fn(*args)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), functools.partial(fn, *args))
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
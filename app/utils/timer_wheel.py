@@ -0,0 +1,96 @@
+import time
+
+
+class TimerWheel:
+    """
+    Hierarchical timing wheel.
+
+    Level 0 has `slots` buckets of one tick each, every higher level
+    covers `slots` times the span of the one below. Arming and cancelling
+    are O(1); timers in a higher level are cascaded down as the wheel
+    turns, and everything due on a tick is returned as one batch.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 64, levels: int = 3, clock=time.monotonic):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self.levels = levels
+        self._clock = clock
+        self._origin = clock()
+        self._current = 0
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._where = {}
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def _tick_of(self, when: float) -> int:
+        return int((when - self._origin) // self.tick_seconds)
+
+    def _place(self, key, deadline: int):
+        delta = max(deadline - self._current, 1)
+
+        level = 0
+        span = self.slots
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+
+        # Past the horizon: park in the furthest top-level slot and let cascading bring it back
+        if delta >= span:
+            deadline_slot = self._current + span - 1
+        else:
+            deadline_slot = deadline
+
+        slot = (deadline_slot // self.slots ** level) % self.slots
+        self._wheels[level][slot][key] = deadline
+        self._where[key] = (level, slot)
+
+    def arm(self, key, when: float):
+        """Arm (or re-arm) `key` to expire at clock time `when`"""
+        self.cancel(key)
+        self._place(key, self._tick_of(when))
+
+    def cancel(self, key):
+        where = self._where.pop(key, None)
+        if where:
+            level, slot = where
+            self._wheels[level][slot].pop(key, None)
+
+    def advance(self, now: float = None) -> list:
+        """Turn the wheel up to `now` and return every key that expired on the way"""
+        target = self._tick_of(self._clock() if now is None else now)
+        expired = []
+
+        while self._current < target:
+            self._current += 1
+
+            # Cascade higher levels whose bucket boundary was just crossed
+            for level in range(1, self.levels):
+                span = self.slots ** level
+                if self._current % span:
+                    break
+                slot = (self._current // span) % self.slots
+                bucket = self._wheels[level][slot]
+                self._wheels[level][slot] = {}
+                for key, deadline in bucket.items():
+                    del self._where[key]
+                    if deadline <= self._current:
+                        expired.append(key)
+                    else:
+                        self._place(key, deadline)
+
+            slot = self._current % self.slots
+            bucket = self._wheels[0][slot]
+            self._wheels[0][slot] = {}
+            for key, deadline in bucket.items():
+                del self._where[key]
+                if deadline <= self._current:
+                    expired.append(key)
+                else:
+                    self._place(key, deadline)
+
+        return expired
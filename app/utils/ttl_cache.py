@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded LRU map whose entries also expire `ttl` seconds after they
+    were last written. Expired entries are dropped lazily on access and
+    from the cold end whenever something is written.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires = entry
+        if expires <= self._clock():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        now = self._clock()
+        self._data[key] = (value, now + self.ttl)
+        self._data.move_to_end(key)
+
+        while self._data:
+            oldest_key, (_, expires) = next(iter(self._data.items()))
+            if len(self._data) <= self.maxsize and expires > now:
+                break
+            del self._data[oldest_key]
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return entry[0] if entry else default
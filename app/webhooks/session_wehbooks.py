@@ -2,55 +2,68 @@ from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse, Response
 from datetime import datetime as dt
 import json
+import time
+from app.config import settings
 from app.db.unit_of_work import UnitOfWork
-from app.utils.helper import extract_city_from_session
-from app.utils.helper import extract_transcript_from_session
+from app.services import call_index, call_timeouts
+from app.services.pacing import controller as pacing
+from app.utils.helper import extract_city_from_session, extract_interest_from_session
+from app.utils.helper import extract_transcript_segments
+from app.utils.offload import run_cpu
+from app.utils.log import bind as bind_log_context, get_logger
 
 router = APIRouter()
+log = get_logger(__name__)
 
 
 @router.post("/webhooks/session-start")
 async def webhook_session_start(request: Request):
     try:
         data = await request.json()
-        print("Session Start Payload: ", data)
         call_sid = data.get("external_id")
         current_conversation_id = data.get("conversation_id")
         previous_sessions = data.get("previous_sessions", {}).get("sessions", [])
+        bind_log_context(call_sid=call_sid, conversation_id=current_conversation_id)
+        log.debug("session_start", payload=data)
 
         async with UnitOfWork() as uow:
 
             if call_sid:
-                await uow.calls.mark_bot_connected(
+                moved = await uow.calls.mark_bot_connected(
                     call_sid,
-                    current_conversation_id
+                    current_conversation_id,
+                    call_index.lookup(call_sid)
                 )
+                if moved:
+                    call_index.record_transition(call_sid, moved)
+                call_timeouts.cancel_sid(call_sid)
+                # Only the delivery that actually connected the call counts as an answer
+                if moved and moved["from_status"] != moved["to_status"]:
+                    pacing.record_answered(call_sid)
+
+            outcomes = {}
             for session in previous_sessions:
                 conversation_id = session.get("conversation_id")
-                if not conversation_id:
+                if not conversation_id or conversation_id in outcomes:
                     continue
-                if not await uow.calls.exists_by_conversation(conversation_id):
-                    continue
-                print(f"session: {session}")
-                justification = session.get("call_outcome", {}).get("justification", "")
-                print(f"justification: {justification}")
-                intents = session.get("intents", [])
-
-                city = extract_city_from_session(session)
-                print(f"extracted city: {city}")
-
-                interested = "no"
-                for intent_obj in intents:
-                    if intent_obj.get("intent", "").replace(" ", "") == "RIDER_RESEARCH":
-                        interested = "yes"
-                        break
-                await uow.calls.update_justification_and_interest(
-                    conversation_id,
-                    city,
-                    justification,
-                    interested
+                outcomes[conversation_id] = {
+                    "conversation_id": conversation_id,
+                    "preferred_city": extract_city_from_session(session),
+                    "justification": (session.get("call_outcome") or {}).get("justification") or "",
+                    "interested": extract_interest_from_session(session),
+                }
+
+            # One statement for the whole history instead of a lookup + update per session
+            if outcomes:
+                started = time.perf_counter()
+                applied = await uow.calls.apply_session_outcomes(list(outcomes.values()))
+                log.info(
+                    "previous_sessions_applied",
+                    applied=len(applied),
+                    sessions=len(outcomes),
+                    ms=round((time.perf_counter() - started) * 1000, 1),
+                    sample=settings.LOG_SAMPLE_EVERY,
                 )
-                print("justification added")
 
         return JSONResponse(
             status_code=200,
@@ -69,6 +82,7 @@ async def webhook_session_start(request: Request):
         )
 
     except Exception as e:
+        log.exception("session_start_failed", error=str(e))
         return Response(
             content=json.dumps({
                 "http_code": 500,
@@ -81,8 +95,11 @@ async def webhook_session_start(request: Request):
 @router.post("/webhooks/session-end")
 async def webhook_session_end(request: Request):
     try:
-        data = await request.json()
+        # Session payloads carry the whole event history; decode big ones off the loop
+        body = await request.body()
+        data = await run_cpu(json.loads, body, size=len(body))
         call_sid = data.get('metadata', {}).get('call_sid')
+        bind_log_context(call_sid=call_sid)
         start_time_str = data.get('start_time')
         end_time_str = data.get('end_time')
 
@@ -96,29 +113,28 @@ async def webhook_session_end(request: Request):
             end_time = dt.fromisoformat(end_time_str.replace("Z", "+00:00"))
             duration_seconds = int((end_time - start_time).total_seconds())
 
-        transcript_text = extract_transcript_from_session(data)
+        pacing.record_session_end(call_sid, duration_seconds)
 
         async with UnitOfWork() as uow:
 
-            current = await uow.calls.get_status_by_sid(call_sid)
+            route = call_index.lookup(call_sid)
 
-            if current and current["status"] == "user_connected":
-                new_status = "user_end"
-            else:
-                new_status = "bot_end"
-
-            await uow.calls.mark_session_end(
+            moved = await uow.calls.mark_session_end(
                 call_sid,
-                new_status,
-                duration_seconds
+                duration_seconds,
+                route
             )
+            if moved:
+                call_index.record_transition(call_sid, moved)
 
-            # Only update transcript if we actually extracted something
-            if transcript_text:
-                await uow.calls.update_transcript(
-                    call_sid,
-                    transcript_text
-                )
+            # The payload carries the whole history: merging it in fills any
+            # transcript-events delivery that was lost (the rest dedupe by id)
+            segments = await run_cpu(
+                extract_transcript_segments, data.get("events") or [], size=len(body)
+            )
+            if segments:
+                await uow.transcripts.append_segments(call_sid, segments)
+            await uow.transcripts.finalize_transcript(call_sid, route)
 
         return JSONResponse(
             status_code=200,
@@ -126,7 +142,7 @@ async def webhook_session_end(request: Request):
         )
 
     except Exception as e:
-        print("Session end error:", str(e))
+        log.exception("session_end_failed", error=str(e))
         return JSONResponse(
             status_code=200,
             content={"http_code": 200, "response": {"data": {}}}
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from app.db.unit_of_work import UnitOfWork
-import datetime
+from app.services import call_index, call_timeouts, recordings, retry_schedule
+from app.services.pacing import controller as pacing
+from app.utils.helper import utc_timestamp
 
 router = APIRouter()
 
@@ -33,26 +35,44 @@ async def exotel_status_callback(request: Request):
     if not call_sid or not final_status:
         return JSONResponse(status_code=200, content={"ok": True})
 
-    async with UnitOfWork() as uow:
-
-        row = await uow.calls.get_call_status_and_campaign(call_sid)
+    call_timeouts.cancel_sid(call_sid)
 
-        if not row or row["status"] in ("completed", "failed", "missed", "rejected"):
-            return JSONResponse(status_code=200, content={"ok": True})
+    outcome = retry_schedule.EXOTEL_RETRY_OUTCOMES.get(str(status).lower())
 
-        timestamp = datetime.datetime.utcnow().isoformat()
+    async with UnitOfWork() as uow:
 
-        await uow.calls.update_status_from_callback(
+        # One conditional update: duplicates and out-of-order callbacks come back empty
+        moved = await uow.calls.update_status_from_callback(
             call_sid,
             final_status,
             recording_url,
-            timestamp
+            utc_timestamp(),
+            retry_schedule.RETRY_POLICIES[outcome] if outcome else None,
+            call_index.lookup(call_sid)
         )
 
-        if final_status == "completed":
-            await uow.campaigns.increment_completed(row["campaign_id"])
+        if moved and final_status == "completed":
+            await uow.campaigns.increment_completed(moved["campaign_id"])
+
+        elif moved and final_status == "failed":
+            await uow.campaigns.increment_failed(moved["campaign_id"])
+
+    if not moved:
+        return JSONResponse(status_code=200, content={"ok": True})
+
+    call_index.record_transition(call_sid, moved)
+
+    if final_status == "completed":
+        # Answers that reached the bot were already counted at session-start
+        if moved["from_status"] == "calling":
+            pacing.record_answered()
+        pacing.record_session_end(call_sid)
+    else:
+        pacing.record_unanswered()
+
+    retry_schedule.push(moved["campaign_id"], moved["id"], moved["next_attempt_at"])
 
-        elif final_status == "failed":
-            await uow.campaigns.increment_failed(row["campaign_id"])
+    if recording_url:
+        recordings.notify()
 
     return JSONResponse(status_code=200, content={"ok": True})
@@ -1,8 +1,16 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 import datetime
+import json
 # from app.utils.helper import extract_preferred_city_from_events
+from app.config import settings
 from app.db.unit_of_work import UnitOfWork
+from app.services import call_index, call_timeouts
+from app.utils.helper import extract_transcript_segments
+from app.utils.log import get_logger
+from app.utils.offload import run_cpu
+
+log = get_logger(__name__)
 
 router = APIRouter()
 
@@ -10,7 +18,8 @@ router = APIRouter()
 async def webhook_transcript_events(request: Request):
 
     try:
-        data = await request.json()
+        body = await request.body()
+        data = await run_cpu(json.loads, body, size=len(body))
 
         call_sid = data.get("external_id")
         events = data.get("events", [])
@@ -18,13 +27,8 @@ async def webhook_transcript_events(request: Request):
         if not call_sid or not events:
             return JSONResponse(status_code=200, content={"http_code": 200})
 
-        has_transcript = any(
-            e.get("event_type") == "transcript"
-            for e in events
-        )
-
-        if not has_transcript:
-            return JSONResponse(status_code=200, content={"http_code": 200})
+        # Normalised once here; session-end only concatenates what was stored
+        segments = await run_cpu(extract_transcript_segments, events, size=len(body))
 
         # preferred_city = extract_preferred_city_from_events(events)
 
@@ -33,9 +37,24 @@ async def webhook_transcript_events(request: Request):
             # if preferred_city:
             #     await uow.calls.update_preferred_city(call_sid, preferred_city)
 
-            await uow.calls.mark_bot_connected_if_needed(
-                call_sid
+            moved = await uow.calls.mark_bot_connected(
+                call_sid,
+                route=call_index.lookup(call_sid)
             )
+            if moved:
+                call_index.record_transition(call_sid, moved)
+
+            # Events with nothing to keep (blank or unknown roles) still connect the call
+            if segments:
+                await uow.transcripts.append_segments(
+                    call_sid,
+                    segments
+                )
+
+        call_timeouts.cancel_sid(call_sid)
+
+        # Several per answered call: sampled
+        log.info("transcript_segments_stored", call_sid=call_sid, segments=len(segments), sample=settings.LOG_SAMPLE_EVERY)
 
         return JSONResponse(
             status_code=200,
@@ -0,0 +1,61 @@
+import asyncio
+from app.config import settings
+from app.services.call_timeouts import call_timeout_loop
+from app.services.pacing import sync_from_db_loop
+from app.services.archive_service import archive_loop
+from app.services import analysis_jobs, caller_ids, campaign_control, recordings, suppression_service
+from app.utils.loop_monitor import monitor as loop_monitor
+from app.utils.log import setup_logging
+from app.services.campaign_service import purge_loop, resume_campaigns, spawn_dial_loop
+
+
+def start_engines():
+    """Start the dialer and analysis engines as background tasks on the running loop"""
+    # Fail calls that never left 'calling' once their deadline passes
+    asyncio.create_task(call_timeout_loop())
+
+    # Resume any campaigns that were running, and take over ones whose owner died
+    asyncio.create_task(resume_campaigns())
+
+    # Pause/resume/delete from any process reach the dial loops here straight away
+    asyncio.create_task(campaign_control.listen_loop(on_resume=spawn_dial_loop))
+
+    # Run queued analysis jobs and resume interrupted ones from their checkpoints
+    asyncio.create_task(analysis_jobs.job_loop())
+
+    # Finish purging deleted campaigns, including ones a failed or killed process left behind
+    asyncio.create_task(purge_loop())
+
+    # Move finished, analysed campaigns out of the hot calls table
+    asyncio.create_task(archive_loop())
+
+    # Rotation weights follow each caller ID's recent answer/reject rates
+    asyncio.create_task(caller_ids.sync_health_loop())
+
+    # Copy recordings to local storage before Exotel's URLs expire
+    if settings.RECORDING_CONCURRENCY > 0:
+        asyncio.create_task(recordings.fetcher.run())
+
+
+async def run_worker():
+    """Dialer/analysis-only process; coordinates with API processes through campaign_state"""
+    setup_logging()
+
+    print("\n" + "="*50)
+    print("Call Campaign System - Dialer Worker")
+    print("="*50)
+    print(f"Worker: {settings.WORKER_ID}")
+    print(f"Exotel Account: {settings.EXOTEL_ACCOUNT_SID}")
+    print("="*50 + "\n")
+
+    loop_monitor.start()
+
+    start_engines()
+
+    # Webhooks land in the API processes, so pacing reads outcomes back from the DB
+    asyncio.create_task(sync_from_db_loop())
+
+    # The dial loops check opt-outs before every call
+    asyncio.create_task(suppression_service.sync_loop())
+
+    await asyncio.Event().wait()
@@ -0,0 +1,77 @@
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from recorder import WebhookRecorder
+
+LINES = {
+    "assistant": [
+        "Namaste, main delivery partner hiring team se bol rahi hoon.",
+        "Aap kis city mein kaam karna chahenge?",
+        "Kya aapke paas two-wheeler aur driving licence hai?",
+        "Dhanyavaad, hamari team aapse jaldi contact karegi.",
+    ],
+    "user": [
+        "Haan ji, boliye.",
+        "Main Bangalore mein rehta hoon.",
+        "Haan, bike hai aur licence bhi.",
+        "Theek hai, thank you.",
+    ],
+}
+
+
+def _iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class MockBot:
+    """
+    Plays the voice bot's side of an answered call against the app's
+    webhooks: session-start, a transcript-events post per turn (paced
+    over the talk time), then session-end carrying the whole history.
+    """
+
+    def __init__(self, recorder: WebhookRecorder, turns: int, rng: random.Random):
+        self.recorder = recorder
+        self.turns = turns
+        self.rng = rng
+
+    async def run_session(self, call_sid: str, talk_seconds: float):
+        conversation_id = str(uuid.uuid4())
+        started = datetime.now(timezone.utc)
+
+        await self.recorder.post("session-start", "/webhooks/session-start", json={
+            "external_id": call_sid,
+            "conversation_id": conversation_id,
+            "previous_sessions": {"sessions": []},
+        })
+
+        events = []
+        for turn in range(self.turns):
+            await asyncio.sleep(talk_seconds / self.turns)
+            role = "assistant" if turn % 2 == 0 else "user"
+            event = {
+                "event_type": "transcript",
+                "timestamp": _iso(datetime.now(timezone.utc)),
+                "event_data": [{
+                    "id": f"{conversation_id}-{turn}",
+                    "sequence": turn,
+                    "role": role,
+                    "content": self.rng.choice(LINES[role]),
+                }],
+            }
+            events.append(event)
+            await self.recorder.post("transcript-events", "/webhooks/transcript-events", json={
+                "external_id": call_sid,
+                "events": [event],
+            })
+
+        ended = max(datetime.now(timezone.utc), started + timedelta(seconds=1))
+        await self.recorder.post("session-end", "/webhooks/session-end", json={
+            "metadata": {"call_sid": call_sid},
+            "conversation_id": conversation_id,
+            "start_time": _iso(started),
+            "end_time": _iso(ended),
+            "events": events,
+            "intents": [{"intent": "CITY", "reasoning": "User said they live in 'Bangalore'"}],
+        })
@@ -0,0 +1,158 @@
+import asyncio
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+from fastapi import FastAPI, Request, Response
+from mock_bot import MockBot
+from recorder import WebhookRecorder
+
+# Exotel statuses for calls that never reach the bot, with their share of misses
+MISSED_OUTCOMES = (("no-answer", 0.5), ("busy", 0.4), ("failed", 0.1))
+
+
+@dataclass
+class ExotelOptions:
+    answer_rate: float = 0.35
+    api_latency_ms: float = 250
+    ring_seconds: tuple = (3.0, 12.0)
+    talk_seconds: float = 20.0
+    recording_kb: int = 64
+
+
+@dataclass
+class MockCall:
+    sid: str
+    phone: str
+    callback_url: str
+    status: str = "in-progress"
+    duration: int = 0
+    recording_url: str = ""
+    created: str = field(default_factory=lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def call_xml(account_sid: str, call: MockCall) -> str:
+    """The TwilioResponse document Exotel returns for Calls/connect and Calls/{sid}"""
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<TwilioResponse>
+ <Call>
+  <Sid>{call.sid}</Sid>
+  <ParentCallSid/>
+  <DateCreated>{call.created}</DateCreated>
+  <DateUpdated>{call.created}</DateUpdated>
+  <AccountSid>{account_sid}</AccountSid>
+  <To>{call.phone}</To>
+  <From>{call.phone}</From>
+  <PhoneNumberSid>08039591234</PhoneNumberSid>
+  <Status>{call.status}</Status>
+  <StartTime>{call.created}</StartTime>
+  <EndTime/>
+  <Duration>{call.duration or ''}</Duration>
+  <Price/>
+  <Direction>outbound-api</Direction>
+  <AnsweredBy/>
+  <ForwardedFrom/>
+  <CallerName/>
+  <Uri>/v1/Accounts/{account_sid}/Calls/{call.sid}</Uri>
+  <RecordingUrl>{call.recording_url}</RecordingUrl>
+ </Call>
+</TwilioResponse>"""
+
+
+class MockExotel:
+    """
+    Answers Calls/connect and Calls/{sid} like Exotel (with API latency),
+    then plays each call out: ring, and either hand the call to the mock
+    bot and report `completed` with a recording, or report a miss. Status
+    callbacks go to the StatusCallback URL the app sent, as JSON.
+    """
+
+    def __init__(self, recorder: WebhookRecorder, bot: MockBot, options: ExotelOptions, base_url: str, seed: int = 1):
+        self.recorder = recorder
+        self.bot = bot
+        self.options = options
+        self.base_url = base_url
+        self.rng = random.Random(seed)
+        self.calls = {}
+        self.dial_times = []
+        self.finished_phones = set()
+        self.outcomes = {}
+        self.finished = asyncio.Event()
+        self.expected = None
+        self._tasks = set()
+        self.recording = self.rng.randbytes(options.recording_kb * 1024)
+        self.app = self._build()
+
+    def expect(self, calls: int):
+        self.expected = calls
+
+    def _latency(self) -> float:
+        return self.options.api_latency_ms / 1000 * self.rng.uniform(0.5, 1.5)
+
+    def _build(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v1/Accounts/{account_sid}/Calls/connect")
+        async def connect(account_sid: str, request: Request):
+            form = await request.form()
+            await asyncio.sleep(self._latency())
+            call = MockCall(sid=uuid.uuid4().hex, phone=form.get("From"), callback_url=form.get("StatusCallback"))
+            self.calls[call.sid] = call
+            self.dial_times.append(time.perf_counter())
+
+            task = asyncio.create_task(self._play(call))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return Response(call_xml(account_sid, call), media_type="application/xml")
+
+        @app.get("/v1/Accounts/{account_sid}/Calls/{call_sid}")
+        async def details(account_sid: str, call_sid: str):
+            await asyncio.sleep(self._latency())
+            call = self.calls.get(call_sid)
+            if call is None:
+                return Response(status_code=404)
+            return Response(call_xml(account_sid, call), media_type="application/xml")
+
+        @app.get("/recordings/{call_sid}.mp3")
+        async def recording(call_sid: str):
+            return Response(self.recording, media_type="audio/mpeg")
+
+        return app
+
+    async def _play(self, call: MockCall):
+        await asyncio.sleep(self.rng.uniform(*self.options.ring_seconds))
+
+        if self.rng.random() < self.options.answer_rate:
+            talk = self.rng.expovariate(1 / self.options.talk_seconds)
+            await self.bot.run_session(call.sid, talk)
+            call.status = "completed"
+            call.duration = max(int(talk), 1)
+            call.recording_url = f"{self.base_url}/recordings/{call.sid}.mp3"
+        else:
+            roll, cumulative = self.rng.random(), 0.0
+            for status, share in MISSED_OUTCOMES:
+                cumulative += share
+                if roll < cumulative:
+                    break
+            call.status = status
+
+        await self.recorder.post("status-callback", urlsplit(call.callback_url).path, json={
+            "CallSid": call.sid,
+            "Status": call.status,
+            "Direction": "outbound-api",
+            "DateCreated": call.created,
+            "ConversationDuration": call.duration,
+            "RecordingUrl": call.recording_url or None,
+        })
+
+        self.outcomes[call.status] = self.outcomes.get(call.status, 0) + 1
+        self.finished_phones.add(call.phone)
+        if self.expected and len(self.finished_phones) >= self.expected:
+            self.finished.set()
+
+    def dials_per_minute(self) -> float:
+        if len(self.dial_times) < 2:
+            return 0.0
+        return (len(self.dial_times) - 1) / (self.dial_times[-1] - self.dial_times[0]) * 60
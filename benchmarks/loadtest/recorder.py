@@ -0,0 +1,56 @@
+import time
+from collections import defaultdict
+import httpx
+
+
+def percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class WebhookRecorder:
+    """Client-side latency and outcome of every webhook the mocks deliver to the app, by webhook name"""
+
+    def __init__(self, client: httpx.AsyncClient, base_url: str):
+        self.client = client
+        self.base_url = base_url
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.first_at = None
+        self.last_at = None
+
+    async def post(self, name: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(self.base_url + path, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        finished = time.perf_counter()
+
+        self.first_at = self.first_at or started
+        self.last_at = finished
+        if ok:
+            self.latencies[name].append(finished - started)
+        else:
+            self.errors[name] += 1
+
+    def report(self) -> dict:
+        report = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            ordered = sorted(self.latencies[name])
+            report[name] = {
+                "count": len(ordered),
+                "errors": self.errors[name],
+                "p50_ms": round(percentile(ordered, 0.5) * 1000, 1),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+            }
+        return report
+
+    def per_second(self) -> float:
+        total = sum(len(v) for v in self.latencies.values())
+        if not total or self.last_at == self.first_at:
+            return 0.0
+        return total / (self.last_at - self.first_at)
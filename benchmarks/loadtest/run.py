@@ -0,0 +1,303 @@
+"""
+End-to-end load test: the real app (own process, real Postgres) against a
+mock Exotel, a mock voice bot and a stub analysis service.
+
+The mock Exotel answers Calls/connect and Calls/{sid} with Exotel's XML and
+API latency, rings each call, hands answered ones to the mock bot
+(session-start, transcript-events per turn, session-end) and then fires the
+status callback; recordings are served for the recording fetcher. Once
+every uploaded number has had its first outcome the campaign is paused
+and analysed through ANALYSIS_BACKEND=http.
+
+Reports dial throughput, webhook latency p50/p99 (as the mocks saw it),
+webhooks/second, DB admission queue wait by priority, event-loop lag and
+the per-stage timeline. --json saves the report and --compare prints the
+change against a saved one, to check a performance change for regressions.
+
+DATABASE_URL must point at a migrated scratch database. Extra app settings
+go through --app-env, e.g. --app-env PACING_TARGET_SESSIONS=40.
+
+    python benchmarks/loadtest/run.py --calls 2000 --answer-rate 0.35 --app-env CALL_INTERVAL_SECONDS=0
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import httpx
+import uvicorn
+import stub_analysis
+from mock_bot import MockBot
+from mock_exotel import ExotelOptions, MockExotel
+from recorder import WebhookRecorder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ADMIN = {"username": "loadtest", "password": "loadtest"}
+
+# Metrics compared by --compare: (label, path into the report, higher is better)
+KEY_METRICS = [
+    ("dials/min", ("dialing", "dials_per_minute"), True),
+    ("webhooks/s", ("webhooks", "per_second"), True),
+    ("status-callback p99 ms", ("webhooks", "latency", "status-callback", "p99_ms"), False),
+    ("session-end p99 ms", ("webhooks", "latency", "session-end", "p99_ms"), False),
+    ("transcript-events p99 ms", ("webhooks", "latency", "transcript-events", "p99_ms"), False),
+    ("webhook pool wait p99 ms", ("db", "queue_wait", "webhook", "p99_ms"), False),
+    ("background pool wait p99 ms", ("db", "queue_wait", "background", "p99_ms"), False),
+    ("loop lag max ms", ("loop", "max_ms"), False),
+    ("analysis seconds", ("analysis", "seconds"), False),
+]
+
+
+async def serve(app, port: int):
+    """Run `app` on this loop; returns (server, task) once it accepts connections"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+def start_app(args) -> subprocess.Popen:
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    env = {
+        **os.environ,
+        "EXOTEL_SCHEME": "http",
+        "EXOTEL_SUBDOMAIN": f"127.0.0.1:{args.exotel_port}",
+        "EXOTEL_API_KEY": "loadtest",
+        "EXOTEL_API_TOKEN": "loadtest",
+        "EXOTEL_ACCOUNT_SID": "loadtest",
+        "EXOTEL_CALLER_ID": os.environ.get("EXOTEL_CALLER_ID", "08039590000"),
+        "CALLBACK_BASE_URL": app_url,
+        "ANALYSIS_BACKEND": "http",
+        "ANALYSIS_URL": f"http://127.0.0.1:{args.analysis_port}/analyze",
+        "JWT_SECRET": os.environ.get("JWT_SECRET", "loadtest-secret"),
+        "ADMIN_USERNAME": ADMIN["username"],
+        "ADMIN_PASSWORD": ADMIN["password"],
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "SENTRY_DSN": "",
+    }
+    for pair in args.app_env:
+        key, _, value = pair.partition("=")
+        env[key] = value
+
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(args.app_port)],
+        cwd=ROOT,
+        env=env,
+    )
+
+
+async def wait_healthy(client: httpx.AsyncClient, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("app did not become healthy")
+
+
+async def sample_health(client: httpx.AsyncClient, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            samples.append((await client.get("/health")).json())
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), 1)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    exotel_url = f"http://127.0.0.1:{args.exotel_port}"
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=60) as api, \
+            httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=args.webhook_connections)) as hooks:
+
+        recorder = WebhookRecorder(hooks, app_url)
+        bot = MockBot(recorder, args.turns, rng)
+        exotel = MockExotel(recorder, bot, ExotelOptions(
+            answer_rate=args.answer_rate,
+            api_latency_ms=args.api_latency_ms,
+            ring_seconds=(args.ring_min, args.ring_max),
+            talk_seconds=args.talk_mean,
+            recording_kb=args.recording_kb,
+        ), exotel_url, args.seed)
+        analysis_app = stub_analysis.create_app(args.analysis_latency_ms, args.analysis_per_call_ms, args.seed)
+
+        servers = [await serve(exotel.app, args.exotel_port), await serve(analysis_app, args.analysis_port)]
+        app_process = start_app(args)
+
+        try:
+            await wait_healthy(api)
+            token = (await api.post("/api/auth/login", json=ADMIN)).json()["access_token"]
+            api.headers["Authorization"] = f"Bearer {token}"
+
+            calls = [{"name": f"Load {i}", "phone": f"9{i:09d}"} for i in range(args.calls)]
+            upload = await api.post("/api/campaigns/upload", json={"name": "loadtest", "calls": calls})
+            upload.raise_for_status()
+            campaign_id = upload.json()["campaign_id"]
+            exotel.expect(args.calls)
+
+            samples, stop = [], asyncio.Event()
+            sampler = asyncio.create_task(sample_health(api, samples, stop))
+
+            started = time.perf_counter()
+            (await api.post(f"/api/campaigns/{campaign_id}/start")).raise_for_status()
+            try:
+                await asyncio.wait_for(exotel.finished.wait(), args.timeout)
+            except asyncio.TimeoutError:
+                print(f"timed out with {len(exotel.finished_phones)}/{args.calls} calls finished", file=sys.stderr)
+            dialing_seconds = time.perf_counter() - started
+
+            # Retries would keep dialing for hours; the first attempts are the load
+            await api.post(f"/api/campaigns/{campaign_id}/pause")
+
+            analysis_started = time.perf_counter()
+            await api.post(f"/api/campaigns/{campaign_id}/analyze")
+            analysis_status = None
+            while time.perf_counter() - analysis_started < args.timeout:
+                analysis_status = (await api.get(f"/api/campaigns/{campaign_id}/stats")).json().get("analysis_status")
+                if analysis_status in ("completed", "failed"):
+                    break
+                await asyncio.sleep(1)
+            analysis_seconds = time.perf_counter() - analysis_started
+
+            stop.set()
+            await sampler
+            health = (await api.get("/health")).json()
+            timeline = (await api.get(f"/api/campaigns/{campaign_id}/timeline")).json()
+
+        finally:
+            app_process.terminate()
+            app_process.wait(timeout=30)
+            for server, _ in servers:
+                server.should_exit = True
+            await asyncio.gather(*(task for _, task in servers))
+
+    lags = [s["loop"]["lag"].get("max_ms", 0) for s in samples if "loop" in s]
+    return {
+        "settings": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "dialing": {
+            "calls": args.calls,
+            "dialed": len(exotel.dial_times),
+            "finished": len(exotel.finished_phones),
+            "seconds": round(dialing_seconds, 1),
+            "dials_per_minute": round(exotel.dials_per_minute(), 1),
+            "outcomes": exotel.outcomes,
+        },
+        "webhooks": {
+            "per_second": round(recorder.per_second(), 1),
+            "latency": recorder.report(),
+        },
+        "db": {
+            "queue_wait": health["db"]["queue_wait"],
+            "shed": health["db"]["shed"],
+            "peak_in_use": max((s["db"]["in_use"] for s in samples if "db" in s), default=0),
+            "peak_waiting": max((sum(s["db"]["waiting"].values()) for s in samples if "db" in s), default=0),
+        },
+        "loop": {"max_ms": max(lags, default=0), "final": health["loop"]},
+        "analysis": {
+            "status": analysis_status,
+            "seconds": round(analysis_seconds, 1),
+            "batches": analysis_app.state.batches,
+            "calls": analysis_app.state.calls,
+        },
+        "timeline": timeline.get("spans"),
+    }
+
+
+def metric(report: dict, path: tuple):
+    for key in path:
+        if not isinstance(report, dict) or key not in report:
+            return None
+        report = report[key]
+    return report
+
+
+def print_report(report: dict):
+    d = report["dialing"]
+    print(f"\ndialed {d['dialed']} / finished {d['finished']} of {d['calls']} calls in {d['seconds']} s "
+          f"-> {d['dials_per_minute']} dials/min  outcomes {d['outcomes']}")
+
+    print(f"\nwebhooks: {report['webhooks']['per_second']}/s")
+    print(f"  {'webhook':<20}{'count':>8}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, r in report["webhooks"]["latency"].items():
+        print(f"  {name:<20}{r['count']:>8}{r['errors']:>8}{r['p50_ms']:>9}{r['p99_ms']:>9}{r['max_ms']:>9}")
+
+    db = report["db"]
+    print(f"\ndb pool: peak in use {db['peak_in_use']}, peak waiting {db['peak_waiting']}, shed {db['shed']}")
+    for priority, wait in db["queue_wait"].items():
+        print(f"  {priority:<12} {wait}")
+
+    print(f"\nloop lag max {report['loop']['max_ms']} ms")
+    a = report["analysis"]
+    print(f"analysis {a['status']} in {a['seconds']} s ({a['batches']} batches, {a['calls']} calls)")
+
+    print(f"\n  {'timeline span (s)':<28}{'samples':>8}{'p50':>8}{'p90':>8}{'p99':>8}")
+    for name, span in (report["timeline"] or {}).items():
+        p50, p90, p99 = (round(span[q] or 0, 2) for q in ("p50", "p90", "p99"))
+        print(f"  {name:<28}{span['samples']:>8}{p50:>8}{p90:>8}{p99:>8}")
+
+
+def print_comparison(report: dict, baseline: dict):
+    print(f"\n{'metric':<30}{'baseline':>12}{'now':>12}{'change':>10}")
+    for label, path, higher_is_better in KEY_METRICS:
+        before, after = metric(baseline, path), metric(report, path)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  worse" if worse and abs(change) >= 10 else ""
+        print(f"{label:<30}{before:>12}{after:>12}{change:>9.1f}%{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--answer-rate", type=float, default=0.35)
+    parser.add_argument("--api-latency-ms", type=float, default=250, help="mean Exotel API latency")
+    parser.add_argument("--ring-min", type=float, default=3.0)
+    parser.add_argument("--ring-max", type=float, default=12.0)
+    parser.add_argument("--talk-mean", type=float, default=20.0, help="mean bot session length in seconds")
+    parser.add_argument("--turns", type=int, default=8, help="transcript turns per answered call")
+    parser.add_argument("--recording-kb", type=int, default=64)
+    parser.add_argument("--analysis-latency-ms", type=float, default=800)
+    parser.add_argument("--analysis-per-call-ms", type=float, default=20)
+    parser.add_argument("--webhook-connections", type=int, default=200)
+    parser.add_argument("--app-port", type=int, default=8100)
+    parser.add_argument("--exotel-port", type=int, default=8101)
+    parser.add_argument("--analysis-port", type=int, default=8102)
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds to wait for dialing and analysis")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--compare", help="baseline report to compare against")
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        parser.error("DATABASE_URL must point at a migrated scratch database")
+
+    report = asyncio.run(run(args))
+
+    # Saved first, so a run's numbers survive any problem printing them
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import asyncio
+import random
+from fastapi import FastAPI, Request
+
+CITIES = ["Bangalore", "Mumbai", "Delhi", "Hyderabad", "Chennai", None]
+
+
+def create_app(latency_ms: float, per_call_ms: float, seed: int = 1) -> FastAPI:
+    """
+    Stands in for Gemini behind ANALYSIS_BACKEND=http: takes the batch the
+    app would have put in the prompt and answers with the same result
+    shape, after a latency that grows with the batch.
+    """
+    app = FastAPI()
+    rng = random.Random(seed)
+    app.state.batches = 0
+    app.state.calls = 0
+
+    @app.post("/analyze")
+    async def analyze(request: Request):
+        calls = (await request.json()).get("calls", [])
+        await asyncio.sleep((latency_ms + per_call_ms * len(calls)) / 1000)
+        app.state.batches += 1
+        app.state.calls += len(calls)
+        return [
+            {
+                "call_sid": call.get("call_sid"),
+                "city": rng.choice(CITIES),
+                "interest": rng.choice(["yes", "no"]),
+                "outcome": "stub analysis",
+            }
+            for call in calls
+        ]
+
+    return app
@@ -0,0 +1,118 @@
+"""
+Event-loop latency while session-end payloads are decoded and turned into
+transcripts, inline versus through app.utils.offload.
+
+A probe task sleeps in short ticks and records how late it wakes up; the
+lateness is the time the loop spent stuck in somebody else's CPU work, i.e.
+how long a webhook arriving at that moment would have waited.
+
+    python benchmarks/offload_loop_latency.py --payloads 40 --turns 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.config insists on Exotel credentials at import; the benchmark never dials
+for var in ("EXOTEL_API_KEY", "EXOTEL_API_TOKEN", "EXOTEL_SUBDOMAIN", "EXOTEL_ACCOUNT_SID"):
+    os.environ.setdefault(var, "benchmark")
+
+from app.config import settings  # noqa: E402
+from app.utils import offload  # noqa: E402
+from app.utils.helper import extract_transcript_from_session  # noqa: E402
+
+WORDS = "haan ji main Bangalore se bol raha hoon delivery partner job ke baare mein".split()
+
+
+def make_payload(rng: random.Random, turns: int) -> bytes:
+    events = []
+    for turn in range(turns):
+        events.append({
+            "event_type": "transcript",
+            "timestamp": f"2026-10-19T10:{turn // 60 % 60:02d}:{turn % 60:02d}Z",
+            "event_data": [{
+                "role": "user" if turn % 2 else "assistant",
+                "content": "  ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40))),
+            }],
+        })
+    return json.dumps({"metadata": {"call_sid": "bench"}, "events": events}).encode()
+
+
+async def handle(body: bytes, offloaded: bool):
+    """The CPU part of the session-end fallback path"""
+    if offloaded:
+        data = await offload.run_cpu(json.loads, body, size=len(body))
+        return await offload.run_cpu(extract_transcript_from_session, data, size=len(body))
+    data = json.loads(body)
+    return extract_transcript_from_session(data)
+
+
+async def probe(lags: list, stop: asyncio.Event, tick: float):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(tick)
+        lags.append(max(loop.time() - started - tick, 0.0))
+
+
+async def run(payloads: list, offloaded: bool, concurrency: int, tick: float) -> dict:
+    lags = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, stop, tick))
+    await asyncio.sleep(tick * 5)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(body):
+        async with semaphore:
+            await handle(body, offloaded)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(body) for body in payloads))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(lags) * 1000,
+        "p99": lags[int(len(lags) * 0.99) - 1] * 1000,
+        "max": lags[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", type=int, default=40, help="session-end payloads to process")
+    parser.add_argument("--turns", type=int, default=2000, help="transcript events per payload")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--tick", type=float, default=0.005, help="probe sleep in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = [make_payload(rng, args.turns) for _ in range(args.payloads)]
+    mean_kb = sum(len(p) for p in payloads) / len(payloads) / 1024
+    print(f"{args.payloads} payloads, {mean_kb:.0f} KiB each, threshold {settings.OFFLOAD_THRESHOLD_BYTES} B")
+
+    settings.OFFLOAD_WORKERS = args.workers
+    print(f"{'mode':<10}{'total s':>9}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    for label, offloaded, pool in (("inline", False, None), ("thread", True, "thread"), ("process", True, "process")):
+        if pool:
+            settings.OFFLOAD_POOL = pool
+        r = asyncio.run(run(payloads, offloaded, args.concurrency, args.tick))
+        offload.shutdown()
+        print(f"{label:<10}{r['elapsed']:>9.2f}{r['p50']:>12.2f}{r['p99']:>12.2f}{r['max']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
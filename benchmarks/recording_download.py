@@ -0,0 +1,160 @@
+"""
+Recording downloads against a local fake recording server, through the same
+app.utils.download path the recording fetcher uses.
+
+The server serves deterministic random "recordings" with Range support and
+can cut a configurable share of responses off half-way, so resume and
+checksum handling get exercised. Reports throughput, how many transfers had
+to resume, whether every file matched the server's sha256, and peak RSS
+(which stays flat as file size grows, since nothing is buffered whole).
+
+    python benchmarks/recording_download.py --files 40 --size-mb 8 --concurrency 4 --drop-rate 0.3
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from app.utils.download import DownloadError, download  # noqa: E402
+
+
+def make_recordings(files: int, size: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    return {f"/rec/{i}.mp3": rng.randbytes(size) for i in range(files)}
+
+
+def make_handler(recordings: dict, drop_rate: float, seed: int):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    stats = {"requests": 0, "ranged": 0, "dropped": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = recordings.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            start = 0
+            range_header = self.headers.get("Range", "")
+            with lock:
+                stats["requests"] += 1
+                drop = rng.random() < drop_rate
+                if range_header:
+                    stats["ranged"] += 1
+                if drop:
+                    stats["dropped"] += 1
+
+            if range_header.startswith("bytes="):
+                start = int(range_header[6:].split("-")[0])
+                if start >= len(body):
+                    self.send_response(416)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            else:
+                self.send_response(200)
+
+            payload = body[start:]
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+
+            # A dropped response promises the full length and closes half-way through
+            end = len(payload) // 2 if drop else len(payload)
+            view = memoryview(payload)
+            for i in range(0, end, 65536):
+                self.wfile.write(view[i:min(i + 65536, end)])
+            if drop:
+                self.close_connection = True
+
+    return Handler, stats
+
+
+async def run(base_url: str, recordings: dict, directory: str, args) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = {"ok": 0, "mismatched": 0, "failed": 0, "bytes": 0}
+
+    async def fetch(client, name, body):
+        async with semaphore:
+            path = os.path.join(directory, os.path.basename(name))
+            # Like the fetcher's retries across attempts, with the .part file kept in between
+            for _ in range(args.attempts):
+                try:
+                    size, sha256 = await download(client, base_url + name, path, args.chunk_kb * 1024, args.resume_tries)
+                    break
+                except DownloadError:
+                    continue
+            else:
+                results["failed"] += 1
+                return
+            results["bytes"] += size
+            if sha256 == hashlib.sha256(body).hexdigest():
+                results["ok"] += 1
+            else:
+                results["mismatched"] += 1
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(timeout=30) as client:
+        await asyncio.gather(*(fetch(client, name, body) for name, body in recordings.items()))
+    results["elapsed"] = time.perf_counter() - started
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--drop-rate", type=float, default=0.3, help="share of responses cut off half-way")
+    parser.add_argument("--chunk-kb", type=int, default=256)
+    parser.add_argument("--resume-tries", type=int, default=3)
+    parser.add_argument("--attempts", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    recordings = make_recordings(args.files, int(args.size_mb * 1024 * 1024), args.seed)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    handler, server_stats = make_handler(recordings, args.drop_rate, args.seed)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    directory = tempfile.mkdtemp(prefix="recordings-")
+
+    try:
+        r = asyncio.run(run(f"http://127.0.0.1:{server.server_port}", recordings, directory, args))
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    mb = r["bytes"] / 1024 / 1024
+    print(f"{args.files} files x {args.size_mb:g} MiB, concurrency {args.concurrency}, drop rate {args.drop_rate:g}")
+    print(f"stored {r['ok']}  checksum mismatches {r['mismatched']}  failed {r['failed']}")
+    print(f"requests {server_stats['requests']}  dropped {server_stats['dropped']}  resumed with Range {server_stats['ranged']}")
+    print(f"{mb:.0f} MiB in {r['elapsed']:.2f} s = {mb / r['elapsed']:.1f} MiB/s")
+    print(f"peak RSS growth during downloads {(rss_after - rss_before) / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+CPU time and bytes on the wire for GET /api/campaigns/{id} on a large
+campaign: FastAPI's default path (jsonable_encoder + stdlib json) versus
+app.utils.json_response, with each content coding it can negotiate.
+
+The campaign is synthetic but shaped like the real rows (SELECT * FROM
+calls, datetimes included, transcripts on answered calls). Requests go
+through a real FastAPI app over ASGI, so routing, response_model handling
+and the Response itself are all counted; the database is not.
+
+    python benchmarks/response_serialisation.py --calls 50000 --runs 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.config insists on Exotel credentials at import; the benchmark never dials
+for var in ("EXOTEL_API_KEY", "EXOTEL_API_TOKEN", "EXOTEL_SUBDOMAIN", "EXOTEL_ACCOUNT_SID"):
+    os.environ.setdefault(var, "benchmark")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from app.models.schemas import CampaignDetailResponse  # noqa: E402
+from app.utils import json_response as fast  # noqa: E402
+
+WORDS = "haan ji main Bangalore se bol raha hoon delivery partner job ke baare mein".split()
+STATUSES = [("completed", 0.35), ("missed", 0.45), ("failed", 0.1), ("pending", 0.1)]
+
+
+def make_campaign(calls: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    campaign_id = "6f1c2d0e-3a4b-4c5d-8e9f-0a1b2c3d4e5f"
+    started = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+    rows = []
+    for i in range(calls):
+        status = rng.choices([s for s, _ in STATUSES], [w for _, w in STATUSES])[0]
+        answered = status == "completed"
+        at = started + timedelta(seconds=i * 2)
+        rows.append({
+            "id": i + 1,
+            "campaign_id": campaign_id,
+            "name": f"Candidate {i}",
+            "phone": f"+9198{rng.randrange(10**8):08d}",
+            "status": status,
+            "feedback": None,
+            "timestamp": at.strftime("%Y-%m-%d %H:%M:%S"),
+            "recording_url": f"https://recordings.exotel.com/{i:08x}.mp3" if answered else None,
+            "call_sid": f"{rng.getrandbits(128):032x}",
+            "conversation_id": f"{rng.getrandbits(128):032x}" if answered else None,
+            "duration": rng.randint(10, 240) if answered else 0,
+            "error_message": None,
+            "retry_count": rng.randint(0, 2),
+            "preferred_city": rng.choice(["Bangalore", "Mumbai", "Delhi", None]) if answered else None,
+            "interested": rng.choice(["yes", "no"]) if answered else None,
+            "transcript": " ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 200))) if answered else None,
+            "analysis_status": "completed" if answered else "pending",
+            "next_attempt_at": at + timedelta(minutes=30) if status == "missed" else None,
+            "session_outcome_applied": answered,
+            "caller_id": f"0803959{rng.randrange(10000):04d}",
+            "recording_status": "stored" if answered else None,
+            "recording_path": f"recordings/{campaign_id}/{i}.mp3" if answered else None,
+            "recording_bytes": rng.randint(100_000, 900_000) if answered else None,
+            "recording_sha256": f"{rng.getrandbits(256):064x}" if answered else None,
+            "recording_attempts": 1 if answered else 0,
+            "recording_next_attempt_at": None,
+        })
+
+    return {
+        "campaign": {
+            "id": campaign_id, "name": "Benchmark", "created_at": started.isoformat(), "status": "completed",
+            "total_calls": calls, "completed_calls": calls // 3, "failed_calls": calls // 10, "active": 1,
+        },
+        "calls": rows,
+        "state": {
+            "campaign_id": campaign_id, "is_running": 0, "current_index": calls, "analysis_status": "completed",
+            "last_updated": started.isoformat(), "lease_owner": None, "lease_expires_at": None,
+        },
+        "analysis_status": "completed",
+    }
+
+
+def build_app(content: dict) -> FastAPI:
+    app = FastAPI()
+
+    # What get_campaign did before: return the dict and let FastAPI encode it
+    @app.get("/before")
+    async def before():
+        return content
+
+    @app.get("/after", response_model=CampaignDetailResponse)
+    async def after(request: Request):
+        return await fast.json_response(request, content)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, encoding: str, runs: int) -> dict:
+    cpu, wall, size = [], [], 0
+    for _ in range(runs):
+        started_cpu, started = time.process_time(), time.perf_counter()
+        async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+            size = 0
+            async for chunk in response.aiter_raw():
+                size += len(chunk)
+            served_as = response.headers.get("content-encoding", "identity")
+        cpu.append((time.process_time() - started_cpu) * 1000)
+        wall.append((time.perf_counter() - started) * 1000)
+    return {"cpu_ms": statistics.median(cpu), "wall_ms": statistics.median(wall), "bytes": size, "encoding": served_as}
+
+
+async def run(args):
+    content = make_campaign(args.calls)
+    transport = httpx.ASGITransport(app=build_app(content))
+    cases = [
+        ("before: jsonable_encoder + json", "/before", "identity", fast.orjson),
+        ("after: stdlib json", "/after", "identity", None),
+        ("after: orjson", "/after", "identity", fast.orjson),
+        ("after: orjson + gzip", "/after", "gzip", fast.orjson),
+        ("after: orjson + br", "/after", "br", fast.orjson),
+    ]
+
+    print(f"{args.calls} calls, median of {args.runs} runs (orjson {'yes' if fast.orjson else 'no'}, brotli {'yes' if fast.brotli else 'no'})\n")
+    print(f"{'':34} {'cpu ms':>8} {'wall ms':>8} {'bytes':>12}  coding")
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await measure(client, "/before", "identity", 1)
+        for label, path, encoding, encoder in cases:
+            if encoder is None and fast.orjson is None:
+                continue
+            saved, fast.orjson = fast.orjson, encoder
+            try:
+                result = await measure(client, path, encoding, args.runs)
+            finally:
+                fast.orjson = saved
+            print(f"{label:34} {result['cpu_ms']:8.0f} {result['wall_ms']:8.0f} {result['bytes']:12,}  {result['encoding']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
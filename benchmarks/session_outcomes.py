@@ -0,0 +1,143 @@
+"""
+Database time for the previous_sessions part of the session-start webhook:
+the old path (an existence check and an UPDATE per session) against the
+single set-based apply_session_outcomes statement.
+
+A scratch campaign with --calls calls, each with a conversation_id, is
+created, and each run applies --sessions random outcomes in one
+transaction, as one webhook would. Calls are reset between runs so both
+paths always do the full update. The campaign is dropped at the end.
+
+DATABASE_URL must point at a migrated scratch database.
+
+    python benchmarks/session_outcomes.py --calls 20000 --sessions 1 5 20 --runs 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.config insists on Exotel credentials at import; the benchmark never dials
+for var in ("EXOTEL_API_KEY", "EXOTEL_API_TOKEN", "EXOTEL_SUBDOMAIN", "EXOTEL_ACCOUNT_SID"):
+    os.environ.setdefault(var, "benchmark")
+
+# The engine is built at import, so this can't wait for argument parsing
+if not os.environ.get("DATABASE_URL"):
+    sys.exit("DATABASE_URL must point at a migrated scratch database")
+
+from sqlalchemy import text  # noqa: E402
+from app.db.unit_of_work import UnitOfWork  # noqa: E402
+from app.services.partitions import drop_campaign_calls  # noqa: E402
+
+
+async def create_campaign(calls: int) -> str:
+    campaign_id = str(uuid.uuid4())
+    async with UnitOfWork() as uow:
+        await uow.campaigns.create_campaign(campaign_id, "session outcomes benchmark", "2026-10-19 00:00:00", calls)
+        await uow.calls.create_partition(campaign_id)
+        await uow.conn.execute(text("""
+            INSERT INTO calls (campaign_id, name, phone, status, conversation_id)
+            SELECT :campaign_id, 'Candidate ' || n, '+9198' || lpad(n::text, 8, '0'), 'completed',
+                   :campaign_id || '-' || n
+            FROM generate_series(1, :calls) AS n
+        """), {"campaign_id": campaign_id, "calls": calls})
+        await uow.conn.execute(text("ANALYZE calls"))
+    return campaign_id
+
+
+def make_outcomes(rng: random.Random, campaign_id: str, calls: int, sessions: int) -> list:
+    return [
+        {
+            "conversation_id": f"{campaign_id}-{n}",
+            "preferred_city": rng.choice(["Bangalore", "Mumbai", None]),
+            "justification": "Candidate asked about the delivery partner role.",
+            "interested": rng.choice(["yes", "no"]),
+        }
+        for n in rng.sample(range(1, calls + 1), sessions)
+    ]
+
+
+async def reset(outcomes: list):
+    async with UnitOfWork() as uow:
+        await uow.conn.execute(text("""
+            UPDATE calls
+            SET feedback = NULL, interested = NULL, preferred_city = NULL, session_outcome_applied = FALSE
+            WHERE conversation_id = ANY(CAST(:ids AS text[]))
+        """), {"ids": [o["conversation_id"] for o in outcomes]})
+
+
+async def apply_per_row(outcomes: list):
+    """The old path: one lookup and one UPDATE per session"""
+    async with UnitOfWork() as uow:
+        for o in outcomes:
+            found = await uow.conn.execute(
+                text("SELECT 1 FROM calls WHERE conversation_id = :conversation_id LIMIT 1"),
+                {"conversation_id": o["conversation_id"]},
+            )
+            if not found.fetchone():
+                continue
+            await uow.conn.execute(text("""
+                UPDATE calls
+                SET feedback = COALESCE(feedback, '') || :justification,
+                    interested = :interested,
+                    preferred_city = COALESCE(preferred_city, :preferred_city)
+                WHERE conversation_id = :conversation_id
+            """), o)
+
+
+async def apply_set_based(outcomes: list):
+    async with UnitOfWork() as uow:
+        await uow.calls.apply_session_outcomes(outcomes)
+
+
+async def measure(apply, rng: random.Random, campaign_id: str, args, sessions: int) -> list:
+    timings = []
+    for _ in range(args.runs):
+        outcomes = make_outcomes(rng, campaign_id, args.calls, sessions)
+        await reset(outcomes)
+        started = time.perf_counter()
+        await apply(outcomes)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def percentile(values: list, q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1]
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    campaign_id = await create_campaign(args.calls)
+    try:
+        print(f"{args.calls} calls, {args.runs} runs per row (ms per webhook)\n")
+        print(f"{'sessions':>8}  {'path':<10} {'p50':>8} {'p95':>8} {'mean':>8}")
+        for sessions in args.sessions:
+            for label, apply in (("per-row", apply_per_row), ("set-based", apply_set_based)):
+                timings = await measure(apply, rng, campaign_id, args, sessions)
+                print(
+                    f"{sessions:>8}  {label:<10} {percentile(timings, 50):8.2f} "
+                    f"{percentile(timings, 95):8.2f} {statistics.mean(timings):8.2f}"
+                )
+    finally:
+        await drop_campaign_calls(campaign_id)
+        async with UnitOfWork() as uow:
+            await uow.campaigns.delete(campaign_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 20], help="previous sessions per webhook")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()